@@ -1,4 +1,4 @@
-from krisi.evaluate import Metric, ScoreCard, compare, library, score
+from krisi.evaluate import Intermediate, Metric, ScoreCard, compare, library, score
 from krisi.sharedtypes import Task
 from krisi.utils.enums import ParsableEnum
 from krisi.utils.io import load_scorecards
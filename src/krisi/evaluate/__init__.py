@@ -2,6 +2,7 @@
 from typing import List
 
 from .compare import compare
+from .intermediate import Intermediate
 from .library_.registry import library
 from .metric import Metric
 from .score import score
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Any, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
@@ -8,11 +9,35 @@ from krisi.evaluate.metric import Metric
 from krisi.evaluate.type import DatasetType, Predictions, Targets, Weights
 from krisi.utils.iterable_helpers import flatten, isiterable
 
-valid_types = ["int64", "float64", "float32", "float", "int"]
+valid_types = [
+    "int64",
+    "int32",
+    "int16",
+    "int8",
+    "uint32",
+    "uint16",
+    "uint8",
+    "float64",
+    "float32",
+    "float",
+    "int",
+]
+
+
+def as_array(iterable: Union[Targets, Predictions, Weights]) -> np.ndarray:
+    """The values of `iterable` as a `np.ndarray`, without copying them if possible."""
+    if isinstance(iterable, (pd.Series, pd.DataFrame)):
+        return iterable.to_numpy()
+    return np.asarray(iterable)
 
 
 def get_bad_types(iterable: Union[Targets, Predictions]) -> Iterable:
-    return [x for x in iterable if type(x) not in valid_types]
+    values = as_array(iterable)
+    if values.dtype != object:
+        return [values.dtype.name]
+    return sorted(
+        set(type(x).__name__ for x in pd.unique(values)) - set(valid_types),
+    )
 
 
 def flatten_type(complex_type: Any) -> Union[List, Any]:
@@ -26,6 +51,7 @@ def flatten_type(complex_type: Any) -> Union[List, Any]:
         return add_list + [flatten_type(type_) for type_ in get_args(complex_type)]
 
 
+@lru_cache(maxsize=None)
 def unpack_type(complex_type: Any) -> Tuple[Any]:
     return tuple(flatten(flatten_type(complex_type)))
 
@@ -37,8 +63,21 @@ def check_no_duplicate_metrics(metrics: List[Metric]):
 
 
 def check_valid_pred_target(
-    y: Targets, predictions: Predictions, sample_weights: Optional[Weights]
+    y: Targets,
+    predictions: Predictions,
+    sample_weights: Optional[Weights],
+    trusted_input: bool = False,
 ):
+    """
+    Checks that the inputs are of the same length and of a valid numerical dtype,
+    by inspecting their dtype, and that they contain no infinite values.
+
+    Parameters
+    ----------
+    trusted_input : bool
+        Skips the checks that go through every value (eg.: the infinite values, or
+        the types of the items of a list), by default False
+    """
     assert len(y) == len(
         predictions
     ), f"Target length {len(y)} should match predictions length {len(predictions)}"
@@ -56,48 +95,60 @@ def check_valid_pred_target(
 
     for iterable in [y, predictions]:
         assert isiterable(iterable), f"{iterable} is not an iterable or it is a string."
-        dtype_name = ""
-        if isinstance(iterable, pd.Series):
-            dtype_name = iterable.dtype
-        elif isinstance(iterable, np.ndarray):
-            dtype_name = iterable.dtype.name
-        else:
-            types = set([type(obj) for obj in iterable])
-            assert len(types) == 1, f"Inconsistent types in {iterable}"
-            dtype_name = list(types)[0]
-
+        if trusted_input and not isinstance(iterable, (pd.Series, np.ndarray)):
+            continue
+        values = as_array(iterable)
         assert (
-            dtype_name in valid_types
+            values.dtype.name in valid_types
         ), f"{iterable} contains at least one invalid type. {get_bad_types(iterable)}"
+        if not trusted_input and values.dtype.kind == "f":
+            assert not np.isinf(values).any(), f"{iterable} contains infinite values."
+
+
+def _is_integral(values: np.ndarray) -> bool:
+    """Whether every value (that is not `None`) is a whole number."""
+    if values.dtype.kind in "biu":
+        return True
+    if values.dtype.kind != "f":
+        return all(
+            isinstance(value, (int, np.integer))
+            or (isinstance(value, float) and value.is_integer())
+            for value in values
+            if value is not None
+        )
+    with np.errstate(invalid="ignore"):
+        # NaNs and infinite values are not whole numbers either
+        return bool(np.all(np.round(values) == values)) and not np.isinf(values).any()
 
 
 def infer_dataset_type(y: Targets) -> DatasetType:
+    """
+    Infers the type of the task from the targets: regression if not every target
+    is a whole number (NaNs included), else binary (balanced if neither label is
+    less than 30% of the targets) or multiclass classification, based on the counts
+    of the labels. `None` targets (of an object array) are ignored.
+    """
     # TODO: Should work with booleans
-    def infer_exact_type(is_classification: bool, y: Targets) -> DatasetType:
-        if is_classification is False:
-            return DatasetType.regression
-        if len(set(y)) == 2:
-            class_1 = y[0]
-            no_of_class_1 = np.count_nonzero(y == class_1)
-            ratio = no_of_class_1 / len(y)
-            if ratio < 0.3 or ratio > 0.7:
-                return DatasetType.classification_binary_imbalanced
-            else:
-                return DatasetType.classification_binary_balanced
-        else:
-            return DatasetType.classification_multiclass
-
-    if isinstance(y, pd.Series):
-        y = y.to_numpy()
-    if isinstance(y, np.ndarray):
-        if hasattr(y[0], "is_integer"):
-            # Using this is faster, if available use this.
-            return infer_exact_type(
-                all([i.is_integer() for i in y if i is not None]), y
-            )
-        else:
-            return infer_exact_type(np.all(np.mod(y, 1) == 0), y)
+    values = as_array(y)
+    # A sample is enough to tell most regression targets apart. If it only holds
+    # whole numbers, that is not conclusive, and every target is checked.
+    sample = values[:1000]
+    if not _is_integral(sample):
+        return DatasetType.regression
+    if len(values) > len(sample) and not _is_integral(values):
+        return DatasetType.regression
+
+    if values.dtype.kind in "biuf":
+        labels, counts = np.unique(values, return_counts=True)
     else:
-        return infer_exact_type(
-            all([isinstance(i, int) for i in y if i is not None]), y
+        labels, counts = np.unique(
+            [value for value in values if value is not None], return_counts=True
         )
+    if len(counts) == 2:
+        ratio = counts[0] / counts.sum()
+        if ratio < 0.3 or ratio > 0.7:
+            return DatasetType.classification_binary_imbalanced
+        else:
+            return DatasetType.classification_binary_balanced
+    else:
+        return DatasetType.classification_multiclass
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List, Optional
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 
+from krisi.evaluate.parallel import context_process_pool, submit_with_context
+from krisi.evaluate.rolling import Decomposition, RollingWindows
 from krisi.evaluate.type import (
     Model,
     PredictionsDS,
@@ -18,52 +22,256 @@ if TYPE_CHECKING:
     from krisi.evaluate.metric import Metric
 
 
+# The number of predictions a batch of benchmark realizations is kept under
+max_batch_values = 2**22
+# The number of realizations of a batch: drawn from one seed, on one process, and
+# between two checks of the standard errors
+sequential_batch_size = 25
+
+
 def zscore(arr: np.ndarray) -> np.ndarray:
     m = arr.mean()
     s = arr.std(ddof=0)
     return (arr - m) / s
 
 
-def _predict_evaluate(
-    X: pd.DataFrame,
+def benchmark_standard_errors(
+    benchmark_metrics: np.ndarray, metric_result: float
+) -> Tuple[float, float]:
+    """
+    The standard errors of the mean of the benchmark results and of the z-score of
+    `metric_result` among them, assuming they are normally distributed (the latter
+    is `sqrt((1 + z^2 / 2) / n)`, so the further in the tail, the larger it is).
+    """
+    num_iter = len(benchmark_metrics)
+    if num_iter < 2:
+        return np.inf, np.inf
+    std = benchmark_metrics.std(ddof=1)
+    if std == 0.0:
+        return 0.0, 0.0
+    z = (metric_result - benchmark_metrics.mean()) / std
+    return std / np.sqrt(num_iter), np.sqrt((1 + z**2 / 2) / num_iter)
+
+
+def _has_converged(
+    benchmark_metrics: List[Any], metric_result: Any, tolerance: float
+) -> bool:
+    """
+    Whether both standard errors are within `tolerance`, or can not be estimated
+    (eg.: the results are not numbers), in which case more realizations don't help.
+    """
+    if not all(
+        isinstance(result, (int, float, np.number))
+        for result in benchmark_metrics + [metric_result]
+    ):
+        return True
+    standard_errors = benchmark_standard_errors(
+        np.asarray(benchmark_metrics, dtype=np.float64), float(metric_result)
+    )
+    return not any(standard_error > tolerance for standard_error in standard_errors)
+
+
+def _evaluate_decomposed_batch(
+    metric: Metric,
     y: pd.Series,
     sample_weight: Optional[pd.Series],
-    metric: Metric,
-    model: Model,
-) -> float:
-    preds, probs = model.predict(X, y, sample_weight)
-    return metric.evaluate(y, preds, probs, sample_weight).result
+    predictions: np.ndarray,
+    probabilities: Optional[np.ndarray],
+) -> Optional[np.ndarray]:
+    """
+    The result of `metric` on each realization of a batch at once, from the
+    statistics of its exact `Decomposition`, or `None` if it has none.
+    """
+    decomposition = metric.func_rolling
+    if (
+        not isinstance(decomposition, Decomposition)
+        or not decomposition.exact
+        or metric._from_group
+        or (metric.accepts_probabilities and probabilities is None)
+    ):
+        return None
+    num_iter, num_values = predictions.shape
+    # The realizations are laid end to end, each being a window over the stack
+    windows = RollingWindows(
+        np.arange(num_iter, dtype=np.int64) * num_values,
+        np.arange(1, num_iter + 1, dtype=np.int64) * num_values,
+    )
+    statistics = decomposition.statistics(
+        np.tile(np.asarray(y), num_iter),
+        probabilities.reshape(num_iter * num_values, -1)
+        if metric.accepts_probabilities
+        else predictions.reshape(-1),
+        sample_weight=None
+        if sample_weight is None
+        else np.tile(np.asarray(sample_weight), num_iter),
+    )
+    sums = None if statistics is None else statistics.window_sums(windows)
+    if sums is None:
+        return None
+    results = decomposition.finalize(sums, **metric.parameters)
+    return None if results is None or len(results) != num_iter else results
 
 
-def calculate_benchmark(
+def evaluate_batch(
     metric: Metric,
-    models: List[Model],
-    y: TargetsDS,
-    predictions: PredictionsDS,
-    probabilities: Optional[ProbabilitiesDF],
-    sample_weight: Optional[WeightsDS],
-    num_benchmark_iter: int,
-) -> Metric:
-    if metric.purpose == Purpose.group or metric.purpose == Purpose.diagram:
-        return metric
+    y: pd.Series,
+    sample_weight: Optional[pd.Series],
+    predictions: np.ndarray,
+    probabilities: Optional[np.ndarray],
+) -> List[Any]:
+    """
+    The result of `metric` on each realization of a batch of benchmark predictions.
+
+    Parameters
+    ----------
+    metric : Metric
+    y : pd.Series
+    sample_weight : Optional[pd.Series]
+    predictions : np.ndarray
+        The predictions of each realization, of shape `(n_iter, len(y))`.
+    probabilities : Optional[np.ndarray]
+        The probabilities of each realization, of shape
+        `(n_iter, len(y), num_classes)`.
 
-    metric_result = (
-        metric.evaluate(y, predictions, probabilities, sample_weight).result
-        if metric.result is None
-        else metric.result
+    Returns
+    -------
+    List[Any]
+        The result of each realization, scored all at once if `metric` has an exact
+        `Decomposition`, else one by one.
+    """
+    results = _evaluate_decomposed_batch(
+        metric, y, sample_weight, predictions, probabilities
     )
-    benchmark_metric = metric.reset()
+    if results is not None:
+        return list(results)
+    return [
+        metric.evaluate(
+            y,
+            pd.Series(predictions[i], index=y.index),
+            None
+            if probabilities is None
+            else pd.DataFrame(probabilities[i], index=y.index),
+            sample_weight,
+        ).result
+        for i in range(len(predictions))
+    ]
+
+
+BenchmarkSeed = Union[int, np.random.SeedSequence]
+# The predictions and the probabilities of a batch of realizations
+Realizations = Tuple[np.ndarray, Optional[np.ndarray]]
+
+
+@dataclass
+class BenchmarkDraws:
+    """
+    The realizations drawn from each benchmark `Model`, batch by batch, kept so that
+    `Metric`s can be scored on them later without drawing them again (see
+    `ScoreCard.rescore_benchmark`).
+
+    Parameters
+    ----------
+    models : List[Model]
+        The benchmark `Model`s the realizations were drawn from.
+    seed : np.random.SeedSequence
+        The root of the seeds of the batches.
+    num_benchmark_iter : int
+        The number of realizations that were to be drawn from each `Model` (the most,
+        if `tolerance` is set; the number each `Metric` was scored on is in its
+        `diagnostics["num_benchmark_iter"]`, by model).
+    tolerance : Optional[float]
+        The tolerance the realizations were drawn with.
+    batches : List[List[Realizations]]
+        The batches of realizations of each `Model`.
+    """
+
+    models: List[Model]
+    seed: np.random.SeedSequence
+    num_benchmark_iter: int
+    tolerance: Optional[float]
+    batches: List[List[Realizations]]
+
+
+def block_seeds(
+    seed: np.random.SeedSequence, model_index: int, num_blocks: int
+) -> List[np.random.SeedSequence]:
+    """
+    The seed of each block of realizations of the `model_index`-th benchmark `Model`:
+    the children `seed.spawn(...)[model_index].spawn(num_blocks)` would give, without
+    spawning, so that they only depend on `seed` and on their position.
+    """
+    return [
+        np.random.SeedSequence(
+            seed.entropy,
+            spawn_key=seed.spawn_key + (model_index, block),
+            pool_size=seed.pool_size,
+        )
+        for block in range(num_blocks)
+    ]
 
-    for model in models:
-        if probabilities is not None:
-            X = pd.concat([predictions, probabilities], axis="columns", copy=False)
-        else:
-            X = predictions.to_frame()
 
-        benchmark_metrics = [
-            _predict_evaluate(X, y, sample_weight, benchmark_metric, model)
-            for _ in range(num_benchmark_iter)
-        ]
+def score_benchmark_block(
+    metrics: List[Metric],
+    y: pd.Series,
+    sample_weight: Optional[pd.Series],
+    realizations: Realizations,
+    metric_indices: List[int],
+) -> Dict[int, List[Any]]:
+    """The results of the `metric_indices` of `metrics` on a batch of realizations."""
+    return {
+        i: evaluate_batch(metrics[i], y, sample_weight, *realizations)
+        for i in metric_indices
+    }
+
+
+def evaluate_benchmark_block(
+    metrics: List[Metric],
+    models: List[Model],
+    X: pd.DataFrame,
+    y: pd.Series,
+    sample_weight: Optional[pd.Series],
+    model_index: int,
+    n_iter: int,
+    seed: np.random.SeedSequence,
+    metric_indices: List[int],
+    keep_draws: bool,
+) -> Tuple[Dict[int, List[Any]], Optional[Realizations]]:
+    """
+    Draws `n_iter` realizations of a `Model` from `seed` once, and scores them with
+    each of the `metric_indices` of `metrics`.
+    """
+    realizations = models[model_index].predict_batch(
+        X, y, sample_weight, n_iter, rng=np.random.default_rng(seed)
+    )
+    return (
+        score_benchmark_block(metrics, y, sample_weight, realizations, metric_indices),
+        realizations if keep_draws else None,
+    )
+
+
+def benchmark_model_keys(models: List[Model]) -> List[str]:
+    """
+    The key of each benchmark `Model` in the comparison results and the diagnostics of
+    a `Metric`: its name, followed by its position if other `Model`s have the same
+    name (eg.: `RandomClassifier` and `RandomClassifierChunked` are both "NS").
+    """
+    names = [model.name for model in models]
+    return [
+        name if names.count(name) == 1 else f"{name}_{i}"
+        for i, name in enumerate(names)
+    ]
+
+
+def _compare_to_benchmark(
+    metric: Metric,
+    models: List[Model],
+    metric_result: Any,
+    benchmark_results: List[List[Any]],
+    seed: np.random.SeedSequence,
+) -> Metric:
+    num_iters = {}
+    for key, benchmark_metrics in zip(benchmark_model_keys(models), benchmark_results):
+        num_iters[key] = len(benchmark_metrics)
 
         mean_benchmark_metric = np.mean(benchmark_metrics)
 
@@ -78,10 +286,244 @@ def calculate_benchmark(
         metric.comparison_result = pd.concat(
             [
                 metric.comparison_result,
-                pd.Series([comparison_result], index=[f"Δ {model.name}"]),
-                pd.Series([metric_zscore], index=[f"Δ {model.name}_zscore"]),
+                pd.Series([comparison_result], index=[f"Δ {key}"]),
+                pd.Series([metric_zscore], index=[f"Δ {key}_zscore"]),
             ],
             axis=0,
         )
 
+    metric.diagnostics = dict(
+        metric.diagnostics or {},
+        num_benchmark_iter=num_iters,
+        benchmark_seed=seed.entropy,
+    )
+    return metric
+
+
+def calculate_benchmarks(
+    metrics: List[Metric],
+    models: List[Model],
+    y: TargetsDS,
+    predictions: PredictionsDS,
+    probabilities: Optional[ProbabilitiesDF],
+    sample_weight: Optional[WeightsDS],
+    num_benchmark_iter: int,
+    batch_size: Optional[int] = None,
+    tolerance: Optional[float] = None,
+    seed: Optional[BenchmarkSeed] = None,
+    n_jobs: int = 1,
+    keep_draws: bool = False,
+    draws: Optional[BenchmarkDraws] = None,
+) -> Tuple[List[Metric], Optional[BenchmarkDraws]]:
+    """
+    Compares each of `metrics` to its results on the predictions of each benchmark
+    `Model`. Each batch of realizations is drawn once and scored with every `Metric`
+    (that has not converged yet), so the z-scores of the `Metric`s are computed on
+    the same realizations. The number of realizations each `Metric` was scored on is
+    stored in `metric.diagnostics["num_benchmark_iter"]`, a dict keyed by
+    `benchmark_model_keys`.
+
+    Parameters
+    ----------
+    num_benchmark_iter : int
+        The number of realizations drawn from each `Model`, or the most that are
+        drawn if `tolerance` is set (the number drawn from each is in the
+        diagnostics, see above).
+    batch_size : Optional[int]
+        The number of realizations predicted (with `Model.predict_batch`) and
+        scored at once, each drawn from its own seed. By default
+        `sequential_batch_size`, or fewer if they would make up more than
+        `max_batch_values` predictions.
+    tolerance : Optional[float]
+        If set, each `Metric` is scored batch by batch, until the standard error of
+        both the mean of its benchmark results and the z-score of its result (see
+        `benchmark_standard_errors`) are within it, by default None
+    seed : Optional[BenchmarkSeed]
+        The root of the seeds each batch of realizations is drawn from (see
+        `block_seeds`). The results only depend on it, and not on `n_jobs`, as long
+        as the models draw their realizations from the `rng` passed to
+        `Model.predict_batch`. By default it is drawn from the global `np.random`
+        state. Its entropy is stored in `metric.diagnostics["benchmark_seed"]`.
+    n_jobs : int
+        Number of processes the batches are predicted and scored on, by default 1
+    keep_draws : bool
+        Whether the realizations drawn are returned, to score other `Metric`s on
+        later. They take `len(y) * (1 + num_classes)` values per realization, by
+        default False
+    draws : Optional[BenchmarkDraws]
+        Realizations kept from an earlier call, that are scored instead of drawing
+        new ones (`models`, `num_benchmark_iter`, `tolerance` and `seed` are then
+        taken from it), by default None
+
+    Returns
+    -------
+    Tuple[List[Metric], Optional[BenchmarkDraws]]
+        The `Metric`s compared to the benchmark (`Metric`s for groups or diagrams
+        are returned as they are), and the realizations drawn if `keep_draws`.
+    """
+    if draws is not None:
+        models, num_benchmark_iter, tolerance, seed = (
+            draws.models,
+            draws.num_benchmark_iter,
+            draws.tolerance,
+            draws.seed,
+        )
+    benchmarked = [
+        i
+        for i, metric in enumerate(metrics)
+        if metric.purpose != Purpose.group and metric.purpose != Purpose.diagram
+    ]
+    if len(benchmarked) == 0:
+        return metrics, draws
+    metric_results = {
+        i: metrics[i].evaluate(y, predictions, probabilities, sample_weight).result
+        if metrics[i].result is None
+        else metrics[i].result
+        for i in benchmarked
+    }
+    benchmark_metrics = [metric.reset() for metric in metrics]
+    if batch_size is None:
+        batch_size = min(
+            sequential_batch_size, max(1, max_batch_values // max(len(y), 1))
+        )
+    if seed is None:
+        seed = int(np.random.randint(0, 2**63 - 1, dtype=np.int64))
+    seed_sequence = (
+        seed
+        if isinstance(seed, np.random.SeedSequence)
+        else np.random.SeedSequence(seed)
+    )
+    if probabilities is not None:
+        X = pd.concat([predictions, probabilities], axis="columns", copy=False)
+    else:
+        X = predictions.to_frame()
+    context = (benchmark_metrics, models, X, y, sample_weight)
+    block_sizes = [
+        min(batch_size, num_benchmark_iter - start)
+        for start in range(0, num_benchmark_iter, batch_size)
+    ]
+    executor = (
+        context_process_pool(evaluate_benchmark_block, context, n_jobs)
+        if n_jobs > 1 and draws is None
+        else None
+    )
+    submitted: List[Future] = []
+
+    def evaluate_blocks(
+        model_index: int, pending: List[int]
+    ) -> Iterator[Tuple[Dict[int, List[Any]], Optional[Realizations]]]:
+        """
+        The results of each block of realizations of a `Model`, scored with the
+        `Metric`s still `pending` when the block is drawn (the caller removes the
+        ones that have converged).
+        """
+        if draws is not None:
+            for realizations in draws.batches[model_index]:
+                yield score_benchmark_block(
+                    benchmark_metrics, y, sample_weight, realizations, list(pending)
+                ), realizations
+            return
+        blocks = list(
+            zip(block_sizes, block_seeds(seed_sequence, model_index, len(block_sizes)))
+        )
+        if executor is None:
+            for n_iter, block_seed in blocks:
+                yield evaluate_benchmark_block(
+                    *context, model_index, n_iter, block_seed, list(pending), keep_draws
+                )
+            return
+        # With a tolerance, only as many blocks are drawn ahead as there are processes
+        wave_size = n_jobs if tolerance is not None else len(blocks)
+        for wave in range(0, len(blocks), wave_size):
+            futures = [
+                submit_with_context(
+                    executor, model_index, n_iter, block_seed, list(pending), keep_draws
+                )
+                for n_iter, block_seed in blocks[wave : wave + wave_size]
+            ]
+            submitted.extend(futures)
+            try:
+                for future in futures:
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    results: Dict[int, List[List[Any]]] = {i: [] for i in benchmarked}
+    kept_batches: List[List[Realizations]] = []
+    try:
+        for model_index in range(len(models)):
+            pending = list(benchmarked)
+            model_results: Dict[int, List[Any]] = {i: [] for i in benchmarked}
+            kept_batches.append([])
+            for block_results, realizations in evaluate_blocks(model_index, pending):
+                if realizations is not None:
+                    kept_batches[-1].append(realizations)
+                for i in pending:
+                    model_results[i] += block_results[i]
+                if tolerance is not None:
+                    # Updated in place, for the blocks that are drawn next
+                    pending[:] = [
+                        i
+                        for i in pending
+                        if not _has_converged(
+                            model_results[i], metric_results[i], tolerance
+                        )
+                    ]
+                    if len(pending) == 0:
+                        break
+            for i in benchmarked:
+                results[i].append(model_results[i])
+    finally:
+        if executor is not None:
+            # Not `shutdown(cancel_futures=True)`, which requires python 3.9
+            for future in submitted:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    compared = [
+        _compare_to_benchmark(
+            metric, models, metric_results[i], results[i], seed_sequence
+        )
+        if i in results
+        else metric
+        for i, metric in enumerate(metrics)
+    ]
+    if keep_draws and draws is None:
+        draws = BenchmarkDraws(
+            models, seed_sequence, num_benchmark_iter, tolerance, kept_batches
+        )
+    return compared, draws
+
+
+def calculate_benchmark(
+    metric: Metric,
+    models: List[Model],
+    y: TargetsDS,
+    predictions: PredictionsDS,
+    probabilities: Optional[ProbabilitiesDF],
+    sample_weight: Optional[WeightsDS],
+    num_benchmark_iter: int,
+    batch_size: Optional[int] = None,
+    tolerance: Optional[float] = None,
+    seed: Optional[BenchmarkSeed] = None,
+    n_jobs: int = 1,
+) -> Metric:
+    """
+    Compares `metric` to its results on the predictions of each benchmark `Model`,
+    see `calculate_benchmarks`.
+    """
+    [metric], _ = calculate_benchmarks(
+        [metric],
+        models,
+        y,
+        predictions,
+        probabilities,
+        sample_weight,
+        num_benchmark_iter,
+        batch_size=batch_size,
+        tolerance=tolerance,
+        seed=seed,
+        n_jobs=n_jobs,
+    )
     return metric
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
-from copy import deepcopy
 from typing import Any, Dict, Generic, List, Optional, Tuple, Union
 
 from krisi.utils.iterable_helpers import wrap_in_list
 
+from .intermediate import Intermediate, compute_intermediates
 from .metric import Metric, PostProcessFunction
+from .parallel import scheduling_priority
+from .rolling import SharedFunction, WindowPlan
 from .type import (
     Calculation,
+    ComputationalComplexity,
     MetricFunction,
     MetricResult,
     PredictionsDS,
@@ -17,15 +20,22 @@ from .type import (
     WeightsDS,
 )
 
+# Derived from the metrics of a `Group` (or set on it) rather than passed in
+_derived_properties = ["requires", "comp_complexity", "_read_only"]
+
 
 def filter_base_properties(dict: dict) -> dict:
-    return {key: value for key, value in dict.items() if not key[:2] == "__"}
+    return {
+        key: value
+        for key, value in dict.items()
+        if not key[:2] == "__" and key not in _derived_properties
+    }
 
 
-def deepcopy_and_evaluate(
+def copy_and_evaluate(
     postprocess_func: Metric, metric: Metric, sample_weight: WeightsDS, rolling: bool
 ) -> Metric:
-    postprocess_metric = deepcopy(postprocess_func)
+    postprocess_metric = postprocess_func.copy()
     postprocess_metric._evaluation(
         metric.result_rolling if rolling else metric.result, sample_weight=sample_weight
     )
@@ -55,11 +65,49 @@ class Group(Metric, Generic[MetricResult]):
         )
         self.key = key
         self.name = name
-        self.metrics = deepcopy(metrics)
+        self.metrics = [metric.copy() for metric in metrics]
         self.purpose = purpose
         if append_key:
             for metric in self.metrics:
                 metric.key = f"{metric.key}_{self.key}"
+        self.requires = self.__aggregate_requires()
+        self.comp_complexity = self.__aggregate_comp_complexity()
+
+    def copy(self) -> Group:
+        """A copy of the group, and of its metrics (see `Metric.copy`)."""
+        copied = super().copy()
+        copied.metrics = [metric.copy() for metric in self.metrics]
+        return copied
+
+    def set_read_only(self) -> Group:
+        """Makes the group, and its metrics, read-only (see `Metric.set_read_only`)."""
+        for metric in self.metrics:
+            metric.set_read_only()
+        return super().set_read_only()
+
+    def __aggregate_requires(self) -> List[Union[str, Intermediate]]:
+        """The intermediates required by the metrics of the group."""
+        requires: List[Union[str, Intermediate]] = []
+        for metric in self.metrics:
+            requires += [
+                requirement
+                for requirement in metric.requires
+                if requirement not in requires
+            ]
+        return requires
+
+    def __aggregate_comp_complexity(self) -> Optional[ComputationalComplexity]:
+        """The highest `comp_complexity` of the metrics of the group."""
+        complexities = [
+            metric.comp_complexity
+            for metric in self.metrics
+            if metric.comp_complexity is not None
+        ]
+        return (
+            max(complexities, key=scheduling_priority)
+            if len(complexities) > 0
+            else None
+        )
 
     def _preprocess(
         self,
@@ -67,14 +115,16 @@ class Group(Metric, Generic[MetricResult]):
         predictions: PredictionsDS,
         probabilities: ProbabilitiesDF,
         sample_weights: WeightsDS,
+        plan: Optional[WindowPlan] = None,
     ) -> Optional[Tuple]:
-        results = (
-            self.preprocess_func(
+        if self.preprocess_func is None:
+            results = None
+        elif plan is not None and isinstance(self.preprocess_func, SharedFunction):
+            results = plan.shared(self.preprocess_func, (y, predictions, probabilities))
+        else:
+            results = self.preprocess_func(
                 y, predictions, probabilities, sample_weights=sample_weights
             )
-            if self.preprocess_func is not None
-            else None
-        )
 
         if not isinstance(results, (list, tuple)) and results is not None:
             results = (results,)
@@ -144,10 +194,18 @@ class Group(Metric, Generic[MetricResult]):
         predictions: PredictionsDS,
         probabilities: ProbabilitiesDF,
         sample_weight: WeightsDS,
+        plan: Optional[WindowPlan] = None,
+        intermediates: Optional[Dict[str, Any]] = None,
     ) -> Group:
         if self.calculation == Calculation.rolling:
-            return deepcopy(self)
-        results = self._preprocess(y, predictions, probabilities, sample_weight)
+            return self.copy()
+        if len(self.requires) > 0 and intermediates is None:
+            intermediates = compute_intermediates(
+                self.requires, y, predictions, probabilities, sample_weight
+            )
+        results = self._preprocess(y, predictions, probabilities, sample_weight, plan)
+        if plan is not None:
+            plan = plan.for_inputs(y if results is None else results[0])
 
         def pass_in_args(metric: Metric) -> Metric:
             args_to_pass = self.__handle_args_to_pass_in(
@@ -161,6 +219,8 @@ class Group(Metric, Generic[MetricResult]):
                 metric = metric._evaluation(
                     *args_to_pass,
                     sample_weight=sample_weight,
+                    plan=plan,
+                    intermediates=intermediates,
                 )
             return metric
 
@@ -184,13 +244,18 @@ class Group(Metric, Generic[MetricResult]):
         predictions: PredictionsDS,
         probabilities: ProbabilitiesDF,
         sample_weight: WeightsDS,
-        rolling_args: Dict[str, Any],
+        rolling_args: Union[Dict[str, Any], List[Dict[str, Any]]],
+        n_jobs: int = 1,
+        plan: Optional[WindowPlan] = None,
     ) -> Group:
         if self.calculation == Calculation.single:
             return Group(
                 **filter_base_properties(self.__dict__) | {"metrics": self.metrics}
             )
-        results = self._preprocess(y, predictions, probabilities, sample_weight)
+        plan = WindowPlan(len(y), rolling_args, y.index) if plan is None else plan
+        results = self._preprocess(y, predictions, probabilities, sample_weight, plan)
+        # The metrics of the group share a plan over the preprocessed inputs
+        plan = plan.for_inputs(y if results is None else results[0])
 
         def pass_in_args(metric: Metric) -> Metric:
             args_to_pass = self.__handle_args_to_pass_in(
@@ -205,6 +270,8 @@ class Group(Metric, Generic[MetricResult]):
                     *args_to_pass,
                     sample_weight=sample_weight,
                     rolling_args=rolling_args,
+                    n_jobs=n_jobs,
+                    plan=plan,
                 )
             return metric
 
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from krisi.evaluate.rolling import SharedFunction, WindowPlan
+from krisi.evaluate.type import PredictionsDS, ProbabilitiesDF, TargetsDS, WeightsDS
+
+IntermediateFunction = Callable[..., Any]
+
+
+@dataclass(frozen=True)
+class Intermediate:
+    """
+    A named input (eg.: the residuals), that is computed once from the inputs of a
+    `ScoreCard` and passed, as a keyword argument, to every `Metric` that
+    `requires` it.
+
+    Parameters
+    ----------
+    name: str
+        The keyword argument it is passed as.
+    func: IntermediateFunction
+        Receives `y`, `predictions`, `probabilities`, `sample_weight` and the
+        intermediates it `requires`, as keyword arguments. If it is a
+        `SharedFunction` (and requires nothing), its result is also shared with the
+        `Metric`s that use the same `SharedFunction` directly.
+    requires: Tuple[Union[str, Intermediate], ...]
+        The intermediates it is computed from, either declared directly or referred
+        to by the name of one of `library_.intermediates.default_intermediates`,
+        by default ()
+    """
+
+    name: str
+    func: IntermediateFunction
+    requires: Tuple[Union[str, Intermediate], ...] = ()
+
+    def compute(
+        self,
+        y: TargetsDS,
+        predictions: Optional[PredictionsDS],
+        probabilities: Optional[ProbabilitiesDF],
+        sample_weight: Optional[WeightsDS],
+        computed: Dict[str, Any],
+    ) -> Any:
+        return self.func(
+            y,
+            predictions,
+            probabilities,
+            sample_weight,
+            **{
+                requirement.name: computed[requirement.name]
+                for requirement in resolve_requirements(self.requires)
+            },
+        )
+
+
+Requirements = Sequence[Union[str, Intermediate]]
+
+
+def resolve_requirements(requires: Requirements) -> List[Intermediate]:
+    """The `Intermediate`s of `requires`, with the names looked up."""
+    from krisi.evaluate.library_.intermediates import default_intermediates
+
+    resolved = []
+    for requirement in requires:
+        if isinstance(requirement, Intermediate):
+            resolved.append(requirement)
+        elif requirement in default_intermediates:
+            resolved.append(default_intermediates[requirement])
+        else:
+            raise ValueError(
+                f"Unknown intermediate `{requirement}`, it should be one of {list(default_intermediates.keys())} or an `Intermediate`."
+            )
+    return resolved
+
+
+def resolve_intermediates(requires: Requirements) -> List[Intermediate]:
+    """
+    Resolves the dependency graph of `requires`: every `Intermediate` needed, each
+    listed once, after the ones it is computed from.
+
+    Raises
+    ------
+    ValueError
+        If a name is unknown, if two different intermediates share a name, or if
+        the intermediates depend on each other in a cycle.
+    """
+    order: List[Intermediate] = []
+    by_name: Dict[str, Intermediate] = {}
+    visiting: List[str] = []
+
+    def visit(intermediate: Intermediate) -> None:
+        if intermediate.name in by_name:
+            if by_name[intermediate.name] != intermediate:
+                raise ValueError(
+                    f"Different intermediates are named `{intermediate.name}`."
+                )
+            return
+        if intermediate.name in visiting:
+            raise ValueError(
+                f"Intermediates depend on each other in a cycle: {' -> '.join(visiting + [intermediate.name])}"
+            )
+        visiting.append(intermediate.name)
+        for requirement in resolve_requirements(intermediate.requires):
+            visit(requirement)
+        visiting.pop()
+        by_name[intermediate.name] = intermediate
+        order.append(intermediate)
+
+    for intermediate in resolve_requirements(requires):
+        visit(intermediate)
+    return order
+
+
+def compute_intermediates(
+    requires: Requirements,
+    y: TargetsDS,
+    predictions: Optional[PredictionsDS],
+    probabilities: Optional[ProbabilitiesDF],
+    sample_weight: Optional[WeightsDS],
+) -> Dict[str, Any]:
+    """Computes the intermediates `requires` (and the ones they depend on)."""
+    computed: Dict[str, Any] = {}
+    for intermediate in resolve_intermediates(requires):
+        computed[intermediate.name] = intermediate.compute(
+            y, predictions, probabilities, sample_weight, computed
+        )
+    return computed
+
+
+def get_required(
+    requires: Requirements, intermediates: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """The intermediates declared directly in `requires`, keyed by their name."""
+    if len(requires) == 0:
+        return {}
+    if intermediates is None:
+        raise ValueError("The required intermediates were not computed.")
+    return {
+        intermediate.name: intermediates[intermediate.name]
+        for intermediate in resolve_requirements(requires)
+    }
+
+
+class IntermediateCache:
+    """
+    The intermediates required by the `Metric`s of one evaluation. Each is computed
+    once, when it is first acquired, and freed as soon as the last `Metric` that
+    requires it (directly or through another intermediate) has released it.
+
+    Parameters
+    ----------
+    consumers : List[Requirements]
+        What each `Metric` of the evaluation requires, as they will be acquired.
+    y : TargetsDS
+    predictions : Optional[PredictionsDS]
+    probabilities : Optional[ProbabilitiesDF]
+    sample_weight : Optional[WeightsDS]
+    plan : Optional[WindowPlan]
+        Shares the result of `SharedFunction`s, by default None
+    """
+
+    def __init__(
+        self,
+        consumers: List[Requirements],
+        y: TargetsDS,
+        predictions: Optional[PredictionsDS],
+        probabilities: Optional[ProbabilitiesDF],
+        sample_weight: Optional[WeightsDS],
+        plan: Optional[WindowPlan] = None,
+    ) -> None:
+        self.inputs = (y, predictions, probabilities, sample_weight)
+        self.plan = plan
+        self.computed: Dict[str, Any] = {}
+        # Validates the whole graph upfront
+        resolve_intermediates([req for requires in consumers for req in requires])
+        self.num_consumers: Dict[str, int] = {}
+        for requires in consumers:
+            for intermediate in resolve_intermediates(requires):
+                self.num_consumers[intermediate.name] = (
+                    self.num_consumers.get(intermediate.name, 0) + 1
+                )
+
+    def acquire(self, requires: Requirements) -> Dict[str, Any]:
+        """The intermediates `requires` (and the ones they depend on)."""
+        for intermediate in resolve_intermediates(requires):
+            if intermediate.name in self.computed:
+                continue
+            if (
+                self.plan is not None
+                and isinstance(intermediate.func, SharedFunction)
+                and len(intermediate.requires) == 0
+            ):
+                self.computed[intermediate.name] = self.plan.shared(
+                    intermediate.func, self.inputs[:3]
+                )
+            else:
+                self.computed[intermediate.name] = intermediate.compute(
+                    *self.inputs, self.computed
+                )
+        return {
+            intermediate.name: self.computed[intermediate.name]
+            for intermediate in resolve_intermediates(requires)
+        }
+
+    def release(self, requires: Requirements) -> None:
+        """Frees the intermediates of `requires` that are not required anymore."""
+        for intermediate in resolve_intermediates(requires):
+            self.num_consumers[intermediate.name] -= 1
+            if self.num_consumers[intermediate.name] <= 0:
+                self.computed.pop(intermediate.name, None)
@@ -6,11 +6,22 @@ from typing import Optional, Tuple, Union
 import numpy as np
 import pandas as pd
 
-from krisi.utils.data import generate_synthetic_predictions_binary, shuffle_df_in_chunks
+from krisi.utils.data import (
+    generate_synthetic_predictions_binary,
+    generate_synthetic_predictions_binary_batch,
+    shuffle_df_in_chunks,
+    shuffled_chunk_positions,
+)
 
 from ..type import Model, WeightsDS
 
 
+def _repeat(data: Union[pd.Series, pd.DataFrame], n_iter: int) -> np.ndarray:
+    """The values of a deterministic prediction, repeated (without copying) `n_iter` times."""
+    values = data.to_numpy()
+    return np.broadcast_to(values, (n_iter,) + values.shape)
+
+
 class RandomClassifier(Model):
     def __init__(self) -> None:
         self.name = "NS"
@@ -23,34 +34,63 @@ class RandomClassifier(Model):
         probabilities = preds_probs.iloc[:, 1:3]
         return predictions, probabilities
 
+    def predict_batch(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        sample_weight: Optional[WeightsDS] = None,
+        n_iter: int = 1,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        return generate_synthetic_predictions_binary_batch(
+            y, sample_weight, n_iter, rng=rng
+        )
+
 
 class RandomClassifierSmoothed(Model):
     def __init__(self, smoothing_window: Optional[int] = None) -> None:
         self.name = "NS-Smooth"
         self.smoothing_window = smoothing_window
 
-    def predict(
-        self, X: pd.DataFrame, y: pd.Series, sample_weight: Optional[WeightsDS] = None
-    ) -> Tuple[pd.Series, pd.DataFrame]:
+    def get_smoothing_window(self, y: pd.Series) -> int:
         def get_avarage_change_length(ds: pd.Series) -> float:
             # This only works for binary classification
             indices = ds.diff().fillna(0).ne(0).cumsum()
             differences = indices.groupby(indices).size()
             return differences.mean()
 
-        smoothing_window = (
+        return (
             math.floor(get_avarage_change_length(y))
             if self.smoothing_window is None
             else self.smoothing_window
         )
 
+    def predict(
+        self, X: pd.DataFrame, y: pd.Series, sample_weight: Optional[WeightsDS] = None
+    ) -> Tuple[pd.Series, pd.DataFrame]:
         preds_probs = generate_synthetic_predictions_binary(
-            y, sample_weight, smoothing_window=smoothing_window
+            y, sample_weight, smoothing_window=self.get_smoothing_window(y)
         )
         predictions = preds_probs.iloc[:, 0]
         probabilities = preds_probs.iloc[:, 1:3]
         return predictions, probabilities
 
+    def predict_batch(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        sample_weight: Optional[WeightsDS] = None,
+        n_iter: int = 1,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        return generate_synthetic_predictions_binary_batch(
+            y,
+            sample_weight,
+            n_iter,
+            smoothing_window=self.get_smoothing_window(y),
+            rng=rng,
+        )
+
 
 class RandomClassifierChunked(Model):
     def __init__(self, chunk_size: Union[float, int]) -> None:
@@ -68,6 +108,20 @@ class RandomClassifierChunked(Model):
         probabilities = X.iloc[:, 1:3]
         return predictions, probabilities
 
+    def predict_batch(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        sample_weight: Optional[WeightsDS] = None,
+        n_iter: int = 1,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        positions = shuffled_chunk_positions(len(X), self.chunk_size, n_iter, rng)
+        return (
+            X.iloc[:, 0].to_numpy()[positions],
+            X.iloc[:, 1:3].to_numpy()[positions],
+        )
+
 
 class PerfectModel(Model):
     def __init__(self) -> None:
@@ -80,6 +134,17 @@ class PerfectModel(Model):
         probabilities = pd.get_dummies(y, dtype=float)
         return predictions, probabilities
 
+    def predict_batch(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        sample_weight: Optional[WeightsDS] = None,
+        n_iter: int = 1,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        predictions, probabilities = self.predict(X, y, sample_weight)
+        return _repeat(predictions, n_iter), _repeat(probabilities, n_iter)
+
 
 class WorstModel(Model):
     def __init__(self) -> None:
@@ -92,6 +157,17 @@ class WorstModel(Model):
         probabilities = pd.get_dummies(predictions, dtype=float)
         return predictions, probabilities
 
+    def predict_batch(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        sample_weight: Optional[WeightsDS] = None,
+        n_iter: int = 1,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        predictions, probabilities = self.predict(X, y, sample_weight)
+        return _repeat(predictions, n_iter), _repeat(probabilities, n_iter)
+
 
 class ModelRegistry:
     RandomClassifier = RandomClassifier
@@ -6,14 +6,13 @@ from sklearn.metrics import (
     balanced_accuracy_score,
     cohen_kappa_score,
     f1_score,
-    log_loss,
     matthews_corrcoef,
     precision_score,
     recall_score,
 )
 
 from ..metric import Metric
-from ..type import MetricCategories, Purpose
+from ..type import ComputationalComplexity, MetricCategories, Purpose
 from .diagrams import (
     callibration_plot,
     display_density_plot,
@@ -25,9 +24,22 @@ from .metric_wrappers import (
     pred_y_imbalance_ratio,
     wrap_avg_precision,
     wrap_brier_score,
+    wrap_log_loss,
     wrap_roc_auc,
     y_label_imbalance_ratio,
 )
+from .rolling_wrappers import (
+    accuracy_rolling,
+    avg_precision_rolling,
+    balanced_accuracy_rolling,
+    f_one_score_rolling,
+    kappa_rolling,
+    matthew_corr_rolling,
+    precision_rolling,
+    recall_rolling,
+    roc_auc_rolling,
+    s_score_rolling,
+)
 
 accuracy_binary = Metric[float](
     name="Accuracy",
@@ -35,6 +47,7 @@ accuracy_binary = Metric[float](
     category=MetricCategories.class_err,
     info="In multilabel classification, this function computes subset accuracy: the set of labels predicted for a sample must exactly match the corresponding set of labels in y_true. https://scikit-learn.org/stable/modules/generated/sklearn.metrics.accuracy_score.html",
     func=accuracy_score,
+    func_rolling=accuracy_rolling,
     plot_funcs=[(display_single_value, dict(width=750.0))],
     plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
     purpose=Purpose.objective,
@@ -46,6 +59,7 @@ accuracy_binary_balanced = Metric[float](
     category=MetricCategories.class_err,
     info="Compute the balanced accuracy. The balanced accuracy in binary and multiclass classification problems to deal with imbalanced datasets. It is defined as the average of recall obtained on each class.",
     func=balanced_accuracy_score,
+    func_rolling=balanced_accuracy_rolling,
     plot_funcs=[(display_single_value, dict(width=750.0))],
     plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
     purpose=Purpose.objective,
@@ -60,6 +74,7 @@ recall_binary, recall_macro = [
         info="The recall is the ratio tp / (tp + fn) where tp is the number of true positives and fn the number of false negatives. The recall is intuitively the ability of the classifier to find all the positive samples.\nThe best value is 1 and the worst value is 0. https://scikit-learn.org/stable/modules/generated/sklearn.metrics.recall_score.html",
         parameters={"average": mode},
         func=recall_score,
+        func_rolling=recall_rolling,
         plot_funcs=[(display_single_value, dict(width=750.0))],
         plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
         purpose=Purpose.objective,
@@ -75,6 +90,7 @@ precision_binary, precision_macro = [
         info="The precision is the ratio tp / (tp + fp) where tp is the number of true positives and fp the number of false positives. The precision is intuitively the ability of the classifier not to label as positive a sample that is negative.\nThe best value is 1 and the worst value is 0. https://scikit-learn.org/stable/modules/generated/sklearn.metrics.precision_score.html",
         parameters={"average": mode},
         func=precision_score,
+        func_rolling=precision_rolling,
         plot_funcs=[(display_single_value, dict(width=750.0))],
         plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
         purpose=Purpose.objective,
@@ -88,6 +104,7 @@ kappa = Metric[float](
     category=MetricCategories.class_err,
     info="Compute Cohen’s kappa: a statistic that measures inter-annotator agreement. This function computes Cohen’s kappa [1], a score that expresses the level of agreement between two annotators on a classification problem. ",
     func=cohen_kappa_score,
+    func_rolling=kappa_rolling,
     plot_funcs=[(display_single_value, dict(width=750.0))],
     plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
     purpose=Purpose.objective,
@@ -103,6 +120,7 @@ f_one_score_binary, f_one_score_macro, f_one_score_micro, f_one_score_weighted =
         info="The F1 score can be interpreted as a harmonic mean of the precision and recall, where an F1 score reaches its best value at 1 and worst score at 0. The relative contribution of precision and recall to the F1 score are equal. https://scikit-learn.org/stable/modules/generated/sklearn.metrics.f1_score.html",
         parameters={"average": mode},
         func=f1_score,
+        func_rolling=f_one_score_rolling,
         plot_funcs=[(display_single_value, dict(width=750.0))],
         plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
         supports_multiclass=True,
@@ -117,6 +135,7 @@ matthew_corr = Metric[float](
     category=MetricCategories.class_err,
     info="The Matthews correlation coefficient is used in machine learning as a measure of the quality of binary and multiclass classifications. It takes into account true and false positives and negatives and is generally regarded as a balanced measure which can be used even if the classes are of very different sizes. The MCC is in essence a correlation coefficient value between -1 and +1. A coefficient of +1 represents a perfect prediction, 0 an average random prediction and -1 an inverse prediction. The statistic is also known as the phi coefficient.",
     func=matthews_corrcoef,
+    func_rolling=matthew_corr_rolling,
     plot_funcs=[(display_single_value, dict(width=750.0))],
     plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
     purpose=Purpose.objective,
@@ -158,6 +177,8 @@ s_score = Metric[float](
     category=MetricCategories.class_err,
     info="the 𝑆 score first proposed by Bennett, Alpert, & Goldstein (1954). It assumes a 50% probability of classifying any given item into its correct class 'by chance' alone and discounts this from the final score. It also uses all cells of the confusion matrix (unlike 𝐹1 which ignores 𝑑 or the number of 'true negatives')",
     func=bennet_s,
+    func_rolling=s_score_rolling,
+    requires=["confusion_matrix"],
     plot_funcs=[(display_single_value, dict(width=750.0))],
     plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
     accepts_probabilities=False,
@@ -174,9 +195,7 @@ cross_entropy = Metric[float](
     key="cross_entropy",
     category=MetricCategories.class_err,
     info="Log loss, aka logistic loss or cross-entropy loss. This is the loss function used in (multinomial) logistic regression and extensions of it such as neural networks, defined as the negative log-likelihood of a logistic model that returns y_pred probabilities for its training data y_true.",
-    func=lambda y, prob, **kwargs: log_loss(
-        y, prob, labels=list(prob.columns), **kwargs
-    ),
+    func=wrap_log_loss,
     plot_funcs=[
         (display_single_value, dict(width=750.0)),
         (display_density_plot, dict(width=1500.0)),
@@ -198,12 +217,15 @@ roc_auc_binary_micro, roc_auc_binary_macro, roc_auc_binary_weighted = [
         category=MetricCategories.class_err,
         info="Compute Area Under the Receiver Operating Characteristic Curve (ROC AUC) from prediction scores. Note: this implementation can be used with binary, multiclass and multilabel classification, but some restrictions apply (see Parameters). https://scikit-learn.org/stable/modules/generated/sklearn.metrics.roc_auc_score.html",
         func=wrap_roc_auc,
+        func_rolling=roc_auc_rolling,
+        requires=["sorted_scores"],
         parameters={"average": mode},
         plot_funcs=[(display_single_value, dict(width=750.0))],
         plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
         accepts_probabilities=True,
         supports_multiclass=True,
         purpose=Purpose.objective,
+        comp_complexity=ComputationalComplexity.high,
     )
     for mode in ["micro", "macro", "weighted"]
 ]
@@ -217,12 +239,14 @@ roc_auc_multi_micro, roc_auc_multi_macro = [
         category=MetricCategories.class_err,
         info="Compute Area Under the Receiver Operating Characteristic Curve (ROC AUC) from prediction scores. Note: this implementation can be used with binary, multiclass and multilabel classification, but some restrictions apply (see Parameters). https://scikit-learn.org/stable/modules/generated/sklearn.metrics.roc_auc_score.html",
         func=wrap_roc_auc,
+        requires=["sorted_scores"] + (["one_hot_targets"] if mode == "micro" else []),
         parameters={"average": mode, "multi_class": "ovr"},
         plot_funcs=[(display_single_value, dict(width=750.0))],
         plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
         accepts_probabilities=True,
         supports_multiclass=True,
         purpose=Purpose.objective,
+        comp_complexity=ComputationalComplexity.high,
     )
     for mode in ["micro", "macro"]
 ]
@@ -234,12 +258,15 @@ avg_precision_micro, avg_precision_macro, avg_precision_weighted = [
         category=MetricCategories.class_err,
         info="Compute average precision (AP) from prediction scores. AP summarizes a precision-recall curve as the weighted mean of precisions achieved at each threshold, with the increase in recall from the previous threshold used as the weight. https://scikit-learn.org/stable/modules/generated/sklearn.metrics.average_precision_score.html#sklearn.metrics.average_precision_score",
         func=wrap_avg_precision,
+        func_rolling=avg_precision_rolling,
+        requires=["sorted_scores"],
         parameters={"average": mode},
         plot_funcs=[(display_single_value, dict(width=750.0))],
         plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
         accepts_probabilities=True,
         supports_multiclass=True,
         purpose=Purpose.objective,
+        comp_complexity=ComputationalComplexity.high,
     )
     for mode in ["micro", "macro", "weighted"]
 ]
@@ -20,6 +20,16 @@ from .diagrams import (
     display_single_value,
     display_time_series,
 )
+from .metric_wrappers import calculate_residuals
+from .rolling_wrappers import (
+    mae_rolling,
+    mape_rolling,
+    mse_rolling,
+    r_two_rolling,
+    residuals_mean_rolling,
+    residuals_std_rolling,
+    smape_rolling,
+)
 
 mae = Metric[float](
     name="Mean Absolute Error",
@@ -27,6 +37,7 @@ mae = Metric[float](
     category=MetricCategories.reg_err,
     info="(Mean absolute error) represents the difference between the original and predicted values extracted by averaged the absolute difference over the data set.",
     func=lambda y, pred, **kwargs: mean_absolute_error(y, pred, **kwargs),
+    func_rolling=mae_rolling,
     plot_funcs=[(display_single_value, dict(width=900.0))],
     plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
     purpose=Purpose.loss,
@@ -38,6 +49,7 @@ mape = Metric[float](
     key="mape",
     category=MetricCategories.reg_err,
     func=lambda y, pred, **kwargs: mean_absolute_percentage_error(y, pred, **kwargs),
+    func_rolling=mape_rolling,
     plot_funcs=[(display_single_value, dict(width=900.0))],
     plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
     purpose=Purpose.loss,
@@ -51,6 +63,7 @@ smape = Metric[float](
     func=lambda y_true, y_pred, **kwargs: np.mean(
         np.abs(y_pred - y_true) / (np.abs(y_true) + np.abs(y_pred)), axis=0
     ),
+    func_rolling=smape_rolling,
     plot_funcs=[(display_single_value, dict(width=900.0))],
     plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
     purpose=Purpose.loss,
@@ -64,6 +77,7 @@ mse = Metric[float](
     info="(Mean Squared Error) represents the difference between the original and predicted values extracted by squared the average difference over the data set.",
     parameters={"squared": True},
     func=lambda y, pred, **kwargs: mean_squared_error(y, pred, **kwargs),
+    func_rolling=mse_rolling,
     plot_funcs=[(display_single_value, dict(width=900.0))],
     plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
     purpose=Purpose.loss,
@@ -77,6 +91,7 @@ rmse = Metric[float](
     info="(Root Mean Squared Error) is the error rate by the square root of Mean Squared Error.",
     parameters={"squared": False},
     func=lambda y, pred, **kwargs: mean_squared_error(y, pred, **kwargs),
+    func_rolling=mse_rolling,
     plot_funcs=[(display_single_value, dict(width=900.0))],
     plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
     purpose=Purpose.loss,
@@ -101,6 +116,7 @@ r_two = Metric[float](
     category=MetricCategories.reg_err,
     info="(Coefficient of determination) represents the coefficient of how well the values fit compared to the original values. The value from 0 to 1 interpreted as percentages. The higher the value is, the better the model is.",
     func=lambda y, pred, **kwargs: r2_score(y, pred, **kwargs),
+    func_rolling=r_two_rolling,
     plot_funcs=[(display_single_value, dict(width=900.0))],
     plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
     purpose=Purpose.objective,
@@ -111,7 +127,7 @@ residuals = Metric[List[float]](
     name="Residuals",
     key="residuals",
     category=MetricCategories.residual,
-    func=lambda y, pred, **kwargs: y - pred,
+    func=calculate_residuals,
     plot_funcs=[
         (display_acf_plot, dict(width=1500.0)),
         (display_density_plot, dict(width=1500.0)),
@@ -127,6 +143,7 @@ residuals_mean = Metric[float](
     key="residuals_mean",
     category=MetricCategories.residual,
     func=lambda res, *args, **kwargs: res.mean(),
+    func_rolling=residuals_mean_rolling,
     plot_funcs=[(display_single_value, dict(width=900.0))],
     plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
     purpose=Purpose.diagram,
@@ -138,6 +155,7 @@ residuals_std = Metric[float](
     key="residuals_std",
     category=MetricCategories.residual,
     func=lambda res, **kwargs: res.std(),
+    func_rolling=residuals_std_rolling,
     plot_funcs=[(display_single_value, dict(width=900.0))],
     plot_funcs_rolling=(display_time_series, dict(width=1500.0)),
     purpose=Purpose.diagram,
@@ -161,7 +179,7 @@ residual_group = Group[pd.Series](
     name="residual_group",
     key="residual_group",
     metrics=[residuals_mean, residuals_std],
-    preprocess_func=lambda y, pred, prob, **kwargs: y - pred,
+    preprocess_func=calculate_residuals,
     purpose=Purpose.group,
 )
 """ ~ """
@@ -200,17 +218,17 @@ low_computation_regression_metrics = [
 
 class RegressionRegistry:
     def __init__(self) -> None:
-        self.mae = mae
-        self.mape = mape
-        self.smape = smape
-        self.mse = mse
-        self.rmse = rmse
-        self.rmsle = rmsle
-        self.r_two = r_two
-        self.residuals = residuals
-        self.residuals_mean = residuals_mean
-        self.residuals_std = residuals_std
-        self.residual_group = residual_group
+        self.mae = deepcopy(mae)
+        self.mape = deepcopy(mape)
+        self.smape = deepcopy(smape)
+        self.mse = deepcopy(mse)
+        self.rmse = deepcopy(rmse)
+        self.rmsle = deepcopy(rmsle)
+        self.r_two = deepcopy(r_two)
+        self.residuals = deepcopy(residuals)
+        self.residuals_mean = deepcopy(residuals_mean)
+        self.residuals_std = deepcopy(residuals_std)
+        self.residual_group = deepcopy(residual_group)
 
         self.all_regression_metrics = deepcopy(all_regression_metrics)
         self.minimal_regression_metrics = deepcopy(minimal_regression_metrics)
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, List, Tuple
+from typing import TYPE_CHECKING, List, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -10,17 +10,18 @@ if TYPE_CHECKING:
 from ..type import MetricResult
 
 
-def display_time_series(data: List[MetricResult], **kwargs) -> "go.Figure":
+def display_time_series(
+    data: Union[List[MetricResult], pd.Series], **kwargs
+) -> "go.Figure":
     import plotly.express as px
 
     title = kwargs.get("title", "")
-    df = pd.DataFrame(data, columns=[title])
-    df["iteration"] = list(range(len(data)))
-    fig = px.line(
-        df,
-        x="iteration",
-        y=title,
-    )
+    if isinstance(data, pd.Series) and isinstance(data.index, pd.MultiIndex):
+        # Indexed by the windows (see `Metric.get_rolling_series`)
+        x, x_title = data.index.get_level_values("window_end"), "window_end"
+    else:
+        x, x_title = np.arange(len(data)), "iteration"
+    fig = px.line(x=x, y=np.asarray(data), labels=dict(x=x_title, y=title))
     return fig
 
 
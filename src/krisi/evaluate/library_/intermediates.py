@@ -0,0 +1,46 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..intermediate import Intermediate
+from ..type import PredictionsDS, ProbabilitiesDF, TargetsDS, WeightsDS
+from .metric_wrappers import SortedScores, _confusion_matrix, calculate_residuals
+
+
+def _one_hot_targets(
+    y: TargetsDS,
+    predictions: Optional[PredictionsDS],
+    probabilities: Optional[ProbabilitiesDF],
+    sample_weight: Optional[WeightsDS],
+    **kwargs,
+) -> pd.DataFrame:
+    """One column per label of the targets, in sorted order."""
+    return pd.get_dummies(y, dtype=np.float64)
+
+
+def _sorted_scores(
+    y: TargetsDS,
+    predictions: Optional[PredictionsDS],
+    probabilities: Optional[ProbabilitiesDF],
+    sample_weight: Optional[WeightsDS],
+    **kwargs,
+) -> Optional[SortedScores]:
+    """
+    The probabilities of each class sorted from highest to lowest, with the groups
+    of tied scores, sorted lazily (once per class) by the ranking based metrics.
+    """
+    if probabilities is None:
+        return None
+    return SortedScores(y, probabilities, sample_weight)
+
+
+residuals = Intermediate("residuals", calculate_residuals)
+confusion_matrix = Intermediate("confusion_matrix", _confusion_matrix)
+one_hot_targets = Intermediate("one_hot_targets", _one_hot_targets)
+sorted_scores = Intermediate("sorted_scores", _sorted_scores)
+
+default_intermediates: Dict[str, Intermediate] = {
+    intermediate.name: intermediate
+    for intermediate in [residuals, confusion_matrix, one_hot_targets, sorted_scores]
+}
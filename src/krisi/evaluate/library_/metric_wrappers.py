@@ -1,15 +1,16 @@
 import logging
-from typing import Any, Optional, Tuple, Union
+from typing import Any, Dict, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 from sklearn.metrics import (
     average_precision_score,
     brier_score_loss,
-    confusion_matrix,
+    log_loss,
     roc_auc_score,
 )
 
+from ..rolling import SharedFunction
 from ..type import Predictions, PredictionsDS, ProbabilitiesDF, TargetsDS, WeightsDS
 
 logger = logging.getLogger("krisi")
@@ -26,18 +27,232 @@ def wrap_brier_score(
     )
 
 
+def _sort_descending(scores: np.ndarray) -> np.ndarray:
+    """The order of `scores` from the highest to the lowest, keeping ties in order."""
+    return np.argsort(-scores, kind="stable")
+
+
+class SortedScores:
+    """
+    The probabilities of each class sorted from the highest to the lowest, with
+    the groups of tied scores (the thresholds of the ROC and precision-recall
+    curves). Each class is sorted once, when it is first needed, and shared by the
+    ranking based metrics of an evaluation.
+
+    Parameters
+    ----------
+    y : TargetsDS
+    probabilities : ProbabilitiesDF
+    sample_weight : Optional[WeightsDS]
+    """
+
+    def __init__(
+        self,
+        y: TargetsDS,
+        probabilities: ProbabilitiesDF,
+        sample_weight: Optional[WeightsDS],
+    ) -> None:
+        self.inputs = (y, probabilities, sample_weight)
+        self.y = np.asarray(y)
+        self.scores = np.asarray(probabilities)
+        self.sample_weight = (
+            None if sample_weight is None else np.asarray(sample_weight)
+        )
+        self.__labels: Optional[np.ndarray] = None
+        self.__sorted: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @staticmethod
+    def of(
+        y: TargetsDS,
+        probabilities: ProbabilitiesDF,
+        sample_weight: Optional[WeightsDS],
+        sorted_scores: Optional["SortedScores"],
+    ) -> "SortedScores":
+        """`sorted_scores` if it was computed from these inputs, otherwise new ones."""
+        if sorted_scores is not None and all(
+            a is b
+            for a, b in zip(sorted_scores.inputs, (y, probabilities, sample_weight))
+        ):
+            return sorted_scores
+        return SortedScores(y, probabilities, sample_weight)
+
+    @property
+    def labels(self) -> np.ndarray:
+        """The unique labels of the targets."""
+        if self.__labels is None:
+            self.__labels = np.unique(self.y)
+        return self.__labels
+
+    @property
+    def is_rankable(self) -> bool:
+        """
+        Whether the curves can be computed here: the targets are not missing, the
+        scores are finite numbers and no sample is weighted zero (which `sklearn`
+        drops before ranking).
+        """
+        return (
+            not (np.issubdtype(self.y.dtype, np.floating) and np.isnan(self.y).any())
+            and self.scores.ndim == 2
+            and np.issubdtype(self.scores.dtype, np.number)
+            and bool(np.isfinite(self.scores).all())
+            and (self.sample_weight is None or bool((self.sample_weight > 0).all()))
+        )
+
+    def ranking(self, column: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The order of the samples by the scores of the `column`-th class, from the
+        highest to the lowest, and whether each (sorted) sample is the last of its
+        group of tied scores. Both are kept in the narrowest dtype, as one of each
+        is cached per class.
+        """
+        if column not in self.__sorted:
+            order = _sort_descending(self.scores[:, column])
+            if len(order) <= np.iinfo(np.int32).max:
+                order = order.astype(np.int32)
+            sorted_scores = self.scores[order, column]
+            is_last = np.r_[sorted_scores[1:] != sorted_scores[:-1], True]
+            self.__sorted[column] = (order, is_last)
+        return self.__sorted[column]
+
+    def curve(self, column: int, positive: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The (weighted) number of false and true positives when thresholding the
+        scores of the `column`-th class at each of their distinct values, from the
+        highest to the lowest.
+        """
+        order, is_last = self.ranking(column)
+        lasts = np.flatnonzero(is_last)
+        positive = positive[order]
+        if self.sample_weight is None:
+            tps = np.cumsum(positive, dtype=np.float64)[lasts]
+            return lasts + 1 - tps, tps
+        # Accumulated in float64, even if the weights are narrower (eg.: float32)
+        weight = self.sample_weight[order]
+        return (
+            np.cumsum(np.where(positive, 0, weight), dtype=np.float64)[lasts],
+            np.cumsum(np.where(positive, weight, 0), dtype=np.float64)[lasts],
+        )
+
+    def roc_auc(self, column: int, positive: np.ndarray) -> float:
+        fps, tps = self.curve(column, positive)
+        if len(fps) > 2:
+            # Drops the points collinear with their neighbours, like `roc_curve`
+            corners = np.flatnonzero(
+                np.r_[True, np.logical_or(np.diff(fps, 2), np.diff(tps, 2)), True]
+            )
+            fps, tps = fps[corners], tps[corners]
+        fpr, tpr = np.r_[0, fps] / fps[-1], np.r_[0, tps] / tps[-1]
+        # The trapezoidal rule (`np.trapz` is deprecated from numpy 2)
+        return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1])) / 2)
+
+    def average_precision(self, column: int, positive: np.ndarray) -> float:
+        fps, tps = self.curve(column, positive)
+        predicted = tps + fps
+        precision = np.divide(
+            tps, predicted, out=np.zeros_like(tps), where=predicted != 0
+        )
+        precision, recall = np.r_[precision[::-1], 1], np.r_[tps[::-1] / tps[-1], 0]
+        return float(-np.sum(np.diff(recall) * precision[:-1]))
+
+
+def _sorted_roc_auc(
+    sorted_scores: SortedScores,
+    average: Optional[str] = "macro",
+    multi_class: str = "raise",
+    max_fpr: Optional[float] = None,
+    one_hot_targets: Optional[pd.DataFrame] = None,
+    **kwargs,
+) -> Optional[float]:
+    """
+    ROC AUC from `sorted_scores` (and from `one_hot_targets` for the micro average
+    of multiclass inputs), or None if the inputs or the parameters are not
+    supported (left to `sklearn`, to compute or raise about).
+    """
+    if len(kwargs) > 0 or max_fpr is not None or not sorted_scores.is_rankable:
+        return None
+    labels, num_classes = sorted_scores.labels, sorted_scores.scores.shape[1]
+    if num_classes == 2:
+        if len(labels) != 2:
+            return None
+        return sorted_scores.roc_auc(1, sorted_scores.y == labels[-1])
+
+    classes = np.arange(num_classes)
+    if (
+        multi_class != "ovr"
+        or average
+        not in ["macro", "weighted"] + ([] if one_hot_targets is None else ["micro"])
+        or len(labels) != num_classes
+        or not np.isin(labels, classes).all()
+        or not np.allclose(1, sorted_scores.scores.sum(axis=1))
+    ):
+        return None
+    if average == "micro":
+        # Every class against the rest, as one binary problem, like `sklearn`
+        stacked = SortedScores(
+            one_hot_targets.to_numpy().ravel(),
+            sorted_scores.scores.reshape(-1, 1),
+            None
+            if sorted_scores.sample_weight is None
+            else np.repeat(sorted_scores.sample_weight, num_classes),
+        )
+        return stacked.roc_auc(0, stacked.y == 1)
+    scores, weights = np.zeros(num_classes), np.zeros(num_classes)
+    for column in classes:
+        positive = sorted_scores.y == column
+        scores[column] = sorted_scores.roc_auc(column, positive)
+        weights[column] = (
+            positive.sum()
+            if sorted_scores.sample_weight is None
+            else sorted_scores.sample_weight[positive].sum(dtype=np.float64)
+        )
+    if average == "macro":
+        return float(np.average(scores))
+    if np.isclose(weights.sum(), 0.0):
+        return 0.0
+    return float(np.average(scores, weights=weights))
+
+
+def _sorted_average_precision(
+    sorted_scores: SortedScores,
+    average: Optional[str] = "macro",
+    pos_label: Any = 1,
+    **kwargs,
+) -> Optional[float]:
+    """
+    Average precision from `sorted_scores`, or None if the inputs or the
+    parameters are not supported (left to `sklearn`, to compute or raise about).
+    """
+    if (
+        len(kwargs) > 0
+        or not sorted_scores.is_rankable
+        or sorted_scores.scores.shape[1] != 2
+        or len(sorted_scores.labels) != 2
+        or not np.issubdtype(sorted_scores.labels.dtype, np.number)
+        or pos_label not in sorted_scores.labels
+    ):
+        return None
+    return sorted_scores.average_precision(1, sorted_scores.y == pos_label)
+
+
 def wrap_roc_auc(
     y: TargetsDS,
     probs: ProbabilitiesDF,
     sample_weight: Optional[WeightsDS],
+    sorted_scores: Optional[SortedScores] = None,
+    one_hot_targets: Optional[pd.DataFrame] = None,
     **kwargs,
 ) -> float:
+    sorted_scores = SortedScores.of(y, probs, sample_weight, sorted_scores)
+    if len(sorted_scores.labels) == 1:
+        return "ROC AUC only works with more than one class."
+    result = _sorted_roc_auc(sorted_scores, one_hot_targets=one_hot_targets, **kwargs)
+    if result is not None:
+        return result
+
     probs = probs.rename(columns={col: i for i, col in enumerate(probs.columns)})
     prob_columns = list(probs.columns)
     if len(prob_columns) == 2:
         probs = probs.iloc[:, 1]
-    if len(np.unique(y)) == 1:
-        return "ROC AUC only works with more than one class."
 
     return roc_auc_score(
         y_true=y,
@@ -52,8 +267,15 @@ def wrap_avg_precision(
     y: TargetsDS,
     probs: ProbabilitiesDF,
     sample_weight: Optional[WeightsDS],
+    sorted_scores: Optional[SortedScores] = None,
     **kwargs,
 ) -> float:
+    result = _sorted_average_precision(
+        SortedScores.of(y, probs, sample_weight, sorted_scores), **kwargs
+    )
+    if result is not None:
+        return result
+
     probs = probs.rename(columns={col: i for i, col in enumerate(probs.columns)})
     prob_columns = list(probs.columns)
     if len(prob_columns) == 2:
@@ -67,10 +289,94 @@ def wrap_avg_precision(
     )
 
 
+def _chunked_log_loss(
+    y: TargetsDS,
+    probs: ProbabilitiesDF,
+    sample_weight: Optional[WeightsDS],
+    chunk_size: int = 2**16,
+    **kwargs,
+) -> Optional[float]:
+    """
+    Log loss, going through the probabilities in chunks of rows, so that only the
+    probability of the target of each sample is kept, in the dtype of the
+    probabilities (as `sklearn` computes it). None if the inputs or the parameters
+    are not supported (left to `sklearn`, to compute or raise about).
+    """
+    scores, y_ = np.asarray(probs), np.asarray(y)
+    classes = np.unique(np.asarray(probs.columns))
+    if (
+        len(kwargs) > 0
+        or scores.ndim != 2
+        or scores.dtype.kind != "f"
+        or len(classes) != scores.shape[1]
+        or len(classes) < 2
+        or y_.dtype.kind not in "biuf"
+        or classes.dtype.kind not in "biuf"
+    ):
+        return None
+    # Column `i` holds the probabilities of the `i`-th smallest label
+    codes = np.minimum(np.searchsorted(classes, y_), len(classes) - 1)
+    if not (classes[codes] == y_).all():
+        return None
+
+    eps = np.finfo(scores.dtype).eps
+    loss = np.empty(len(scores), dtype=scores.dtype)
+    for start in range(0, len(scores), chunk_size):
+        chunk = scores[start : start + chunk_size]
+        if not np.isfinite(chunk).all():
+            return None
+        chunk = np.clip(chunk, eps, 1 - eps)
+        sums = chunk.sum(axis=1)
+        if not np.isclose(sums, 1, rtol=1e-15, atol=5 * eps).all():
+            return None
+        loss[start : start + chunk_size] = -np.log(
+            chunk[np.arange(len(chunk)), codes[start : start + chunk_size]] / sums
+        )
+    return float(np.average(loss, weights=sample_weight))
+
+
+def wrap_log_loss(
+    y: TargetsDS,
+    probs: ProbabilitiesDF,
+    sample_weight: Optional[WeightsDS] = None,
+    **kwargs,
+) -> float:
+    result = _chunked_log_loss(y, probs, sample_weight, **kwargs)
+    if result is not None:
+        return result
+    return log_loss(
+        y, probs, labels=list(probs.columns), sample_weight=sample_weight, **kwargs
+    )
+
+
+def _confusion_matrix(
+    y: TargetsDS,
+    predictions: PredictionsDS,
+    probabilities: Optional[ProbabilitiesDF],
+    sample_weight: Optional[WeightsDS],
+    **kwargs,
+) -> pd.DataFrame:
+    """Weighted counts of the targets (rows) against the predictions (columns)."""
+    labels, codes = np.unique(
+        np.concatenate([np.asarray(y), np.asarray(predictions)]), return_inverse=True
+    )
+    counts = np.bincount(
+        codes[: len(y)] * len(labels) + codes[len(y) :],
+        weights=None if sample_weight is None else np.asarray(sample_weight),
+        minlength=len(labels) ** 2,
+    )
+    return pd.DataFrame(
+        counts.reshape(len(labels), len(labels)),
+        index=pd.Index(labels, name="y"),
+        columns=pd.Index(labels, name="predictions"),
+    )
+
+
 def bennet_s(
     y: TargetsDS,
     preds: PredictionsDS,
     sample_weight: Optional[WeightsDS],
+    confusion_matrix: Optional[pd.DataFrame] = None,
     **kwargs,
 ) -> float:
     """Bennett, Alpert, & Goldstein S score.
@@ -83,7 +389,9 @@ def bennet_s(
     float
         float
     """
-    tn, fp, fn, tp = confusion_matrix(y, preds, sample_weight=sample_weight).ravel()
+    if confusion_matrix is None:
+        confusion_matrix = _confusion_matrix(y, preds, None, sample_weight)
+    tn, fp, fn, tp = confusion_matrix.to_numpy().ravel()
 
     p_0 = (tn + tp) / (tn + fp + fn + tp)
 
@@ -91,6 +399,18 @@ def bennet_s(
     return S_Score
 
 
+""" v Regression Wrappers v """
+
+
+def _residuals(y: TargetsDS, preds: PredictionsDS, *args) -> TargetsDS:
+    return y - preds
+
+
+calculate_residuals = SharedFunction(_residuals)
+"""The residuals, computed once per evaluation and shared by the regression `Metric`s
+and `Group`s that use them."""
+
+
 """ v Diagnostics Wrappers v """
 
 
@@ -3,8 +3,13 @@ from typing import List
 from ..metric import Metric
 from ..type import DatasetType
 from .benchmarking_models import ModelRegistry
-from .default_metrics_classification import ClassificationRegistry
-from .default_metrics_regression import RegressionRegistry
+from .default_metrics_classification import (
+    ClassificationRegistry,
+    binary_classification_balanced_metrics,
+    binary_classification_imbalanced_metrics,
+    multiclass_classification_metrics,
+)
+from .default_metrics_regression import RegressionRegistry, all_regression_metrics
 
 
 class library:
@@ -13,14 +18,31 @@ class library:
     ModelRegistry = ModelRegistry
 
 
+# The default metrics are shared by every `ScoreCard`, so they can't be modified
+for metric in (
+    binary_classification_balanced_metrics
+    + binary_classification_imbalanced_metrics
+    + multiclass_classification_metrics
+    + all_regression_metrics
+):
+    metric.set_read_only()
+
+
 def get_default_metrics_for_dataset_type(type: DatasetType) -> List[Metric]:
+    """
+    The default `Metric`s for `type`.
+
+    They are read-only prototypes (see `Metric.set_read_only`), built once and
+    shared by every `ScoreCard`, which stores its own `Metric.copy` of each.
+    Modify a copy of them, or the ones of the `library` registries instead.
+    """
     if type == DatasetType.classification_binary_balanced:
-        return ClassificationRegistry().binary_classification_balanced_metrics
+        return list(binary_classification_balanced_metrics)
     elif type == DatasetType.classification_binary_imbalanced:
-        return ClassificationRegistry().binary_classification_imbalanced_metrics
+        return list(binary_classification_imbalanced_metrics)
     elif type == DatasetType.classification_multiclass:
-        return ClassificationRegistry().multiclass_classification_metrics
+        return list(multiclass_classification_metrics)
     elif type == DatasetType.regression:
-        return RegressionRegistry().all_regression_metrics
+        return list(all_regression_metrics)
     else:
         raise ValueError(f"Unknown dataset type {type}")
@@ -0,0 +1,476 @@
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from ..rolling import (
+    ConfusionMatrices,
+    Decomposition,
+    PrefixSums,
+    SlidingConcordance,
+    SlidingPrecision,
+    WindowConfusionMatrices,
+)
+from ..type import PredictionsDS, ProbabilitiesDF, TargetsDS, WeightsDS
+
+""" v Regression v """
+
+
+def _as_finite_array(data) -> Optional[np.ndarray]:
+    # Single precision inputs are kept as they are, instead of copied into doubles
+    array = np.asarray(data)
+    if array.dtype not in (np.float32, np.float64):
+        array = array.astype(np.float64)
+    return array if np.isfinite(array).all() else None
+
+
+def regression_statistics(
+    y: TargetsDS,
+    pred: PredictionsDS,
+    sample_weight: Optional[WeightsDS] = None,
+    **kwargs,
+) -> Optional[PrefixSums]:
+    """Per-sample errors that the regression metrics are sums of.
+
+    Returns `None` for empty or non-finite inputs, for which the metrics are
+    evaluated window by window.
+    """
+    y_, pred_ = _as_finite_array(y), _as_finite_array(pred)
+    weight = None if sample_weight is None else _as_finite_array(sample_weight)
+    if y_ is None or pred_ is None or len(y_) == 0:
+        return None
+    if sample_weight is not None and weight is None:
+        return None
+
+    def weighted(values: np.ndarray) -> np.ndarray:
+        return (
+            values if sample_weight is None else np.multiply(values, weight, out=values)
+        )
+
+    # Computed in place where possible, as every statistic is as long as the inputs
+    error = y_ - pred_
+    abs_error = np.abs(error)
+    squared_error = np.square(error, out=error)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        symmetric_error = abs_error / (np.abs(y_) + np.abs(pred_))
+    symmetric_undefined = np.isnan(symmetric_error)
+    symmetric_error[symmetric_undefined] = 0.0
+    abs_percentage_error = abs_error / np.maximum(np.abs(y_), np.finfo(np.float64).eps)
+    # Shifting `y` by a constant leaves its variance unchanged, but keeps the
+    # difference of the cumulative sums from cancelling out.
+    y_centered = y_ - y_.mean()
+    y_centered_squared = np.square(y_centered)
+
+    return PrefixSums(
+        dict(
+            count=np.ones(len(y_), dtype=bool),
+            weight=np.ones(len(y_), dtype=bool) if sample_weight is None else weight,
+            abs_error=weighted(abs_error),
+            squared_error=weighted(squared_error),
+            abs_percentage_error=weighted(abs_percentage_error),
+            symmetric_error=symmetric_error,
+            symmetric_undefined=symmetric_undefined,
+            y_centered=weighted(y_centered),
+            y_centered_squared=weighted(y_centered_squared),
+        )
+    )
+
+
+def residual_statistics(
+    res: TargetsDS, sample_weight: Optional[WeightsDS] = None, **kwargs
+) -> Optional[PrefixSums]:
+    residuals = _as_finite_array(res)
+    if residuals is None or len(residuals) == 0:
+        return None
+    centered = residuals - residuals.mean()
+    return PrefixSums(
+        dict(
+            count=np.ones(len(residuals), dtype=bool),
+            residual=residuals,
+            centered=centered,
+            centered_squared=centered**2,
+        )
+    )
+
+
+def _mean_absolute_error(sums: Dict[str, np.ndarray], **kwargs) -> np.ndarray:
+    return sums["abs_error"] / sums["weight"]
+
+
+def _mean_absolute_percentage_error(
+    sums: Dict[str, np.ndarray], **kwargs
+) -> np.ndarray:
+    return sums["abs_percentage_error"] / sums["weight"]
+
+
+def _symmetric_mean_absolute_percentage_error(
+    sums: Dict[str, np.ndarray], **kwargs
+) -> np.ndarray:
+    # Undefined terms (0 / 0) are skipped, as `pd.Series.mean` does.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return sums["symmetric_error"] / (sums["count"] - sums["symmetric_undefined"])
+
+
+def _mean_squared_error(
+    sums: Dict[str, np.ndarray], squared: bool = True, **kwargs
+) -> np.ndarray:
+    mse = sums["squared_error"] / sums["weight"]
+    return mse if squared else np.sqrt(mse)
+
+
+def _r_two(sums: Dict[str, np.ndarray], **kwargs) -> np.ndarray:
+    numerator = sums["squared_error"]
+    denominator = sums["y_centered_squared"] - sums["y_centered"] ** 2 / sums["weight"]
+    # Whatever is left of the total sum of squares after the subtraction
+    # above, below the rounding error, is treated as a constant target.
+    denominator[
+        denominator <= 4 * np.finfo(np.float64).eps * sums["y_centered_squared"]
+    ] = 0.0
+
+    # Same conventions as `sklearn.metrics.r2_score` with `force_finite=True`
+    result = np.ones(len(numerator))
+    valid = (numerator != 0.0) & (denominator != 0.0)
+    result[valid] = 1 - numerator[valid] / denominator[valid]
+    result[(numerator != 0.0) & (denominator == 0.0)] = 0.0
+    result[sums["count"] < 2] = np.nan
+    return result
+
+
+def _residuals_mean(sums: Dict[str, np.ndarray], **kwargs) -> np.ndarray:
+    return sums["residual"] / sums["count"]
+
+
+def _residuals_std(sums: Dict[str, np.ndarray], **kwargs) -> np.ndarray:
+    count = sums["count"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = (sums["centered_squared"] - sums["centered"] ** 2 / count) / (
+            count - 1
+        )
+    return np.sqrt(np.clip(variance, 0.0, None))
+
+
+mae_rolling = Decomposition(regression_statistics, _mean_absolute_error, exact=True)
+mape_rolling = Decomposition(
+    regression_statistics, _mean_absolute_percentage_error, exact=True
+)
+smape_rolling = Decomposition(
+    regression_statistics, _symmetric_mean_absolute_percentage_error, exact=True
+)
+mse_rolling = Decomposition(regression_statistics, _mean_squared_error, exact=True)
+r_two_rolling = Decomposition(regression_statistics, _r_two, exact=True)
+residuals_mean_rolling = Decomposition(residual_statistics, _residuals_mean, exact=True)
+residuals_std_rolling = Decomposition(residual_statistics, _residuals_std, exact=True)
+
+""" v Classification v """
+
+
+def _as_label_array(data) -> Optional[np.ndarray]:
+    array = np.asarray(data)
+    if array.dtype.kind in "biuU":
+        return array
+    if array.dtype.kind == "f" and np.isfinite(array).all():
+        return array if (array == np.round(array)).all() else None
+    return None
+
+
+def confusion_statistics(
+    y: TargetsDS,
+    pred: PredictionsDS,
+    sample_weight: Optional[WeightsDS] = None,
+    **kwargs,
+) -> Optional[ConfusionMatrices]:
+    """Cumulative confusion matrices that the classification metrics are computed from.
+
+    Returns `None` for labels that are neither integers nor strings (or a mix of
+    both) and for non-finite weights, for which the metrics are evaluated window by
+    window.
+    """
+    y_, pred_ = _as_label_array(y), _as_label_array(pred)
+    weight = None if sample_weight is None else _as_finite_array(sample_weight)
+    if (
+        y_ is None
+        or pred_ is None
+        or (sample_weight is not None and weight is None)
+        or (y_.dtype.kind == "U") != (pred_.dtype.kind == "U")
+    ):
+        return None
+
+    labels, codes = np.unique(np.concatenate([y_, pred_]), return_inverse=True)
+    return ConfusionMatrices(labels, codes[: len(y_)], codes[len(y_) :], weight)
+
+
+def _divide(
+    numerator: np.ndarray,
+    denominator: np.ndarray,
+    zero_division: Union[str, float],
+) -> np.ndarray:
+    # Same conventions as `sklearn.metrics._classification._prf_divide`
+    zero_value = 0.0 if zero_division == "warn" else float(zero_division)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator == 0.0, zero_value, numerator / denominator)
+
+
+def _binary_label_index(
+    confusion: WindowConfusionMatrices, pos_label: Union[int, str]
+) -> Optional[int]:
+    """Checks every window as `sklearn.metrics` does for `average="binary"`."""
+    num_present = confusion.present.sum(axis=1)
+    if (num_present > 2).any():
+        raise ValueError(
+            "Target is multiclass but average='binary'. Please choose another average setting, one of [None, 'micro', 'macro', 'weighted']."
+        )
+    matches = np.flatnonzero(confusion.labels == pos_label)
+    is_present = (
+        confusion.present[:, matches[0]]
+        if len(matches) > 0
+        else np.zeros(len(num_present), dtype=bool)
+    )
+    if ((num_present == 2) & ~is_present).any():
+        raise ValueError(
+            f"pos_label={pos_label} is not a valid label. It should be one of {confusion.labels.tolist()}"
+        )
+    return matches[0] if len(matches) > 0 else None
+
+
+def _precision_recall_fscore(
+    confusion: WindowConfusionMatrices,
+    score: str,
+    average: str = "binary",
+    pos_label: Union[int, str] = 1,
+    zero_division: Union[str, float] = "warn",
+    **kwargs,
+) -> Optional[np.ndarray]:
+    if (
+        average not in ["binary", "micro", "macro", "weighted"]
+        or zero_division not in ["warn", 0, 1]
+        or len(kwargs) > 0
+    ):
+        return None
+
+    matrices = confusion.matrices
+    tp = np.diagonal(matrices, axis1=1, axis2=2)
+    true_sum, pred_sum = matrices.sum(axis=2), matrices.sum(axis=1)
+    present = confusion.present
+    if average == "binary":
+        index = _binary_label_index(confusion, pos_label)
+        present = np.zeros_like(present)
+        if index is None:
+            tp, true_sum, pred_sum = [np.zeros((len(matrices), 1))] * 3
+            present = np.ones((len(matrices), 1), dtype=bool)
+        else:
+            present[:, index] = True
+    elif average == "micro":
+        tp, true_sum, pred_sum = [
+            (values * present).sum(axis=1, keepdims=True)
+            for values in [tp, true_sum, pred_sum]
+        ]
+        present = np.ones((len(matrices), 1), dtype=bool)
+
+    precision = _divide(tp, pred_sum, zero_division)
+    recall = _divide(tp, true_sum, zero_division)
+    if score == "precision":
+        scores = precision
+    elif score == "recall":
+        scores = recall
+    else:
+        denominator = precision + recall
+        undefined = np.isclose(denominator, 0.0) | np.isclose(pred_sum + true_sum, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(
+                undefined,
+                0.0 if zero_division == "warn" else float(zero_division),
+                2 * precision * recall / denominator,
+            )
+
+    weights = present.astype(np.float64)
+    if average == "weighted":
+        weights = true_sum * present
+        # All-zero weights fall back to an unweighted average, as in `sklearn`.
+        weights[weights.sum(axis=1) == 0.0] = present[weights.sum(axis=1) == 0.0]
+    return (scores * weights).sum(axis=1) / weights.sum(axis=1)
+
+
+def _precision(confusion: WindowConfusionMatrices, **kwargs) -> Optional[np.ndarray]:
+    return _precision_recall_fscore(confusion, "precision", **kwargs)
+
+
+def _recall(confusion: WindowConfusionMatrices, **kwargs) -> Optional[np.ndarray]:
+    return _precision_recall_fscore(confusion, "recall", **kwargs)
+
+
+def _f_one_score(confusion: WindowConfusionMatrices, **kwargs) -> Optional[np.ndarray]:
+    return _precision_recall_fscore(confusion, "f_one", **kwargs)
+
+
+def _accuracy(
+    confusion: WindowConfusionMatrices, normalize: bool = True, **kwargs
+) -> Optional[np.ndarray]:
+    correct = np.trace(confusion.matrices, axis1=1, axis2=2)
+    if not normalize:
+        return correct
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return correct / confusion.matrices.sum(axis=(1, 2))
+
+
+def _balanced_accuracy(
+    confusion: WindowConfusionMatrices, adjusted: bool = False, **kwargs
+) -> Optional[np.ndarray]:
+    true_sum = confusion.matrices.sum(axis=2)
+    # Classes that never occur in `y` within a window are left out of the average.
+    observed = true_sum > 0
+    recall = np.diagonal(confusion.matrices, axis1=1, axis2=2) / np.where(
+        observed, true_sum, 1.0
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = (recall * observed).sum(axis=1) / observed.sum(axis=1)
+        if adjusted:
+            chance = 1 / observed.sum(axis=1)
+            score = (score - chance) / (1 - chance)
+    return score
+
+
+def _kappa(
+    confusion: WindowConfusionMatrices,
+    labels: Optional[list] = None,
+    weights: Optional[str] = None,
+    **kwargs,
+) -> Optional[np.ndarray]:
+    if labels is not None or weights is not None:
+        return None
+    matrices = confusion.matrices
+    disagreement = 1 - np.eye(len(confusion.labels))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = (
+            matrices.sum(axis=2)[:, :, None]
+            * matrices.sum(axis=1)[:, None, :]
+            / matrices.sum(axis=(1, 2))[:, None, None]
+        )
+        return 1 - (disagreement * matrices).sum(axis=(1, 2)) / (
+            disagreement * expected
+        ).sum(axis=(1, 2))
+
+
+def _matthew_corr(confusion: WindowConfusionMatrices, **kwargs) -> np.ndarray:
+    matrices = confusion.matrices
+    true_sum, pred_sum = matrices.sum(axis=2), matrices.sum(axis=1)
+    correct = np.trace(matrices, axis1=1, axis2=2)
+    total = pred_sum.sum(axis=1)
+    cov_ytyp = correct * total - (true_sum * pred_sum).sum(axis=1)
+    cov_ypyp = total**2 - (pred_sum**2).sum(axis=1)
+    cov_ytyt = total**2 - (true_sum**2).sum(axis=1)
+    denominator = cov_ytyt * cov_ypyp
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator == 0.0, 0.0, cov_ytyp / np.sqrt(denominator))
+
+
+def _bennet_s(confusion: WindowConfusionMatrices, **kwargs) -> np.ndarray:
+    num_present = confusion.present.sum(axis=1)
+    if (num_present != 2).any():
+        raise ValueError(
+            f"S Score is only defined for binary classification, got a window with {num_present[num_present != 2][0]} label(s)."
+        )
+    return 2 * _accuracy(confusion) - 1
+
+
+accuracy_rolling = Decomposition(confusion_statistics, _accuracy, exact=True)
+balanced_accuracy_rolling = Decomposition(
+    confusion_statistics, _balanced_accuracy, exact=True
+)
+precision_rolling = Decomposition(confusion_statistics, _precision, exact=True)
+recall_rolling = Decomposition(confusion_statistics, _recall, exact=True)
+f_one_score_rolling = Decomposition(confusion_statistics, _f_one_score, exact=True)
+kappa_rolling = Decomposition(confusion_statistics, _kappa, exact=True)
+matthew_corr_rolling = Decomposition(confusion_statistics, _matthew_corr, exact=True)
+s_score_rolling = Decomposition(confusion_statistics, _bennet_s, exact=True)
+
+""" v Ranking v """
+
+
+def _binary_ranking_inputs(
+    y: TargetsDS, probs: ProbabilitiesDF, sample_weight: Optional[WeightsDS]
+) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]]:
+    """Labels, dense ranks of the positive class' probabilities and weights."""
+    y_, probs_ = _as_label_array(y), np.asarray(probs)
+    if y_ is None or probs_.ndim != 2 or probs_.shape[1] != 2:
+        return None
+    scores = _as_finite_array(probs_[:, 1])
+    weight = None if sample_weight is None else _as_finite_array(sample_weight)
+    if scores is None or (sample_weight is not None and weight is None):
+        return None
+
+    labels = np.unique(y_)
+    if len(labels) > 2:
+        return None
+    return labels, y_, np.unique(scores, return_inverse=True)[1], weight
+
+
+def roc_auc_statistics(
+    y: TargetsDS,
+    probs: ProbabilitiesDF,
+    sample_weight: Optional[WeightsDS] = None,
+    **kwargs,
+) -> Optional[SlidingConcordance]:
+    """Concordant pairs that the binary ROC AUC is a normalization of.
+
+    Returns `None` for multiclass targets, for which the metric is evaluated window
+    by window.
+    """
+    inputs = _binary_ranking_inputs(y, probs, sample_weight)
+    if inputs is None:
+        return None
+    labels, y_, ranks, weight = inputs
+    # The greater label is the positive class, as in `sklearn.metrics.roc_auc_score`
+    return SlidingConcordance(ranks, y_ == labels[-1], weight)
+
+
+def average_precision_statistics(
+    y: TargetsDS,
+    probs: ProbabilitiesDF,
+    sample_weight: Optional[WeightsDS] = None,
+    **kwargs,
+) -> Optional[SlidingPrecision]:
+    """Precision sums that the binary average precision is a normalization of.
+
+    Returns `None` for multiclass targets, or binary targets without `1` as one of
+    their labels, for which the metric is evaluated window by window.
+    """
+    inputs = _binary_ranking_inputs(y, probs, sample_weight)
+    if inputs is None:
+        return None
+    labels, y_, ranks, weight = inputs
+    if len(labels) == 2 and 1 not in labels.tolist():
+        return None
+    return SlidingPrecision(ranks, y_ == 1, weight)
+
+
+def _roc_auc(
+    sums: Dict[str, np.ndarray], max_fpr: Optional[float] = None, **kwargs
+) -> Optional[np.ndarray]:
+    if max_fpr not in [None, 1]:
+        return None
+    with np.errstate(divide="ignore", invalid="ignore"):
+        auc = sums["concordant"] / (sums["positive_weight"] * sums["negative_weight"])
+    result = auc.astype(object)
+    result[
+        (sums["positive_count"] == 0) | (sums["negative_count"] == 0)
+    ] = "ROC AUC only works with more than one class."
+    return result
+
+
+def _average_precision(
+    sums: Dict[str, np.ndarray], pos_label: Union[int, str] = 1, **kwargs
+) -> Optional[np.ndarray]:
+    if pos_label != 1:
+        return None
+    # Without any positive samples, `sklearn` sets the recall to one everywhere,
+    # which leaves an average precision of zero.
+    positive_weight = sums["positive_weight"]
+    return np.divide(
+        sums["precision"],
+        positive_weight,
+        out=np.zeros(len(positive_weight)),
+        where=positive_weight != 0.0,
+    )
+
+
+roc_auc_rolling = Decomposition(roc_auc_statistics, _roc_auc)
+avg_precision_rolling = Decomposition(average_precision_statistics, _average_precision)
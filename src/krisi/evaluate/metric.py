@@ -1,14 +1,28 @@
 from __future__ import annotations
 
 import logging
-from copy import deepcopy
+from copy import copy, deepcopy
 from dataclasses import dataclass, field
+from functools import partial
 from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 
-from krisi.evaluate.benchmark import calculate_benchmark
+from krisi.evaluate.benchmark import BenchmarkSeed, calculate_benchmark
+from krisi.evaluate.intermediate import (
+    Intermediate,
+    Requirements,
+    compute_intermediates,
+    get_required,
+)
+from krisi.evaluate.parallel import evaluate_windows_in_parallel
+from krisi.evaluate.rolling import (
+    Decomposition,
+    RollingWindows,
+    SharedFunction,
+    WindowPlan,
+)
 from krisi.evaluate.type import (
     ComputationalComplexity,
     MetricCategories,
@@ -18,6 +32,7 @@ from krisi.evaluate.type import (
     PredictionsDS,
     ProbabilitiesDF,
     Purpose,
+    RollingMetricFunction,
     SampleTypes,
     TargetsDS,
     WeightsDS,
@@ -27,6 +42,7 @@ from krisi.report.type import InteractiveFigure, PlotDefinition, plotly_interact
 from krisi.utils.iterable_helpers import (
     check_iterable_with_number,
     isiterable,
+    isnumber,
     string_to_id,
     wrap_in_list,
 )
@@ -48,12 +64,30 @@ class Metric(Generic[MetricResult]):
         The category of the metric.
     result: Optional[Union[Exception, MetricResult, List[MetricResult]]]
         The result of the evaluated `Metric`, by default None
-    result_rolling: Optional[Union[Exception, MetricResult, List[MetricResult]]]
-        The result of the evaluated `Metric` over time, by default None
+    result_rolling: Optional[Union[Exception, np.ndarray, List[MetricResult]]]
+        The result of the evaluated `Metric` over time, by default None. Numerical results
+        are stored as a `np.ndarray`, one value per window.
+    rolling_windows: Optional[RollingWindows]
+        The windows `result_rolling` was evaluated on, shared between the `Metric`s of a
+        `ScoreCard`, by default None
+    result_rolling_by_window: Optional[Dict[str, Union[Exception, np.ndarray, List[MetricResult]]]]
+        If `rolling_args` is a list of window specs, the result over the windows of each
+        spec, keyed by `window_spec_key`, by default None. `result_rolling` then holds the
+        result of the first spec.
+    rolling_windows_by_window: Optional[Dict[str, Optional[RollingWindows]]]
+        The windows each result in `result_rolling_by_window` was evaluated on, by default None
     parameters: dict
         The paramaters that are passed into the evaluation function (param: `func`), by default field(default_factory=dict)
     func: Callable
         The function used to compute the metric.
+    func_rolling: Optional[RollingMetricFunction]
+        A vectorized implementation of `func` that evaluates every window at once (eg.: a
+        `Decomposition`). If it is not set, or it returns `None`, `func` is evaluated on each
+        window separately. It is reset if `func` is replaced, by default None
+    requires: List[Union[str, Intermediate]]
+        The intermediates (eg.: `"residuals"`, see `library_.intermediates`) that `func`
+        receives as keyword arguments. Within a `ScoreCard` each is computed once and
+        shared by every `Metric` that requires it, by default field(default_factory=list)
     plot_funcs: List[Callable]
         List of functions used to plot the metric.
     plot_funcs_rolling: Callable
@@ -74,10 +108,17 @@ class Metric(Generic[MetricResult]):
     key: str = ""
     category: Optional[MetricCategories] = None
     result: Optional[Union[Exception, MetricResult, List[MetricResult]]] = None
-    result_rolling: Optional[Union[Exception, MetricResult, List[MetricResult]]] = None
+    result_rolling: Optional[Union[Exception, np.ndarray, List[MetricResult]]] = None
+    rolling_windows: Optional[RollingWindows] = None
+    result_rolling_by_window: Optional[
+        Dict[str, Union[Exception, np.ndarray, List[MetricResult]]]
+    ] = None
+    rolling_windows_by_window: Optional[Dict[str, Optional[RollingWindows]]] = None
     rolling_properties: Optional[pd.Series] = None
     parameters: dict = field(default_factory=dict)
     func: Optional[MetricFunction] = None
+    func_rolling: Optional[RollingMetricFunction] = None
+    requires: List[Union[str, Intermediate]] = field(default_factory=list)
     plot_funcs: Optional[Union[List[PlotDefinition], PlotDefinition]] = None
     plot_funcs_rolling: Optional[Union[List[PlotDefinition], PlotDefinition]] = None
     info: str = ""
@@ -107,6 +148,31 @@ class Metric(Generic[MetricResult]):
             Purpose.from_str(self.purpose) if self.purpose is not None else None
         )
 
+    def __setattr__(self, key: str, item: Any) -> None:
+        if self.__dict__.get("_read_only", False):
+            raise ValueError(
+                f"`{self.key}` is a shared, read-only `Metric`, modify its `copy()` instead."
+            )
+        if key == "func" and "func" in self.__dict__ and self.func is not item:
+            # `func_rolling` only reproduces the `func` it was declared with, and the
+            # intermediates are only the ones it declared it accepts.
+            self.__dict__["func_rolling"] = None
+            self.__dict__["requires"] = []
+        super().__setattr__(key, item)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Metric:
+        copied = copy(self)
+        memo[id(self)] = copied
+        copied.__dict__.update(
+            {
+                key: deepcopy(value, memo)
+                for key, value in self.__dict__.items()
+                if key != "_read_only"
+            }
+        )
+        copied.__dict__.pop("_read_only", None)
+        return copied
+
     def __setitem__(self, key: str, item: Any) -> None:
         setattr(self, key, item)
 
@@ -128,13 +194,54 @@ class Metric(Generic[MetricResult]):
     ) -> Metric:
         return self.evaluate(y, predictions, probabilities, sample_weight)
 
-    def _evaluation(self, *args, **kwargs) -> Metric:
+    def __decomposed_evaluation(
+        self, args: tuple, sample_weight: Optional[WeightsDS], plan: WindowPlan
+    ) -> Optional[MetricResult]:
+        if not isinstance(self.func_rolling, Decomposition) or (
+            not self.func_rolling.exact
+        ):
+            return None
+        sums = plan.for_inputs(args[0]).window_sums(
+            self.func_rolling.statistics, tuple(args), sample_weight
+        )
+        if sums is None:
+            return None
+        results = self.func_rolling.finalize(sums, **self.parameters)
+        return None if results is None or len(results) != 1 else results[0]
+
+    def _evaluation(
+        self,
+        *args,
+        plan: Optional[WindowPlan] = None,
+        intermediates: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> Metric:
         if self._from_group:
             return self
         if self.func is None:
             raise ValueError("`func` has to be set on Metric to calculate result.")
         try:
-            result = self.func(*args, **kwargs, **self.parameters)
+            # The statistics of an exact `Decomposition` are shared through the plan
+            result = (
+                None
+                if plan is None
+                else self.__decomposed_evaluation(
+                    args, kwargs.get("sample_weight", None), plan
+                )
+            )
+            if result is None and (
+                plan is not None
+                and isinstance(self.func, SharedFunction)
+                and len(self.parameters) == 0
+            ):
+                result = plan.for_inputs(args[0]).shared(self.func, tuple(args))
+            if result is None:
+                result = self.func(
+                    *args,
+                    **kwargs,
+                    **self.parameters,
+                    **get_required(self.requires, intermediates),
+                )
         except Exception as e:
             result = e
             if get_global_state().run_type == RunType.test:
@@ -148,13 +255,25 @@ class Metric(Generic[MetricResult]):
         predictions: PredictionsDS,
         probabilities: Optional[ProbabilitiesDF] = None,
         sample_weight: Optional[WeightsDS] = None,
+        plan: Optional[WindowPlan] = None,
+        intermediates: Optional[Dict[str, Any]] = None,
     ) -> Metric:
         assert (
             self.func is not None
         ), "`func` has to be set on Metric to calculate result."
+        if len(self.requires) > 0 and intermediates is None:
+            intermediates = compute_intermediates(
+                self.requires, y, predictions, probabilities, sample_weight
+            )
         if self.accepts_probabilities:
             if probabilities is not None:
-                result = self._evaluation(y, probabilities, sample_weight=sample_weight)
+                result = self._evaluation(
+                    y,
+                    probabilities,
+                    sample_weight=sample_weight,
+                    plan=plan,
+                    intermediates=intermediates,
+                )
             else:
                 result = self.__safe_set(
                     ValueError(
@@ -163,7 +282,13 @@ class Metric(Generic[MetricResult]):
                     key="result",
                 )
         else:
-            result = self._evaluation(y, predictions, sample_weight=sample_weight)
+            result = self._evaluation(
+                y,
+                predictions,
+                sample_weight=sample_weight,
+                plan=plan,
+                intermediates=intermediates,
+            )
 
         return result
 
@@ -185,17 +310,25 @@ class Metric(Generic[MetricResult]):
 
     @staticmethod
     def __calc_window(
-        window: pd.DataFrame,
+        inputs: Union[dict, Tuple],
+        sample_weight: Optional[WeightsDS],
         func: MetricFunction,
         parameters: dict,
         accepts_probabilities: bool,
+        requires: Requirements = (),
     ):
-        result, sample_weight = Metric.__handle_window(window)
-
-        if isinstance(result, dict):
-            y = result["y"]
-            pred = result["pred"]
-            prob = result["prob"]
+        if isinstance(inputs, dict):
+            y = inputs["y"]
+            pred = inputs["pred"]
+            prob = inputs["prob"]
+            if len(requires) > 0:
+                parameters = {
+                    **parameters,
+                    **get_required(
+                        requires,
+                        compute_intermediates(requires, y, pred, prob, sample_weight),
+                    ),
+                }
 
             if accepts_probabilities:
                 if prob is not None:
@@ -208,57 +341,245 @@ class Metric(Generic[MetricResult]):
                 return func(y, pred, sample_weight=sample_weight, **parameters)
         else:
             return func(
-                *(list(result)),
+                *(list(inputs)),
                 sample_weight=sample_weight,
                 **parameters,
             )
 
-    def _rolling_evaluation(self, *args, rolling_args: dict, **kwargs) -> Metric:
-        if self._from_group:
-            return self
-        if not self.supports_rolling:
-            return self
-        if self.func is None:
-            raise ValueError("`func` has to be set on Metric to calculate result.")
+    @staticmethod
+    def _evaluate_windows(
+        df: pd.DataFrame,
+        start: np.ndarray,
+        end: np.ndarray,
+        func: MetricFunction,
+        parameters: dict,
+        accepts_probabilities: bool,
+        requires: Requirements = (),
+    ) -> List[MetricResult]:
+        """Evaluates `func` on positional slices (views) of the columns of `df`,
+        instead of building a `pd.DataFrame` for each window."""
+        # A shallow copy, as `__handle_window` pops the columns it takes.
+        inputs, sample_weight = Metric.__handle_window(df.copy(deep=False))
+        return Metric.__evaluate_input_windows(
+            inputs,
+            sample_weight,
+            start,
+            end,
+            func,
+            parameters,
+            accepts_probabilities,
+            requires,
+        )
+
+    @staticmethod
+    def __evaluate_input_windows(
+        inputs: Union[dict, Tuple],
+        sample_weight: Optional[WeightsDS],
+        start: np.ndarray,
+        end: np.ndarray,
+        func: MetricFunction,
+        parameters: dict,
+        accepts_probabilities: bool,
+        requires: Requirements = (),
+    ) -> List[MetricResult]:
+        def slice_window(data: Any, window_start: int, window_end: int) -> Any:
+            return None if data is None else data.iloc[window_start:window_end]
+
+        return [
+            Metric.__calc_window(
+                {
+                    key: slice_window(value, window_start, window_end)
+                    for key, value in inputs.items()
+                }
+                if isinstance(inputs, dict)
+                else tuple(
+                    slice_window(value, window_start, window_end) for value in inputs
+                ),
+                slice_window(sample_weight, window_start, window_end),
+                func,
+                parameters,
+                accepts_probabilities,
+                requires,
+            )
+            for window_start, window_end in zip(start.tolist(), end.tolist())
+        ]
+
+    def __vectorized_rolling_evaluation(
+        self, args: tuple, kwargs: dict, plan: WindowPlan
+    ) -> Optional[Union[np.ndarray, List[MetricResult]]]:
+        if self.func_rolling is None or plan.windows is None:
+            return None
+        if args is not None and len(args) > 0:
+            inputs = tuple(args)
+        elif self.accepts_probabilities:
+            if kwargs.get("probabilities", None) is None:
+                return None
+            inputs = (kwargs["y"], kwargs["probabilities"])
         else:
-            _df = pd.concat(
-                kwargs.values() if (args is None or len(args) == 0) else args,
-                axis="columns",
+            inputs = (kwargs["y"], kwargs["predictions"])
+
+        if isinstance(self.func_rolling, Decomposition):
+            sums = plan.window_sums(
+                self.func_rolling.statistics, inputs, kwargs["sample_weight"]
+            )
+            result_rolling = (
+                None
+                if sums is None
+                else self.func_rolling.finalize(sums, **self.parameters)
+            )
+        else:
+            result_rolling = self.func_rolling(
+                *inputs,
+                sample_weight=kwargs["sample_weight"],
+                windows=plan.windows,
+                **self.parameters,
+            )
+        return result_rolling
+
+    def __windowed_rolling_evaluation(
+        self, args: tuple, kwargs: dict, plan: WindowPlan, n_jobs: int
+    ) -> List[MetricResult]:
+        if (args is None or len(args) == 0) and n_jobs <= 1:
+            inputs = dict(
+                y=kwargs["y"],
+                pred=kwargs.get("predictions", None),
+                prob=kwargs.get("probabilities", None),
             )
+            windows = plan.for_inputs(kwargs["y"]).windows
+            if windows is not None and share_index(
+                list(inputs.values()) + [kwargs["sample_weight"]]
+            ):
+                # The inputs are sliced as they are, without concatenating them
+                return Metric.__evaluate_input_windows(
+                    inputs,
+                    kwargs["sample_weight"],
+                    windows.start,
+                    windows.end,
+                    self.func,
+                    self.parameters,
+                    self.accepts_probabilities,
+                    tuple(self.requires),
+                )
 
-            if kwargs["sample_weight"] is not None:
-                _df["sample_weight"] = kwargs["sample_weight"]
+        _df = plan.frame(
+            tuple(value for key, value in kwargs.items() if key != "sample_weight")
+            if (args is None or len(args) == 0)
+            else tuple(args),
+            kwargs["sample_weight"],
+        )
 
-            try:
-                df_rolled = (
-                    _df.expanding()
-                    if "window" in rolling_args and rolling_args["window"] is None
-                    else _df.rolling(**rolling_args)
+        windows = plan.for_inputs(_df).windows
+        if windows is not None:
+            evaluate_windows = partial(
+                Metric._evaluate_windows,
+                func=self.func,
+                parameters=self.parameters,
+                accepts_probabilities=self.accepts_probabilities,
+                requires=tuple(self.requires),
+            )
+            if n_jobs > 1:
+                return evaluate_windows_in_parallel(
+                    _df, windows, evaluate_windows, n_jobs
                 )
+            return evaluate_windows(_df, windows.start, windows.end)
 
-                result_rolling = [
-                    Metric.__calc_window(
-                        single_window,
-                        self.func,
-                        self.parameters,
-                        self.accepts_probabilities,
-                    )
-                    for single_window in df_rolled
-                    if len(single_window) > 0
-                    and (
-                        ("min_periods" not in rolling_args)
-                        or (
-                            "min_periods" in rolling_args
-                            and len(single_window) >= rolling_args["min_periods"]
-                        )
-                    )
-                ]
+        rolling_args = plan.rolling_args
+        df_rolled = (
+            _df.expanding()
+            if "window" in rolling_args and rolling_args["window"] is None
+            else _df.rolling(**rolling_args)
+        )
+
+        return [
+            Metric.__calc_window(
+                *Metric.__handle_window(single_window),
+                self.func,
+                self.parameters,
+                self.accepts_probabilities,
+                tuple(self.requires),
+            )
+            for single_window in df_rolled
+            if len(single_window) > 0
+            and (
+                ("min_periods" not in rolling_args)
+                or (
+                    "min_periods" in rolling_args
+                    and len(single_window) >= rolling_args["min_periods"]
+                )
+            )
+        ]
+
+    def __rolling_result(
+        self, args: tuple, kwargs: dict, plan: WindowPlan, n_jobs: int
+    ) -> Union[Exception, np.ndarray, List[MetricResult]]:
+        try:
+            result_rolling = self.__vectorized_rolling_evaluation(args, kwargs, plan)
+            if result_rolling is None:
+                result_rolling = self.__windowed_rolling_evaluation(
+                    args, kwargs, plan, n_jobs
+                )
+            return to_columnar(result_rolling)
+        except Exception as e:
+            if get_global_state().run_type == RunType.test:
+                raise e
+            return e
 
-            except Exception as e:
-                result_rolling = e
-                if get_global_state().run_type == RunType.test:
-                    raise e
-            return self.__safe_set(result_rolling, key="result_rolling")
+    @staticmethod
+    def __windows_of(
+        result_rolling: Union[Exception, np.ndarray, List[MetricResult]],
+        plan: WindowPlan,
+    ) -> Optional[RollingWindows]:
+        if (
+            plan.windows is not None
+            and isiterable(result_rolling)
+            and len(result_rolling) == len(plan.windows)
+        ):
+            return plan.windows
+        return None
+
+    def _rolling_evaluation(
+        self,
+        *args,
+        rolling_args: Union[dict, List[dict]],
+        n_jobs: int = 1,
+        plan: Optional[WindowPlan] = None,
+        **kwargs,
+    ) -> Metric:
+        if self._from_group:
+            return self
+        if not self.supports_rolling:
+            return self
+        if self.func is None:
+            raise ValueError("`func` has to be set on Metric to calculate result.")
+        if plan is None:
+            data = args[0] if len(args) > 0 else kwargs["y"]
+            plan = WindowPlan(len(data), rolling_args, getattr(data, "index", None))
+
+        if plan.plans is None:
+            result_rolling = self.__rolling_result(args, kwargs, plan, n_jobs)
+            metric = self.__safe_set(result_rolling, key="result_rolling")
+            metric.__dict__["rolling_windows"] = Metric.__windows_of(
+                result_rolling, plan
+            )
+            return metric
+
+        results_rolling = {
+            key: self.__rolling_result(args, kwargs, spec_plan, n_jobs)
+            for key, spec_plan in plan.plans.items()
+        }
+        metric = self.__safe_set(results_rolling, key="result_rolling_by_window")
+        metric.__dict__["rolling_windows_by_window"] = {
+            key: Metric.__windows_of(results_rolling[key], spec_plan)
+            for key, spec_plan in plan.plans.items()
+        }
+        # The first window spec is the one reported on, eg.: in `rolling_properties`
+        if len(plan.plans) > 0:
+            first_key = next(iter(plan.plans))
+            metric.__dict__["result_rolling"] = results_rolling[first_key]
+            metric.__dict__["rolling_windows"] = metric.rolling_windows_by_window[
+                first_key
+            ]
+        return metric
 
     def evaluate_over_time(
         self,
@@ -266,7 +587,9 @@ class Metric(Generic[MetricResult]):
         predictions: PredictionsDS,
         probabilities: Optional[ProbabilitiesDF] = None,
         sample_weight: Optional[WeightsDS] = None,
-        rolling_args: dict = dict(),
+        rolling_args: Union[dict, List[dict]] = dict(),
+        n_jobs: int = 1,
+        plan: Optional[WindowPlan] = None,
     ) -> Metric:
         if self.accepts_probabilities and probabilities is not None:
             return self._rolling_evaluation(
@@ -275,6 +598,8 @@ class Metric(Generic[MetricResult]):
                 probabilities=probabilities,
                 sample_weight=sample_weight,
                 rolling_args=rolling_args,
+                n_jobs=n_jobs,
+                plan=plan,
             )
         else:
             return self._rolling_evaluation(
@@ -282,22 +607,50 @@ class Metric(Generic[MetricResult]):
                 predictions=predictions,
                 sample_weight=sample_weight,
                 rolling_args=rolling_args,
+                n_jobs=n_jobs,
+                plan=plan,
             )
 
+    def get_rolling_series(self) -> Optional[pd.Series]:
+        """
+        The numerical rolling results as a `pd.Series`, a view of `result_rolling`
+        indexed by the first and last label of each window (or by the position of
+        the window, if `rolling_windows` is not set). None if the results are not
+        stored as a numerical `np.ndarray`.
+        """
+        if not isinstance(self.result_rolling, np.ndarray) or not np.issubdtype(
+            self.result_rolling.dtype, np.number
+        ):
+            return None
+        return pd.Series(
+            self.result_rolling,
+            index=None
+            if self.rolling_windows is None
+            or len(self.rolling_windows) != len(self.result_rolling)
+            else self.rolling_windows.to_index(),
+            name=self.key,
+            copy=False,
+        )
+
     def evaluate_rolling_properties(self) -> Metric:
-        if check_iterable_with_number(self.result_rolling):
-            return self.__safe_set(
-                pd.Series(
-                    data=dict(
-                        mean=np.mean(self.result_rolling),
-                        std=np.std(self.result_rolling),
-                        min=np.min(self.result_rolling),
-                        max=np.max(self.result_rolling),
-                    )
-                ),
-                key="rolling_properties",
-            )
-        return self
+        rolling_series = self.get_rolling_series()
+        if rolling_series is not None:
+            values = rolling_series.to_numpy()
+        elif check_iterable_with_number(self.result_rolling):
+            values = np.asarray(self.result_rolling)
+        else:
+            return self
+        return self.__safe_set(
+            pd.Series(
+                data=dict(
+                    mean=np.mean(values),
+                    std=np.std(values),
+                    min=np.min(values),
+                    max=np.max(values),
+                )
+            ),
+            key="rolling_properties",
+        )
 
     def evaluate_benchmark(
         self,
@@ -307,6 +660,9 @@ class Metric(Generic[MetricResult]):
         sample_weight: Optional[WeightsDS] = None,
         benchmark_models: Optional[List[Model]] = None,
         num_benchmark_iter: Optional[int] = None,
+        benchmark_tolerance: Optional[float] = None,
+        benchmark_seed: Optional[BenchmarkSeed] = None,
+        n_jobs: int = 1,
     ) -> Metric:
         assert benchmark_models is not None
 
@@ -321,6 +677,9 @@ class Metric(Generic[MetricResult]):
             probabilities,
             sample_weight,
             num_benchmark_iter,
+            tolerance=benchmark_tolerance,
+            seed=benchmark_seed,
+            n_jobs=n_jobs,
         )
 
     def is_evaluated(self, rolling: bool = False):
@@ -351,25 +710,76 @@ class Metric(Generic[MetricResult]):
         result: Union[Exception, MetricResult, List[MetricResult], pd.Series],
         key: str,
     ) -> Metric:
-        copied_self = deepcopy(self)
-
-        if copied_self.__dict__[key] is not None:
+        if self.__dict__[key] is not None:
             raise ValueError("This metric already contains a result.")
-        else:
-            copied_self.__dict__[key] = result
+        copied_self = self.copy()
+        copied_self.__dict__[key] = result
         return copied_self
 
+    def copy(self) -> Metric:
+        """
+        A copy of the `Metric` that shares the results with it (copy-on-write).
+
+        Results are never modified in place: storing a result creates a new copy of
+        the `Metric` instead, so sharing them is safe, and every result is only
+        allocated once. The mutable containers of the specification (eg.:
+        `parameters`) are copied.
+        """
+        copied = copy(self)
+        copied.__dict__.pop("_read_only", None)
+        for key in [
+            "parameters",
+            "diagnostics",
+            "requires",
+            "plot_funcs",
+            "plot_funcs_rolling",
+        ]:
+            value = self.__dict__.get(key, None)
+            if isinstance(value, (dict, list)):
+                copied.__dict__[key] = copy(value)
+        return copied
+
+    def set_read_only(self) -> Metric:
+        """
+        Makes the `Metric` read-only (eg.: a prototype shared by every `ScoreCard`):
+        assigning to it raises a `ValueError`. Its `copy` (or deep copy) is not
+        read-only.
+        """
+        self.__dict__["_read_only"] = True
+        return self
+
     def reset(self, inplace: bool = False) -> Metric:
         if inplace:
             self.result = None
             self.result_rolling = None
+            self.rolling_windows = None
+            self.result_rolling_by_window = None
+            self.rolling_windows_by_window = None
             self.rolling_properties = None
             self.diagnostics = None
             self._from_group = False
             self.comparison_result = None
             return self
         else:
-            return deepcopy(self).reset(inplace=True)
+            return self.copy().reset(inplace=True)
+
+
+def share_index(data: List[Any]) -> bool:
+    """Whether the (not `None`) inputs are aligned, ie.: have the same index."""
+    indices = [value.index for value in data if value is not None]
+    return all(index.equals(indices[0]) for index in indices[1:])
+
+
+def to_columnar(
+    results: Union[np.ndarray, List[MetricResult]]
+) -> Union[np.ndarray, List[MetricResult]]:
+    """Stores numerical rolling results as a `np.ndarray`, everything else as a list."""
+    if isinstance(results, np.ndarray) and results.dtype.kind in "biuf":
+        return results
+    results = results.tolist() if isinstance(results, np.ndarray) else results
+    if len(results) > 0 and all(isnumber(result) for result in results):
+        return np.asarray(results)
+    return results
 
 
 def create_diagram_rolling(obj: Metric) -> Optional[List[InteractiveFigure]]:
@@ -381,11 +791,14 @@ def create_diagram_rolling(obj: Metric) -> Optional[List[InteractiveFigure]]:
     elif isiterable(obj.result_rolling) and len(obj.result_rolling) > 0:
         if isinstance(obj.result_rolling[0], (pd.DataFrame, pd.Series)):
             return None
+        rolling_series = obj.get_rolling_series()
         return [
             InteractiveFigure(
                 f"{obj.key}_{plot_funcs_rolling.__name__}",
                 get_figure=plotly_interactive(
-                    plot_funcs_rolling, obj.result_rolling, title=obj.name
+                    plot_funcs_rolling,
+                    obj.result_rolling if rolling_series is None else rolling_series,
+                    title=obj.name,
                 ),
                 title=f"{obj.name} - {plot_funcs_rolling.__name__}",
                 category=obj.category,
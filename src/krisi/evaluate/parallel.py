@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import dill
+import numpy as np
+import pandas as pd
+
+from krisi.evaluate.rolling import RollingWindows
+from krisi.evaluate.type import ComputationalComplexity, ParallelBackend
+
+WindowsFunction = Callable[[pd.DataFrame, np.ndarray, np.ndarray], List[Any]]
+
+
+def is_shareable(values: np.ndarray) -> bool:
+    return values.dtype.kind in "biufcmM"
+
+
+@dataclass
+class SharedColumn:
+    """
+    A column of a `pd.DataFrame`, either placed in shared memory (`shm_name`) or,
+    if its dtype can not be shared (eg.: strings), carried along as it is (`values`).
+    """
+
+    name: Any
+    dtype: np.dtype
+    length: int
+    shm_name: Optional[str] = None
+    values: Optional[Any] = None
+
+    def attach(self) -> Tuple[Any, Optional[shared_memory.SharedMemory]]:
+        if self.shm_name is None:
+            return self.values, None
+        shm = shared_memory.SharedMemory(name=self.shm_name)
+        return (
+            np.ndarray((self.length,), dtype=self.dtype, buffer=shm.buf),
+            shm,
+        )
+
+
+@dataclass
+class SharedFrame:
+    """
+    A `pd.DataFrame` whose columns (and index) are placed in shared memory once, so
+    that worker processes can read zero-copy views of it instead of receiving a
+    pickled copy.
+    """
+
+    columns: List[SharedColumn]
+    index: SharedColumn
+
+    @classmethod
+    def from_frame(
+        cls, df: pd.DataFrame
+    ) -> Tuple[SharedFrame, List[shared_memory.SharedMemory]]:
+        blocks: List[shared_memory.SharedMemory] = []
+
+        def share(name: Any, values: Any) -> SharedColumn:
+            array = np.asarray(values)
+            if isinstance(values, pd.RangeIndex) or not is_shareable(array):
+                return SharedColumn(name, array.dtype, len(array), values=values)
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(shm)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+            return SharedColumn(name, array.dtype, len(array), shm_name=shm.name)
+
+        columns = [
+            share(name, df.iloc[:, i].to_numpy()) for i, name in enumerate(df.columns)
+        ]
+        return cls(columns, share(df.index.name, df.index)), blocks
+
+    def attach(self) -> Tuple[pd.DataFrame, List[shared_memory.SharedMemory]]:
+        blocks = []
+        data = {}
+        for i, column in enumerate(self.columns + [self.index]):
+            values, shm = column.attach()
+            data[i] = values
+            if shm is not None:
+                blocks.append(shm)
+        index = data.pop(len(self.columns))
+        df = pd.DataFrame(
+            data,
+            index=index
+            if isinstance(index, pd.Index)
+            else pd.Index(index, name=self.index.name),
+            copy=False,
+        )
+        df.columns = [column.name for column in self.columns]
+        return df, blocks
+
+
+def _evaluate_window_range(
+    shared_frame: SharedFrame,
+    serialized_func: bytes,
+    start: np.ndarray,
+    end: np.ndarray,
+) -> List[Any]:
+    func = dill.loads(serialized_func)
+    df, blocks = shared_frame.attach()
+    try:
+        return func(df, start, end)
+    finally:
+        del df
+        for shm in blocks:
+            try:
+                shm.close()
+            except BufferError:
+                # A result still refers to the shared memory (eg.: a slice of the
+                # window), the mapping is released with the process.
+                pass
+
+
+def evaluate_windows_in_parallel(
+    df: pd.DataFrame,
+    windows: RollingWindows,
+    func: WindowsFunction,
+    n_jobs: int,
+) -> List[Any]:
+    """
+    Evaluates `func` on the windows of `df` with a pool of `n_jobs` processes.
+
+    The data is placed in shared memory once, and each process receives a
+    contiguous range of windows, so nothing is pickled per window. The results are
+    returned in the order of the windows.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The data the windows are laid over.
+    windows : RollingWindows
+        The positional boundaries of each window.
+    func : WindowsFunction
+        Receives `df` and the start and end positions of a range of windows, and
+        returns the result of each window.
+    n_jobs : int
+        Number of processes to use.
+
+    Returns
+    -------
+    List[Any]
+        The result of `func` on each window.
+    """
+    shared_frame, blocks = SharedFrame.from_frame(df)
+    serialized_func = dill.dumps(func)
+    # More chunks than processes, so that uneven windows don't leave processes idle
+    chunks = [
+        chunk
+        for chunk in np.array_split(np.arange(len(windows)), n_jobs * 4)
+        if len(chunk) > 0
+    ]
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [
+                executor.submit(
+                    _evaluate_window_range,
+                    shared_frame,
+                    serialized_func,
+                    windows.start[chunk],
+                    windows.end[chunk],
+                )
+                for chunk in chunks
+            ]
+            return [result for future in futures for result in future.result()]
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+# The function and the arguments a worker process of a `context_process_pool`
+# calls each task with
+_worker_context: Optional[Tuple[Callable[..., Any], Tuple[Any, ...]]] = None
+
+
+def _set_worker_context(serialized_context: bytes) -> None:
+    global _worker_context
+    _worker_context = dill.loads(serialized_context)
+    # Forked workers inherit the global random state, they must not draw the same
+    np.random.seed()
+
+
+def _call_with_worker_context(*args: Any) -> Any:
+    assert _worker_context is not None
+    func, context = _worker_context
+    return func(*context, *args)
+
+
+def context_process_pool(
+    func: Callable[..., Any], context: Tuple[Any, ...], n_jobs: int
+) -> ProcessPoolExecutor:
+    """
+    A pool of `n_jobs` processes, that receive `func` and the arguments shared by
+    every task (`context`) once, serialized with `dill`, instead of with each task.
+    Tasks are submitted with `submit_with_context`.
+    """
+    return ProcessPoolExecutor(
+        max_workers=n_jobs,
+        initializer=_set_worker_context,
+        initargs=(dill.dumps((func, context)),),
+    )
+
+
+def submit_with_context(executor: ProcessPoolExecutor, *args: Any) -> Future:
+    """Calls `func(*context, *args)` on a process of a `context_process_pool`."""
+    return executor.submit(_call_with_worker_context, *args)
+
+
+def _call_serialized(serialized_func: bytes) -> bytes:
+    return dill.dumps(dill.loads(serialized_func)())
+
+
+def scheduling_priority(complexity: Optional[ComputationalComplexity]) -> int:
+    """Tasks of higher priority are started first, `None` is the lowest."""
+    return (
+        0
+        if complexity is None
+        else [
+            ComputationalComplexity.low,
+            ComputationalComplexity.medium,
+            ComputationalComplexity.high,
+        ].index(complexity)
+        + 1
+    )
+
+
+def run_concurrently(
+    funcs: List[Callable[[], Any]],
+    complexities: List[Optional[ComputationalComplexity]],
+    n_jobs: int,
+    backend: ParallelBackend,
+) -> List[Any]:
+    """
+    Calls each of `funcs` on a pool of `n_jobs` threads or processes, starting the
+    most complex ones first, so that the total time approaches the time of the
+    slowest call, instead of the sum of them.
+
+    The results are collected in the order of `funcs`, so if calls raise, the
+    exception raised is the one a serial loop would have raised.
+
+    Parameters
+    ----------
+    funcs : List[Callable[[], Any]]
+        The calls to make. With the `process` backend, they (and their results) are
+        serialized with `dill`.
+    complexities : List[Optional[ComputationalComplexity]]
+        How resource intensive each call is.
+    n_jobs : int
+        Number of threads or processes to use.
+    backend : ParallelBackend
+        Whether the calls are made on threads or on processes.
+
+    Returns
+    -------
+    List[Any]
+        The result of each call.
+    """
+    order = sorted(
+        range(len(funcs)),
+        key=lambda i: scheduling_priority(complexities[i]),
+        reverse=True,
+    )
+    executor: Executor = (
+        ProcessPoolExecutor(max_workers=n_jobs)
+        if backend is ParallelBackend.process
+        else ThreadPoolExecutor(max_workers=n_jobs)
+    )
+    futures: Dict[int, Future] = {}
+    try:
+        for i in order:
+            futures[i] = (
+                executor.submit(_call_serialized, dill.dumps(funcs[i]))
+                if backend is ParallelBackend.process
+                else executor.submit(funcs[i])
+            )
+        results = [futures[i].result() for i in range(len(funcs))]
+    finally:
+        # Not `shutdown(cancel_futures=True)`, which requires python 3.9
+        for future in futures.values():
+            future.cancel()
+        executor.shutdown(wait=True)
+    return (
+        [dill.loads(result) for result in results]
+        if backend is ParallelBackend.process
+        else results
+    )
@@ -0,0 +1,831 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import BaseOffset, Tick
+
+from krisi.evaluate.type import WeightsDS
+
+
+@dataclass
+class RollingWindows:
+    """
+    Positional boundaries of the windows a `Metric` is evaluated on over time.
+
+    They are shared by the rolling results of every `Metric` evaluated over them, so
+    they are treated as immutable and are not copied along with a `Metric`.
+
+    Parameters
+    ----------
+    start: np.ndarray
+        Inclusive start position of each window.
+    end: np.ndarray
+        Exclusive end position of each window.
+    index: Optional[pd.Index]
+        Index of the data the windows are laid over, by default None
+    """
+
+    start: np.ndarray
+    end: np.ndarray
+    index: Optional[pd.Index] = None
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def __deepcopy__(self, memo: dict) -> RollingWindows:
+        return self
+
+    def to_index(self) -> pd.MultiIndex:
+        """
+        The first and the last label of the data within each window (or their
+        positions if `index` is not set).
+        """
+        index = (
+            self.index
+            if self.index is not None
+            else pd.RangeIndex(int(self.end.max(initial=0)))
+        )
+        return pd.MultiIndex.from_arrays(
+            [index[self.start], index[self.end - 1]],
+            names=["window_start", "window_end"],
+        )
+
+
+def _to_offset(value: Any) -> Optional[BaseOffset]:
+    """`value` as a `pd.DateOffset` if it describes a time offset (eg.: `"7D"`)."""
+    if value is None or isinstance(value, (int, np.integer)):
+        return None
+    try:
+        return to_offset(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def are_positional(rolling_args: Dict[str, Any]) -> bool:
+    """
+    Whether `rolling_args` describe windows of a fixed number of samples (or an
+    expanding window), that `get_rolling_windows` can lay out.
+    """
+    window = rolling_args.get("window", None)
+    step = rolling_args.get("step", None)
+    return (
+        (window is None or isinstance(window, (int, np.integer)))
+        and (step is None or isinstance(step, (int, np.integer)))
+        and set(rolling_args.keys())
+        <= {"window", "min_periods", "center", "closed", "step"}
+    )
+
+
+def are_time_based(rolling_args: Dict[str, Any], index: Optional[pd.Index]) -> bool:
+    """
+    Whether `rolling_args` describe windows spanning a fixed time offset (eg.:
+    `window="7D"`), or an expanding window checked at every time offset `step` (eg.:
+    `step="1D"`), that `get_rolling_windows` can lay out over `index`, a sorted
+    `pd.DatetimeIndex`.
+    """
+    window = rolling_args.get("window", None)
+    step = rolling_args.get("step", None)
+    window_offset, step_offset = _to_offset(window), _to_offset(step)
+    return (
+        isinstance(index, pd.DatetimeIndex)
+        and index.is_monotonic_increasing
+        and (window is None or isinstance(window_offset, Tick))
+        and (
+            step is None
+            or isinstance(step, (int, np.integer))
+            or step_offset is not None
+        )
+        and (window_offset is not None or step_offset is not None)
+        and set(rolling_args.keys()) <= {"window", "min_periods", "closed", "step"}
+    )
+
+
+def _time_window_bounds(
+    index: pd.DatetimeIndex, rolling_args: Dict[str, Any]
+) -> Tuple[np.ndarray, np.ndarray]:
+    window_offset = _to_offset(rolling_args.get("window", None))
+    step = rolling_args.get("step", None)
+    step_offset = _to_offset(step)
+    closed = rolling_args.get("closed", None) or "right"
+    timestamps = index.asi8
+
+    if step_offset is None:
+        # As `pd.DataFrame.rolling`, a window ends at each (`step`-th) sample
+        positions = np.arange(0, len(index), step, dtype=np.int64)
+        anchors = timestamps[positions]
+        end = positions + 1 if closed in ["right", "both"] else positions
+    else:
+        # A window ends at each multiple of `step` (aligned to the calendar, from the
+        # midnight before the first sample), until the last sample is covered
+        anchors = pd.date_range(
+            index[0].normalize(), index[-1] + step_offset, freq=step_offset
+        ).asi8
+        end = np.searchsorted(
+            timestamps, anchors, side="right" if closed in ["right", "both"] else "left"
+        )
+
+    if window_offset is None:
+        start = np.zeros_like(end)
+    else:
+        start = np.searchsorted(
+            timestamps,
+            anchors - pd.Timedelta(window_offset).value,
+            side="left" if closed in ["left", "both"] else "right",
+        )
+    return np.minimum(start, end).astype(np.int64), end.astype(np.int64)
+
+
+def get_rolling_windows(
+    num_values: int, rolling_args: Dict[str, Any], index: Optional[pd.Index] = None
+) -> RollingWindows:
+    """
+    Computes the window boundaries `pd.DataFrame.rolling` (or `pd.DataFrame.expanding`
+    if `window` is `None`) would iterate over, dropping the windows that are empty or
+    shorter than `min_periods`. Expanding windows also accept a `step`, to only
+    evaluate every `step`-th prefix.
+
+    Windows spanning a time offset (see `are_time_based`) are laid out over `index`
+    with binary searches. Unlike with `pd.DataFrame.rolling`, they accept a `step`,
+    either a number of samples or a time offset.
+
+    Parameters
+    ----------
+    num_values : int
+        Length of the data the windows are laid over.
+    rolling_args : Dict[str, Any]
+        Same arguments as passed onto `pd.DataFrame.rolling`.
+    index : Optional[pd.Index]
+        Index of the data the windows are laid over, required for windows spanning a
+        time offset, by default None
+
+    Returns
+    -------
+    RollingWindows
+        The positional start and end of each window.
+    """
+    window = rolling_args.get("window", None)
+    if are_time_based(rolling_args, index):
+        if num_values == 0:
+            start, end = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        else:
+            start, end = _time_window_bounds(index, rolling_args)
+    elif not are_positional(rolling_args):
+        raise ValueError(f"The windows of {rolling_args} can not be laid out.")
+    elif window is None:
+        # Every `step`-th prefix, as `rolling(window=num_values, min_periods=1, step=step)`
+        end = np.arange(
+            1, num_values + 1, rolling_args.get("step", None), dtype=np.int64
+        )
+        start = np.zeros_like(end)
+    else:
+        offset = (window - 1) // 2 if rolling_args.get("center", False) else 0
+        end = np.arange(
+            1 + offset,
+            num_values + 1 + offset,
+            rolling_args.get("step", None),
+            dtype=np.int64,
+        )
+        start = end - window
+        closed = rolling_args.get("closed", None)
+        if closed in ["left", "both"]:
+            start -= 1
+        if closed in ["left", "neither"]:
+            end -= 1
+        end = np.clip(end, 0, num_values)
+        start = np.clip(start, 0, num_values)
+
+    lengths = end - start
+    to_keep = lengths > 0
+    if rolling_args.get("min_periods", None) is not None:
+        to_keep &= lengths >= rolling_args["min_periods"]
+
+    return RollingWindows(start=start[to_keep], end=end[to_keep])
+
+
+class PrefixSums:
+    """
+    Cumulative sums of per-sample statistics, from which the sum over any window
+    is the difference of two prefix rows.
+
+    Floating point statistics are accumulated in blocks of `block_size` samples, so
+    that the rounding error of a window's sum is relative to its neighbourhood and
+    not to everything that came before it. Windows of non-negative statistics whose
+    sum could still be dominated by rounding error (eg.: a window right next to a
+    huge outlier) are summed up directly instead.
+
+    Parameters
+    ----------
+    columns : Dict[str, np.ndarray]
+        Per-sample statistics, each of the same length. Boolean and integer
+        statistics are accumulated exactly.
+    block_size : int
+        Number of samples accumulated together, by default 4096
+    """
+
+    rtol = 1e-8
+
+    def __init__(self, columns: Dict[str, np.ndarray], block_size: int = 4096) -> None:
+        self.columns = columns
+        self.block_size = block_size
+        # Accumulated on demand, as a single window (eg.: all the data) is summed directly
+        self.prefixes: Dict[str, Union[np.ndarray, Tuple]] = {}
+
+    def __prefix(self, values: np.ndarray) -> Union[np.ndarray, Tuple]:
+        if values.dtype.kind in "biu":
+            return np.concatenate([[0], np.cumsum(values, dtype=np.int64)])
+
+        num_blocks = len(values) // self.block_size + 1
+        blocks = np.zeros(num_blocks * self.block_size, dtype=np.float64)
+        blocks[: len(values)] = values
+        within_block = np.zeros((num_blocks, self.block_size + 1))
+        np.cumsum(
+            blocks.reshape(num_blocks, self.block_size), axis=1, out=within_block[:, 1:]
+        )
+        block_totals = within_block[:, -1]
+        return (
+            within_block,
+            block_totals,
+            np.concatenate([[0.0], np.cumsum(block_totals)]),
+            bool((values >= 0).all()),
+        )
+
+    def window_sums(self, windows: RollingWindows) -> Dict[str, np.ndarray]:
+        if len(windows) == 1:
+            start, end = int(windows.start[0]), int(windows.end[0])
+            return {
+                key: values[start:end].sum(
+                    keepdims=True,
+                    dtype=np.float64 if values.dtype.kind == "f" else None,
+                )
+                for key, values in self.columns.items()
+            }
+        return {key: self.__window_sums(key, windows) for key in self.columns.keys()}
+
+    def window_sums_many(
+        self, windows_list: List[RollingWindows]
+    ) -> List[Dict[str, np.ndarray]]:
+        return [self.window_sums(windows) for windows in windows_list]
+
+    def __window_sums(self, key: str, windows: RollingWindows) -> np.ndarray:
+        if key not in self.prefixes:
+            self.prefixes[key] = self.__prefix(self.columns[key])
+        prefix = self.prefixes[key]
+        if isinstance(prefix, np.ndarray):
+            return prefix[windows.end] - prefix[windows.start]
+
+        within_block, block_totals, across_blocks, non_negative = prefix
+        start_block, start_offset = np.divmod(windows.start, self.block_size)
+        end_block, end_offset = np.divmod(windows.end, self.block_size)
+        same_block = start_block == end_block
+
+        sums = np.where(
+            same_block,
+            within_block[end_block, end_offset]
+            - within_block[start_block, start_offset],
+            block_totals[start_block]
+            - within_block[start_block, start_offset]
+            + across_blocks[end_block]
+            - across_blocks[np.minimum(start_block + 1, end_block)]
+            + within_block[end_block, end_offset],
+        )
+
+        if non_negative:
+            eps = np.finfo(np.float64).eps
+            rounding_error = (
+                eps
+                * self.block_size
+                * (block_totals[start_block] + block_totals[end_block])
+                + eps * (end_block - start_block) * across_blocks[end_block]
+            )
+            values = self.columns[key]
+            for index in np.flatnonzero(rounding_error > self.rtol * sums):
+                sums[index] = values[windows.start[index] : windows.end[index]].sum()
+
+        return sums
+
+
+@dataclass
+class WindowConfusionMatrices:
+    """
+    Confusion matrices of each window.
+
+    Parameters
+    ----------
+    labels: np.ndarray
+        Sorted labels present anywhere in the targets or the predictions.
+    matrices: np.ndarray
+        Weighted confusion matrix of each window, of shape (windows, labels, labels),
+        with targets along the rows and predictions along the columns.
+    present: np.ndarray
+        Whether a label occurs in the targets or the predictions of a window,
+        regardless of its weight, of shape (windows, labels).
+    """
+
+    labels: np.ndarray
+    matrices: np.ndarray
+    present: np.ndarray
+
+
+class ConfusionMatrices:
+    """
+    Cumulative one-hot (label x prediction) counts, from which the confusion matrix
+    of any window is the difference of two prefix rows.
+
+    The counts are only accumulated up to the window boundaries, so memory scales
+    with the number of windows instead of the number of samples.
+
+    Parameters
+    ----------
+    labels : np.ndarray
+        Sorted labels present anywhere in the targets or the predictions.
+    y_codes : np.ndarray
+        Position of each target in `labels`.
+    pred_codes : np.ndarray
+        Position of each prediction in `labels`.
+    sample_weight : Optional[np.ndarray]
+        Weight of each sample, by default None
+    """
+
+    def __init__(
+        self,
+        labels: np.ndarray,
+        y_codes: np.ndarray,
+        pred_codes: np.ndarray,
+        sample_weight: Optional[np.ndarray] = None,
+    ) -> None:
+        self.labels = labels
+        self.codes = y_codes * len(labels) + pred_codes
+        self.sample_weight = sample_weight
+
+    def __prefix(
+        self, segments: np.ndarray, num_segments: int, weights: Optional[np.ndarray]
+    ) -> np.ndarray:
+        num_codes = len(self.labels) ** 2
+        counts = np.bincount(
+            segments * num_codes + self.codes,
+            weights=weights,
+            minlength=num_segments * num_codes,
+        )
+        return np.cumsum(counts.reshape(num_segments, num_codes), axis=0)
+
+    def window_sums(self, windows: RollingWindows) -> WindowConfusionMatrices:
+        return self.window_sums_many([windows])[0]
+
+    def window_sums_many(
+        self, windows_list: List[RollingWindows]
+    ) -> List[WindowConfusionMatrices]:
+        """
+        The confusion matrices of each set of windows (eg.: of different sizes),
+        counted in a single pass over the samples, up to the boundaries of all of
+        them.
+        """
+        boundaries = np.unique(
+            np.concatenate(
+                [np.zeros(1, dtype=np.int64)]
+                + [windows.start for windows in windows_list]
+                + [windows.end for windows in windows_list]
+            )
+        )
+        # Row `i` of the prefixes holds the counts of the samples before `boundaries[i]`
+        is_boundary = np.zeros(len(self.codes) + 1, dtype=np.int64)
+        is_boundary[boundaries] = 1
+        segments = np.cumsum(is_boundary)[: len(self.codes)]
+        counts = self.__prefix(segments, len(boundaries) + 1, None)
+        weighted = (
+            None
+            if self.sample_weight is None
+            else self.__prefix(segments, len(boundaries) + 1, self.sample_weight)
+        )
+
+        window_sums = []
+        for windows in windows_list:
+            start = np.searchsorted(boundaries, windows.start)
+            end = np.searchsorted(boundaries, windows.end)
+            shape = (len(windows), len(self.labels), len(self.labels))
+            window_counts = (counts[end] - counts[start]).reshape(shape)
+            present = (window_counts.sum(axis=1) + window_counts.sum(axis=2)) > 0
+            matrices = (
+                window_counts.astype(np.float64)
+                if weighted is None
+                else (weighted[end] - weighted[start]).reshape(shape)
+            )
+            window_sums.append(WindowConfusionMatrices(self.labels, matrices, present))
+        return window_sums
+
+
+def slides_efficiently(windows: RollingWindows) -> bool:
+    """
+    Whether updating a structure batch by batch, as the windows slide forward,
+    is cheaper than going through each window from scratch. That is the case when
+    the windows overlap, so that the samples entering and leaving them are only a
+    fraction of their total length.
+    """
+    if len(windows) == 0:
+        return False
+    num_moves = (windows.end[-1] - windows.start[0]) + (
+        windows.start[-1] - windows.start[0]
+    )
+    return 4 * num_moves < (windows.end - windows.start).sum()
+
+
+def sorted_windows(ranks: np.ndarray, windows: RollingWindows) -> Iterator[np.ndarray]:
+    """
+    The samples of each window, sorted by their rank (and then by position), kept
+    sorted as the windows slide forward: the samples entering or leaving a window
+    are searched for at once, in O(step log w), and inserted or deleted with a
+    single vectorized move of the rest of the window, instead of re-sorting it.
+    """
+    num_samples = len(ranks)
+    # Sorting by `rank * num_samples + index` sorts by score, and keeps the index
+    keys = ranks.astype(np.int64) * num_samples + np.arange(num_samples)
+    window_keys = np.empty(0, dtype=np.int64)
+    start, end = 0, 0
+    for window_start, window_end in zip(windows.start.tolist(), windows.end.tolist()):
+        if window_end > end:
+            entering = np.sort(keys[end:window_end])
+            window_keys = np.insert(
+                window_keys, np.searchsorted(window_keys, entering), entering
+            )
+            end = window_end
+        if window_start > start:
+            window_keys = np.delete(
+                window_keys, np.searchsorted(window_keys, keys[start:window_start])
+            )
+            start = window_start
+        yield window_keys % num_samples
+
+
+def _rank_groups(ranks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """The first and the last (exclusive) position of the tied `ranks` of each sample."""
+    is_first = np.append(True, ranks[1:] != ranks[:-1])
+    group_starts = np.flatnonzero(is_first)
+    group = np.cumsum(is_first) - 1
+    return group_starts[group], np.append(group_starts[1:], len(ranks))[group]
+
+
+class SlidingConcordance:
+    """
+    Weighted number of (positive, negative) pairs within each window where the
+    positive sample is ranked higher, with ties counted as half a pair: the
+    Mann-Whitney U statistic that the ROC AUC is a normalization of.
+
+    The samples of the windows are kept sorted by score as they slide forward (see
+    `sorted_windows`), so that the pairs are counted in a single vectorized pass
+    over each window, instead of re-sorting every window.
+
+    Parameters
+    ----------
+    ranks : np.ndarray
+        Dense rank of each sample's score.
+    positive : np.ndarray
+        Whether each sample belongs to the positive class.
+    sample_weight : Optional[np.ndarray]
+        Weight of each sample, by default None
+    """
+
+    def __init__(
+        self,
+        ranks: np.ndarray,
+        positive: np.ndarray,
+        sample_weight: Optional[np.ndarray] = None,
+    ) -> None:
+        self.ranks = ranks
+        self.positive = positive
+        self.sample_weight = (
+            np.ones(len(ranks)) if sample_weight is None else sample_weight
+        )
+
+    def window_sums_many(
+        self, windows_list: List[RollingWindows]
+    ) -> List[Optional[Dict[str, np.ndarray]]]:
+        return [self.window_sums(windows) for windows in windows_list]
+
+    def window_sums(self, windows: RollingWindows) -> Optional[Dict[str, np.ndarray]]:
+        if not slides_efficiently(windows):
+            return None
+
+        positive_weight = self.positive * self.sample_weight
+        negative_weight = ~self.positive * self.sample_weight
+        concordant = np.zeros(len(windows), dtype=np.float64)
+        for i, indices in enumerate(sorted_windows(self.ranks, windows)):
+            if len(indices) == 0:
+                continue
+            lower, upto = _rank_groups(self.ranks[indices])
+            negatives = np.append(0.0, np.cumsum(negative_weight[indices]))
+            # Twice the pairs: with the negative samples ranked lower, and the tied ones
+            concordant[i] = (
+                positive_weight[indices] @ (negatives[lower] + negatives[upto]) / 2
+            )
+
+        def window_sums(values: np.ndarray) -> np.ndarray:
+            cumulative = np.append(0.0, np.cumsum(values, dtype=np.float64))
+            return cumulative[windows.end] - cumulative[windows.start]
+
+        return {
+            "concordant": concordant,
+            "positive_weight": window_sums(positive_weight),
+            "negative_weight": window_sums(negative_weight),
+            "positive_count": window_sums(self.positive),
+            "negative_count": window_sums(~self.positive),
+        }
+
+
+class SlidingPrecision:
+    """
+    Sum of the precision at the score of each positive sample within each window,
+    which the average precision is a normalization of.
+
+    The samples of the windows are kept sorted by score as they slide forward (see
+    `sorted_windows`), so that the sum is a single vectorized pass over each window,
+    instead of re-sorting every window.
+
+    Parameters
+    ----------
+    ranks : np.ndarray
+        Dense rank of each sample's score.
+    positive : np.ndarray
+        Whether each sample belongs to the positive class.
+    sample_weight : Optional[np.ndarray]
+        Weight of each sample, by default None
+    """
+
+    def __init__(
+        self,
+        ranks: np.ndarray,
+        positive: np.ndarray,
+        sample_weight: Optional[np.ndarray] = None,
+    ) -> None:
+        self.ranks = ranks
+        self.positive = positive
+        self.sample_weight = (
+            np.ones(len(ranks)) if sample_weight is None else sample_weight
+        )
+
+    def window_sums_many(
+        self, windows_list: List[RollingWindows]
+    ) -> List[Optional[Dict[str, np.ndarray]]]:
+        return [self.window_sums(windows) for windows in windows_list]
+
+    def window_sums(self, windows: RollingWindows) -> Optional[Dict[str, np.ndarray]]:
+        if not slides_efficiently(windows):
+            return None
+
+        positive_weight = self.positive * self.sample_weight
+        sums = {
+            key: np.zeros(len(windows), dtype=np.float64)
+            for key in ["precision", "positive_weight"]
+        }
+        for i, indices in enumerate(sorted_windows(self.ranks, windows)):
+            if len(indices) == 0:
+                continue
+            # Walks the window from the highest score to the lowest
+            indices = indices[::-1]
+            ranks = self.ranks[indices]
+            is_last_of_rank = np.append(ranks[1:] != ranks[:-1], True)
+            positives = np.cumsum(positive_weight[indices])[is_last_of_rank]
+            predicted = np.cumsum(self.sample_weight[indices])[is_last_of_rank]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                precision = np.where(predicted != 0.0, positives / predicted, 0.0)
+            sums["precision"][i] = (np.diff(positives, prepend=0.0) * precision).sum()
+            sums["positive_weight"][i] = positives[-1]
+        return sums
+
+
+Statistics = Union[PrefixSums, ConfusionMatrices, SlidingConcordance, SlidingPrecision]
+
+
+@dataclass(frozen=True)
+class Decomposition:
+    """
+    Declares how a `Metric` breaks down into sums of per-sample statistics, so that
+    it can be evaluated on every window at once, in O(n), instead of calling
+    `func` once per window.
+
+    Parameters
+    ----------
+    statistics: Callable[..., Optional[Statistics]]
+        Receives the same arguments as `Metric.func` (without the `parameters`) and
+        returns the cumulative statistics, or `None` if the inputs can not be
+        decomposed (eg.: they contain NaNs). In the latter case, or if the
+        statistics' `window_sums` returns `None` for the windows at hand, the
+        `Metric` falls back to evaluating `func` on each window.
+    finalize: Callable[..., Optional[np.ndarray]]
+        Receives the per-window sums of the statistics (without modifying them, as
+        they are shared between `Metric`s) and the `parameters` of the `Metric` and
+        returns the value of the `Metric` for each window, or `None` if the
+        `parameters` are not supported.
+    exact: bool
+        Whether `finalize` reproduces `func` (up to floating point rounding). If so,
+        it also replaces `func` when the `Metric` is evaluated once, on all the data,
+        so that the statistics are shared with the other `Metric`s of the
+        `ScoreCard`, by default False
+    """
+
+    statistics: Callable[..., Optional[Statistics]]
+    finalize: Callable[..., Optional[np.ndarray]]
+    exact: bool = False
+
+    def __call__(
+        self,
+        *args,
+        sample_weight: Optional[WeightsDS] = None,
+        windows: RollingWindows,
+        **parameters,
+    ) -> Optional[np.ndarray]:
+        statistics = self.statistics(*args, sample_weight=sample_weight)
+        if statistics is None:
+            return None
+        sums = statistics.window_sums(windows)
+        if sums is None:
+            return None
+        return self.finalize(sums, **parameters)
+
+
+@dataclass(frozen=True)
+class SharedFunction:
+    """
+    Marks a function of the inputs (eg.: the residuals) whose result is computed
+    once per `WindowPlan` and shared by every `Metric` and `Group` that uses it, so
+    it must neither modify its inputs nor depend on anything else (eg.: the
+    `sample_weight`), and its result must not be modified.
+
+    Parameters
+    ----------
+    func: Callable
+        The function, called with the inputs only.
+    """
+
+    func: Callable
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.func(*args)
+
+
+def window_spec_key(rolling_args: Dict[str, Any]) -> str:
+    """The key the results over the windows described by `rolling_args` are stored at."""
+    return ", ".join(f"{key}={value}" for key, value in rolling_args.items())
+
+
+class WindowPlan:
+    """
+    The windows and inputs of one rolling evaluation, shared by every `Metric` that
+    is evaluated over them, so that windowing, concatenating the inputs and
+    accumulating the statistics of a `Decomposition` all happen once.
+
+    If `rolling_args` is a list of window specs, `plans` holds a plan for each of
+    them (keyed by `window_spec_key`), which share the inputs and the statistics:
+    the statistics are accumulated once and summed up over the windows of every
+    spec together.
+
+    If `rolling_args` is `None`, the plan consists of a single window over all the
+    data, for evaluating the `Metric`s once (see `Decomposition.exact`).
+
+    It may be shared between threads. A pickled copy (eg.: sent to another process)
+    starts with empty caches.
+
+    Parameters
+    ----------
+    num_values : int
+        Length of the data the windows are laid over.
+    rolling_args : Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]
+        Same arguments as passed onto `pd.DataFrame.rolling`, a list of them, or `None`.
+    index : Optional[pd.Index]
+        Index of the data the windows are laid over, by default None
+    """
+
+    def __init__(
+        self,
+        num_values: int,
+        rolling_args: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]],
+        index: Optional[pd.Index] = None,
+    ) -> None:
+        self.num_values = num_values
+        self.rolling_args = rolling_args
+        self.index = index
+        self.windows: Optional[RollingWindows] = None
+        self.plans: Optional[Dict[str, WindowPlan]] = None
+        self.__root = self
+        if rolling_args is None:
+            self.windows = RollingWindows(
+                np.zeros(min(num_values, 1), dtype=np.int64),
+                np.full(min(num_values, 1), num_values, dtype=np.int64),
+                index,
+            )
+        elif isinstance(rolling_args, list):
+            self.plans = {}
+            for spec in rolling_args:
+                key = window_spec_key(spec)
+                if key in self.plans:
+                    raise ValueError(f"Window spec `{key}` is listed more than once.")
+                self.plans[key] = WindowPlan(num_values, spec, index)
+                self.plans[key].__root = self
+        elif are_positional(rolling_args) or are_time_based(rolling_args, index):
+            self.windows = get_rolling_windows(num_values, rolling_args, index)
+            self.windows.index = index
+        # Values are kept along with the inputs they were computed from, so that the
+        # `id`s in the keys can't be reused by other objects.
+        self.__init_caches()
+
+    def __init_caches(self) -> None:
+        self.__frames: Dict[Tuple, Tuple[pd.DataFrame, Tuple]] = {}
+        self.__window_sums: Dict[Tuple, Tuple[Dict[str, Any], Tuple]] = {}
+        self.__shared: Dict[Tuple, Tuple[Any, Tuple]] = {}
+        self.__lock = threading.RLock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        for cache in ["frames", "window_sums", "shared", "lock"]:
+            del state[f"_WindowPlan__{cache}"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.__init_caches()
+
+    @property
+    def key(self) -> str:
+        return (
+            window_spec_key(self.rolling_args)
+            if isinstance(self.rolling_args, dict)
+            else ""
+        )
+
+    def for_inputs(self, data: Any) -> WindowPlan:
+        """The plan to use for `data` (eg.: after preprocessing)."""
+        if len(data) == self.num_values:
+            return self
+        return WindowPlan(len(data), self.rolling_args, getattr(data, "index", None))
+
+    def frame(self, inputs: Tuple, sample_weight: Optional[WeightsDS]) -> pd.DataFrame:
+        """
+        The inputs concatenated into a single `pd.DataFrame`, with the weights in the
+        `sample_weight` column. It is shared, so it must not be modified.
+        """
+        frames = self.__root.__frames
+        key = tuple(id(data) for data in inputs) + (id(sample_weight),)
+        with self.__root.__lock:
+            if key not in frames:
+                df = pd.concat(inputs, axis="columns", copy=False)
+                if sample_weight is not None:
+                    df["sample_weight"] = sample_weight
+                frames[key] = (df, inputs + (sample_weight,))
+            return frames[key][0]
+
+    def window_sums(
+        self,
+        statistics: Callable[..., Optional[Statistics]],
+        inputs: Tuple,
+        sample_weight: Optional[WeightsDS],
+    ) -> Optional[Any]:
+        """
+        The per-window sums of `statistics` over `inputs`, or `None` if they can not
+        be decomposed. They are shared, so they must not be modified.
+        """
+        if self.windows is None:
+            return None
+        root = self.__root
+        all_window_sums = root.__window_sums
+        key = (statistics,) + tuple(id(data) for data in inputs) + (id(sample_weight),)
+        with root.__lock:
+            if key not in all_window_sums:
+                plans = [
+                    plan
+                    for plan in (
+                        [root] if root.plans is None else list(root.plans.values())
+                    )
+                    if plan.windows is not None
+                ]
+                cumulative = statistics(*inputs, sample_weight=sample_weight)
+                all_window_sums[key] = (
+                    dict()
+                    if cumulative is None
+                    else dict(
+                        zip(
+                            [plan.key for plan in plans],
+                            cumulative.window_sums_many(
+                                [plan.windows for plan in plans]
+                            ),
+                        )
+                    ),
+                    inputs + (sample_weight,),
+                )
+            return all_window_sums[key][0].get(self.key, None)
+
+    def shared(self, func: SharedFunction, inputs: Tuple) -> Any:
+        """
+        The result of `func` on `inputs`, computed once. Missing inputs at the end
+        (eg.: no probabilities) are left out, so they don't keep it from being shared.
+        """
+        while len(inputs) > 0 and inputs[-1] is None:
+            inputs = inputs[:-1]
+        shared = self.__root.__shared
+        key = (func,) + tuple(id(data) for data in inputs)
+        with self.__root.__lock:
+            if key not in shared:
+                shared[key] = (func(*inputs), inputs)
+            return shared[key][0]
@@ -1,11 +1,13 @@
 from typing import Any, Dict, List, Optional, Union
 
+from krisi.evaluate.benchmark import BenchmarkSeed
 from krisi.evaluate.metric import Metric
 from krisi.evaluate.scorecard import ScoreCard
 from krisi.evaluate.type import (
     Calculation,
     DatasetType,
     Model,
+    ParallelBackend,
     Predictions,
     Probabilities,
     SampleTypes,
@@ -28,10 +30,17 @@ def score(
     dataset_type: Optional[Union[DatasetType, str]] = None,
     sample_type: Union[str, SampleTypes] = SampleTypes.outofsample,
     calculation: Union[Calculation, str] = Calculation.single,
-    rolling_args: Optional[Dict[str, Any]] = None,
+    rolling_args: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
     raise_exceptions: bool = False,
+    trusted_input: bool = False,
+    lean: bool = False,
     benchmark_models: Optional[Union[Model, List[Model]]] = None,
     num_benchmark_iter: int = 100,
+    benchmark_tolerance: Optional[float] = None,
+    benchmark_seed: Optional[BenchmarkSeed] = None,
+    keep_benchmark_draws: bool = False,
+    n_jobs: int = 1,
+    backend: Union[str, ParallelBackend] = ParallelBackend.thread,
     **kwargs,
 ) -> ScoreCard:
     """
@@ -67,12 +76,41 @@ def score(
             - `Calculation.single`
             - `Calculation.rolling`
             - `Calculation.both`
-    rolling_args : Dict[str, Any], optional
-        Arguments to be passed onto `pd.DataFrame.rolling`.
+    rolling_args : Union[Dict[str, Any], List[Dict[str, Any]]], optional
+        Arguments to be passed onto `pd.DataFrame.rolling`. A list of them evaluates every
+        window spec in one pass, with the results keyed by spec in `Metric.result_rolling_by_window`.
+        Over a `pd.DatetimeIndex`, `window` and `step` may also be time offsets (eg.: `window="7D", step="1D"`),
+        with `step` aligned to the calendar.
         Default:
 
-        - The window size of the rolling metric evaluation. If `None` evaluation over time will be on expanding window basis, by default `len(dataset)//100`.
+        - The window size of the rolling metric evaluation. If `None` evaluation over time will be on expanding window basis (every `step`-th prefix if `step` is set), by default `len(dataset)//100`.
         - The step size of the rolling metric evaluation, by default `len(dataset)//100`.
+    trusted_input : bool, optional
+        Skips the validation checks that go through every value of the inputs, for
+        pipelines that already guarantee them, by default False
+    lean : bool, optional
+        Keeps the memory footprint of the inputs low (eg.: the labels in the smallest
+        integer dtype, float32 predictions as they are), logging what that costs in
+        accuracy, by default False
+    num_benchmark_iter : int, optional
+        Number of realizations drawn from each of the `benchmark_models`, or the most
+        that are drawn if `benchmark_tolerance` is set, by default 100
+    benchmark_tolerance : Optional[float], optional
+        If set, realizations are drawn until the standard errors of the mean of the
+        benchmark results and of the z-score of the result are within it, by default None
+    benchmark_seed : Optional[BenchmarkSeed], optional
+        The seed the benchmark realizations are drawn from, making them reproducible
+        for any `n_jobs`, by default None
+    keep_benchmark_draws : bool, optional
+        Keeps the benchmark realizations (as `ScoreCard.benchmark_draws`), to score
+        `Metric`s added later on them with `ScoreCard.rescore_benchmark`, by default False
+    n_jobs : int, optional
+        Number of processes the rolling evaluation of `Metric`s without a vectorized
+        rolling implementation and the benchmark realizations are split across, and
+        number of `Metric`s evaluated concurrently (on the whole data), by default 1
+    backend : Union[str, ParallelBackend], optional
+        Whether the `Metric`s are evaluated concurrently on threads or on processes,
+        by default ParallelBackend.thread
 
     Returns
     -------
@@ -105,6 +143,8 @@ def score(
         custom_metrics=custom_metrics,
         rolling_args=rolling_args,
         raise_exceptions=raise_exceptions,
+        trusted_input=trusted_input,
+        lean=lean,
         **kwargs,
     )
 
@@ -115,14 +155,21 @@ def score(
     ], f"Calculation type {calculation} not recognized."
 
     if calculation == Calculation.single:
-        sc.evaluate()
+        sc.evaluate(n_jobs=n_jobs, backend=backend)
     elif calculation == Calculation.rolling:
-        sc.evaluate_over_time()
+        sc.evaluate_over_time(n_jobs=n_jobs)
     elif calculation == Calculation.both:
-        sc.evaluate()
-        sc.evaluate_over_time()
+        sc.evaluate(n_jobs=n_jobs, backend=backend)
+        sc.evaluate_over_time(n_jobs=n_jobs)
     if benchmark_models is not None:
-        sc.evaluate_benchmark(benchmark_models, num_benchmark_iter)
+        sc.evaluate_benchmark(
+            benchmark_models,
+            num_benchmark_iter,
+            benchmark_tolerance=benchmark_tolerance,
+            benchmark_seed=benchmark_seed,
+            n_jobs=n_jobs,
+            keep_draws=keep_benchmark_draws,
+        )
 
     sc.cleanup_group()
     return sc
@@ -3,11 +3,13 @@ from __future__ import annotations
 import datetime
 import logging
 import os
-from copy import deepcopy
+from copy import copy, deepcopy
 from dataclasses import asdict
+from functools import partial
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from rich import print
 from typing_extensions import Literal
@@ -17,13 +19,18 @@ from krisi.evaluate.assertions import (
     check_valid_pred_target,
     infer_dataset_type,
 )
+from krisi.evaluate.benchmark import BenchmarkDraws, BenchmarkSeed, calculate_benchmarks
 from krisi.evaluate.group import Group
+from krisi.evaluate.intermediate import IntermediateCache
 from krisi.evaluate.library_.registry import get_default_metrics_for_dataset_type
 from krisi.evaluate.metric import Metric
+from krisi.evaluate.parallel import run_concurrently
+from krisi.evaluate.rolling import RollingWindows, WindowPlan
 from krisi.evaluate.type import (
     DatasetType,
     MetricCategories,
     Model,
+    ParallelBackend,
     PathConst,
     Predictions,
     PredictionsDS,
@@ -43,7 +50,10 @@ from krisi.evaluate.utils import (
     ensure_df,
     get_save_path,
     handle_unnamed,
+    precision_report,
     rename_probs_columns,
+    single_buffer,
+    smallest_integer_labels,
 )
 from krisi.report.console import (
     get_large_metric_summary,
@@ -106,12 +116,24 @@ class ScoreCard:
     custom_metrics: Optional[List[Metric]]
         Custom metrics that get evaluated. If specified it will evaluate these after `default_metric`
         See `library`.
-    rolling_args : Dict[str, Any], optional
-        Arguments to be passed onto `pd.DataFrame.rolling`.
+    rolling_args : Union[Dict[str, Any], List[Dict[str, Any]]], optional
+        Arguments to be passed onto `pd.DataFrame.rolling`. A list of them evaluates every
+        window spec in one pass, with the results keyed by spec in `Metric.result_rolling_by_window`.
+        Over a `pd.DatetimeIndex`, `window` and `step` may also be time offsets (eg.: `window="7D", step="1D"`),
+        with `step` aligned to the calendar.
         Default:
 
-        - The window size of the rolling metric evaluation. If `None` evaluation over time will be on expanding window basis, by default `None`.
+        - The window size of the rolling metric evaluation. If `None` evaluation over time will be on expanding window basis (every `step`-th prefix if `step` is set), by default `None`.
         - The step size of the rolling metric evaluation, by default `1`.
+    raise_exceptions: bool = False
+        Whether exceptions raised while evaluating a `Metric` should be raised, instead of stored as its result.
+    trusted_input: bool = False
+        Skips the validation checks that go through every value of the inputs (eg.: for infinite values), for
+        pipelines that already guarantee them. Set `dataset_type` too, to skip inferring it from the targets.
+    lean: bool = False
+        Keeps the memory footprint of the inputs low: the labels of a classification task are stored in the smallest
+        integer dtype that holds them, the probabilities in a single buffer that every `Metric` reads without copying,
+        and narrower dtypes (eg.: float32 predictions) are kept as they are. What that costs in accuracy is logged.
 
     Examples
     --------
@@ -132,7 +154,8 @@ class ScoreCard:
     custom_metrics_keys: List[str]
     dataset_type: DatasetType
     metadata: ScoreCardMetadata
-    rolling_args: Dict[str, Any]
+    rolling_args: Union[Dict[str, Any], List[Dict[str, Any]]]
+    benchmark_draws: Optional[BenchmarkDraws]
 
     def __init__(
         self,
@@ -150,8 +173,10 @@ class ScoreCard:
         sample_type: Union[str, SampleTypes] = SampleTypes.outofsample,
         default_metrics: Optional[Union[List[Metric], Metric]] = None,
         custom_metrics: Optional[Union[List[Metric], Metric]] = None,
-        rolling_args: Optional[Dict[str, Any]] = None,
+        rolling_args: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
         raise_exceptions: bool = False,
+        trusted_input: bool = False,
+        lean: bool = False,
     ) -> None:
         if raise_exceptions:
             state = get_global_state()
@@ -160,7 +185,7 @@ class ScoreCard:
 
         sample_type = SampleTypes.from_str(sample_type)
         dataset_type = DatasetType.from_str(dataset_type) if dataset_type else None
-        check_valid_pred_target(y, predictions, sample_weight)
+        check_valid_pred_target(y, predictions, sample_weight, trusted_input)
         default_metrics = (
             wrap_in_list(default_metrics) if default_metrics is not None else None
         )
@@ -188,6 +213,7 @@ class ScoreCard:
         )
 
         self.__dict__["sample_type"] = sample_type
+        self.__dict__["benchmark_draws"] = None
         if rolling_args is None:
             window_size = len(y) // 20  # 5% of the data
             rolling_args = dict(
@@ -204,6 +230,8 @@ class ScoreCard:
         self.__dict__["dataset_type"] = (
             infer_dataset_type(y) if dataset_type is None else dataset_type
         )
+        if lean:
+            self.__make_lean()
         model_name_, dataset_name_, project_name_ = handle_unnamed(
             y, predictions, model_name, dataset_name, project_name
         )
@@ -219,7 +247,6 @@ class ScoreCard:
         )
 
         if default_metrics is None:
-            self.__dict__["dataset_type"] = infer_dataset_type(y)
             default_metrics = get_default_metrics_for_dataset_type(self.dataset_type)
 
         self.__dict__["default_metrics_keys"] = [
@@ -231,17 +258,56 @@ class ScoreCard:
         self.__dict__["custom_metrics_keys"] = [metric.key for metric in custom_metrics]
 
         for metric in default_metrics:
-            self.__dict__[metric.key] = deepcopy(metric)
+            self.__dict__[metric.key] = metric.copy()
 
         for metric in custom_metrics:
-            self.__dict__[metric.key] = deepcopy(metric)
+            self.__dict__[metric.key] = metric.copy()
+
+    def __make_lean(self) -> None:
+        """
+        Stores the labels of a classification task in the smallest integer dtype,
+        and the probabilities in a single buffer, then logs what the dtypes of the
+        inputs cost in accuracy.
+        """
+        if self.dataset_type != DatasetType.regression:
+            for key in ["y", "predictions"]:
+                self.__dict__[key] = smallest_integer_labels(self.__dict__[key])
+        if self.probabilities is not None:
+            self.__dict__["probabilities"] = single_buffer(self.probabilities)
+        for line in precision_report(
+            dict(
+                y=self.y,
+                predictions=self.predictions,
+                probabilities=self.probabilities,
+                sample_weight=self.sample_weight,
+            )
+        ):
+            logger.info(line)
+
+    def __copy(self) -> ScoreCard:
+        """
+        A copy of the `ScoreCard`, that shares the inputs and the results of the
+        `Metric`s with it (see `Metric.copy`).
+        """
+        copied_scorecard = copy(self)
+        copied_scorecard.__dict__.update(
+            {
+                key: value.copy()
+                if isinstance(value, Metric)
+                else copy(value)
+                if isinstance(value, (list, dict, ScoreCardMetadata))
+                else value
+                for key, value in self.__dict__.items()
+            }
+        )
+        return copied_scorecard
 
     def __setitem__(self, key: str, item: Any) -> None:
         self.__setattr__(key, item)
 
     def __getitem__(self, key: Union[str, List[str]]) -> Union[ScoreCard, Metric]:
         if isinstance(key, List):
-            scorecard_copy = deepcopy(self)
+            scorecard_copy = self.__copy()
             all_keys = list(scorecard_copy.__dict__.keys())
             for k in all_keys:
                 if k not in key:
@@ -256,7 +322,7 @@ class ScoreCard:
                 assert len(splitted_key) == 2, f"Key {key} is not valid"
                 metric_key, comparison_key = splitted_key
 
-                metric = deepcopy(getattr(self, metric_key))
+                metric = getattr(self, metric_key).copy()
 
                 assert isinstance(
                     metric.comparison_result, pd.Series
@@ -273,7 +339,8 @@ class ScoreCard:
                 )
 
             else:
-                return deepcopy(getattr(self, key))
+                value = getattr(self, key)
+                return value.copy() if isinstance(value, Metric) else deepcopy(value)
 
     def __delitem__(self, key: str) -> None:
         del self[key]
@@ -387,6 +454,57 @@ class ScoreCard:
             ]
         )
 
+    def get_rolling_df(self, window_spec: Optional[str] = None) -> pd.DataFrame:
+        """
+        Returns a `pd.DataFrame` of the numerical rolling results, with one row per
+        window and one column per `Metric` (keyed by `Metric.key`), indexed by the
+        first and last label of each window.
+
+        Parameters
+        ----------
+        window_spec: Optional[str]
+            If `rolling_args` is a list of window specs, the key (see `window_spec_key`)
+            of the spec to return the results of. By default None, the first spec.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+
+        def get_result(metric: Metric) -> Tuple[Any, Optional[RollingWindows]]:
+            if window_spec is None:
+                return metric.result_rolling, metric.rolling_windows
+            if metric.result_rolling_by_window is None:
+                return None, None
+            return (
+                metric.result_rolling_by_window.get(window_spec, None),
+                metric.rolling_windows_by_window.get(window_spec, None),
+            )
+
+        results = {
+            metric.key: get_result(metric)
+            for metric in self.get_all_metrics()
+            if not isinstance(metric, Group)
+        }
+        results = {
+            key: (result, windows)
+            for key, (result, windows) in results.items()
+            if isinstance(result, np.ndarray) and windows is not None
+        }
+        if len(results) == 0:
+            return pd.DataFrame()
+
+        # Metrics evaluated on other windows (eg.: of a preprocessed `Group`) are left out
+        windows = next(iter(results.values()))[1]
+        return pd.DataFrame(
+            {
+                key: result
+                for key, (result, metric_windows) in results.items()
+                if metric_windows is windows
+            },
+            index=windows.to_index(),
+        )
+
     def get_default_metrics(self) -> List[Metric]:
         """
         Returns a List of Predefined Metrics according to task type:
@@ -474,27 +592,74 @@ class ScoreCard:
 
     def __evaluate(
         self,
-        func_key_evaluate: Literal[
-            "evaluate", "evaluate_over_time", "evaluate_benchmark"
-        ],
+        func_key_evaluate: Literal["evaluate", "evaluate_over_time"],
         defaults: bool = True,
         extra_args: Optional[Dict[str, Any]] = dict(),
+        n_jobs: int = 1,
+        backend: ParallelBackend = ParallelBackend.thread,
     ):
-        for metric in self.get_all_metrics(defaults=defaults):
-            if metric.restrict_to_sample is not self.sample_type:
-                self.__dict__[metric.key] = getattr(metric, func_key_evaluate)(
-                    self.y,
-                    self.predictions,
-                    self.probabilities,
-                    self.sample_weight,
-                    **extra_args,
-                )
+        metrics = [
+            metric
+            for metric in self.get_all_metrics(defaults=defaults)
+            if metric.restrict_to_sample is not self.sample_type
+        ]
+        # Each intermediate is computed once, and freed after its last `Metric`
+        cache = (
+            IntermediateCache(
+                [metric.requires for metric in metrics],
+                self.y,
+                self.predictions,
+                self.probabilities,
+                self.sample_weight,
+                plan=extra_args.get("plan", None),
+            )
+            if func_key_evaluate == "evaluate"
+            else None
+        )
+
+        def evaluate_metric(metric: Metric) -> Callable[[], Metric]:
+            return partial(
+                getattr(metric, func_key_evaluate),
+                self.y,
+                self.predictions,
+                self.probabilities,
+                self.sample_weight,
+                **extra_args,
+                **(
+                    {}
+                    if cache is None
+                    else {"intermediates": cache.acquire(metric.requires)}
+                ),
+            )
+
+        if n_jobs > 1:
+            evaluated = run_concurrently(
+                [evaluate_metric(metric) for metric in metrics],
+                [metric.comp_complexity for metric in metrics],
+                n_jobs,
+                backend,
+            )
+            for metric, evaluated_metric in zip(metrics, evaluated):
+                self.__dict__[metric.key] = evaluated_metric
+                if cache is not None:
+                    cache.release(metric.requires)
+            return
+
+        for metric in metrics:
+            self.__dict__[metric.key] = evaluate_metric(metric)()
+            if cache is not None:
+                cache.release(metric.requires)
 
     def evaluate_rolling_properties(self):
         for metric in self.get_all_metrics(defaults=True):
             self.__dict__[metric.key] = metric.evaluate_rolling_properties()
 
-    def evaluate(self, defaults: bool = True) -> None:
+    def evaluate(
+        self,
+        defaults: bool = True,
+        n_jobs: int = 1,
+        backend: Union[str, ParallelBackend] = ParallelBackend.thread,
+    ) -> None:
         """
         Evaluates `Metric`s present on the `ScoreCard`
 
@@ -502,41 +667,132 @@ class ScoreCard:
         ----------
         defaults: boolean
             Wether the default `Metric`s should be evaluated or not.
+        n_jobs: int
+            Number of `Metric`s evaluated concurrently. The ones with the highest
+            `comp_complexity` are started first. The results (and the exceptions
+            raised or stored) are the same as evaluating them one by one. Default value = 1
+        backend: Union[str, ParallelBackend]
+            Whether the `Metric`s are evaluated on threads or on processes, if `n_jobs` > 1.
+            Default value = `ParallelBackend.thread`
 
         Returns
         -------
         None
         """
-        self.__evaluate("evaluate", defaults=defaults)
+        self.__evaluate(
+            "evaluate",
+            defaults=defaults,
+            # Statistics (eg.: the confusion matrix) are shared between the metrics
+            extra_args={"plan": WindowPlan(len(self.y), None, self.y.index)},
+            n_jobs=n_jobs,
+            backend=ParallelBackend.from_str(backend),
+        )
 
     def evaluate_benchmark(
         self,
         benchmark_models: List[Model],
         num_benchmark_iter: int,
         defaults: bool = True,
+        benchmark_tolerance: Optional[float] = None,
+        benchmark_seed: Optional[BenchmarkSeed] = None,
+        n_jobs: int = 1,
+        keep_draws: bool = False,
     ) -> None:
         """
-        Evaluates `Metric`s to a benchmark on the `ScoreCard`
+        Evaluates `Metric`s to a benchmark on the `ScoreCard`. The realizations of each
+        benchmark `Model` are drawn once, and scored with every `Metric`.
 
         Parameters
         ----------
+        num_benchmark_iter: int
+            Number of realizations drawn from each benchmark `Model`, or the most that
+            are drawn if `benchmark_tolerance` is set.
         defaults: boolean
             Wether the default `Metric`s should be evaluated or not.
+        benchmark_tolerance: Optional[float]
+            If set, each `Metric` is scored on realizations until the standard errors of the
+            mean of its benchmark results and of the z-score of its result are within it. The
+            number scored on each `Model` is stored in `Metric.diagnostics["num_benchmark_iter"]`,
+            keyed by `benchmark_model_keys`. Default value = None
+        benchmark_seed: Optional[BenchmarkSeed]
+            The seed the realizations are drawn from. Given the same seed, the results are
+            the same for any `n_jobs`. Default value = None
+        n_jobs: int
+            Number of processes the batches of realizations are drawn and scored on.
+            Default value = 1
+        keep_draws: bool
+            Whether the realizations are kept (as `ScoreCard.benchmark_draws`), to score
+            `Metric`s added later on them with `rescore_benchmark`. They take
+            `len(y) * (1 + num_classes)` values per realization. Default value = False
 
         Returns
         -------
         None
         """
-        self.__evaluate(
-            "evaluate_benchmark",
-            defaults=defaults,
-            extra_args={
-                "benchmark_models": benchmark_models,
-                "num_benchmark_iter": num_benchmark_iter,
-            },
+        self.__benchmark(
+            defaults,
+            benchmark_models,
+            num_benchmark_iter,
+            tolerance=benchmark_tolerance,
+            seed=benchmark_seed,
+            n_jobs=n_jobs,
+            keep_draws=keep_draws,
+        )
+
+    def rescore_benchmark(self, defaults: bool = True) -> None:
+        """
+        Evaluates the `Metric`s that were not compared to the benchmark yet (eg.: added
+        since) on the realizations kept by `evaluate_benchmark(keep_draws=True)`, without
+        drawing new ones.
+
+        Parameters
+        ----------
+        defaults: boolean
+            Wether the default `Metric`s should be evaluated or not.
+
+        Returns
+        -------
+        None
+        """
+        draws = self.benchmark_draws
+        if draws is None:
+            raise ValueError(
+                "No benchmark realizations were kept, call `evaluate_benchmark` with `keep_draws=True` first."
+            )
+        self.__benchmark(defaults, draws.models, draws.num_benchmark_iter, draws=draws)
+
+    def __benchmark(
+        self,
+        defaults: bool,
+        benchmark_models: List[Model],
+        num_benchmark_iter: int,
+        draws: Optional[BenchmarkDraws] = None,
+        **kwargs,
+    ) -> None:
+        metrics = [
+            metric
+            for metric in self.get_all_metrics(defaults=defaults)
+            if metric.restrict_to_sample is not self.sample_type
+            and not metric.disable_benchmarking
+            and (draws is None or metric.comparison_result is None)
+        ]
+        benchmarked, draws = calculate_benchmarks(
+            metrics,
+            benchmark_models,
+            self.y,
+            self.predictions,
+            self.probabilities,
+            self.sample_weight,
+            num_benchmark_iter,
+            draws=draws,
+            **kwargs,
         )
+        for metric in benchmarked:
+            self.__dict__[metric.key] = metric
+        if draws is not None:
+            self.__dict__["benchmark_draws"] = draws
 
-    def evaluate_over_time(self, defaults: bool = True) -> None:
+    def evaluate_over_time(self, defaults: bool = True, n_jobs: int = 1) -> None:
         """
         Evaluates `Metric`s present on the `ScoreCard` over time, either with expanding
         or fixed sized window. Assigns list of results to `results_over_time`.
@@ -552,6 +808,9 @@ class ScoreCard:
         window: int
             Size of window. If number is provided then evaluation happens on a fixed window size,
             otherwise it evaluates it on an expanding window basis.
+        n_jobs: int
+            Number of processes the windows of `Metric`s without a vectorized rolling implementation
+            are split across. The inputs are placed in shared memory once. Default value = 1
 
         Returns
         -------
@@ -560,7 +819,12 @@ class ScoreCard:
         self.__evaluate(
             "evaluate_over_time",
             defaults=defaults,
-            extra_args={"rolling_args": self.rolling_args},
+            extra_args={
+                "rolling_args": self.rolling_args,
+                "n_jobs": n_jobs,
+                # Windows, inputs and statistics are shared between the metrics
+                "plan": WindowPlan(len(self.y), self.rolling_args, self.y.index),
+            },
         )
         self.evaluate_rolling_properties()
 
@@ -735,7 +999,7 @@ class ScoreCard:
         other: ScoreCard,
         function: Callable,
     ) -> ScoreCard:
-        copied_scorecard = deepcopy(self)
+        copied_scorecard = self.__copy()
 
         for key, value in copied_scorecard.__dict__.items():
             if isinstance(value, Metric) and key in other.__dict__.keys():
@@ -37,6 +37,7 @@ MetricFunction = Union[
     MetricFunctionProbWeights,
     MetricFunctionNoProbWeights,
 ]
+RollingMetricFunction = Callable[..., Optional[np.ndarray]]
 
 
 class MetricCategories(ParsableEnum):
@@ -82,6 +83,11 @@ class ComputationalComplexity(ParsableEnum):
     high = "high"
 
 
+class ParallelBackend(ParsableEnum):
+    thread = "thread"
+    process = "process"
+
+
 @dataclass
 class ScoreCardMetadata:
     save_path: Path
@@ -139,3 +145,26 @@ class Model:
         self, X: pd.DataFrame, y: pd.Series, sample_weight: Optional[WeightsDS] = None
     ) -> Tuple[pd.Series, pd.DataFrame]:
         raise NotImplementedError
+
+    def predict_batch(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        sample_weight: Optional[WeightsDS] = None,
+        n_iter: int = 1,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        `n_iter` realizations of `predict`, stacked: the predictions as an
+        `(n_iter, len(y))` array and the probabilities as an
+        `(n_iter, len(y), num_classes)` array (or `None`).
+
+        Models that draw their predictions should override it, to draw all the
+        realizations at once from `rng` (or from the global `np.random` state if it
+        is `None`). By default, `predict` is called `n_iter` times, ignoring `rng`.
+        """
+        realizations = [self.predict(X, y, sample_weight) for _ in range(n_iter)]
+        predictions = np.stack([np.asarray(preds) for preds, _ in realizations])
+        if any(probs is None for _, probs in realizations):
+            return predictions, None
+        return predictions, np.stack([np.asarray(probs) for _, probs in realizations])
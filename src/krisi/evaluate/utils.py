@@ -2,7 +2,7 @@ import datetime
 import os
 import uuid
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -112,8 +112,92 @@ def convert_to_series(
         The converted data.
     """
     if isinstance(data, pd.Series):
-        return data.rename(name)
-    return pd.Series(data, name=name)
+        return data.rename(name, copy=False)
+    # Arrays are wrapped without being copied, keeping their dtype (eg.: float32)
+    return pd.Series(data, name=name, copy=False)
+
+
+def smallest_integer_labels(data: pd.Series) -> pd.Series:
+    """
+    The labels of `data` in the smallest (signed) integer dtype that holds them, if
+    they are all whole numbers and none are missing, else `data` as it is.
+
+    Parameters
+    ----------
+    data : pd.Series
+        The labels of a classification task.
+
+    Returns
+    -------
+    pd.Series
+        The labels, with the same index and name.
+    """
+    values = data.to_numpy()
+    if len(values) == 0 or values.dtype.kind not in "iuf":
+        return data
+    low, high = values.min(), values.max()
+    if not (np.isfinite(low) and np.isfinite(high)):
+        return data
+    if values.dtype.kind == "f" and not np.array_equal(values, np.round(values)):
+        return data
+    dtype = next(
+        dtype
+        for dtype in [np.int8, np.int16, np.int32, np.int64]
+        if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max
+    )
+    if values.dtype == dtype:
+        return data
+    return pd.Series(values.astype(dtype), index=data.index, name=data.name)
+
+
+def single_buffer(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    `df` backed by a single 2D array (in the common dtype of its columns), so that
+    reading all of its values (eg.: `np.asarray(df)`) does not copy them. `df` is
+    only copied if its columns are not already stored together.
+    """
+    return pd.DataFrame(df.to_numpy(), index=df.index, columns=df.columns, copy=False)
+
+
+def precision_report(
+    inputs: Dict[str, Optional[Union[pd.Series, pd.DataFrame]]]
+) -> List[str]:
+    """
+    How the dtypes of the inputs, that are narrower than 64 bits, limit the
+    accuracy of the metrics computed from them.
+
+    Parameters
+    ----------
+    inputs : Dict[str, Optional[Union[pd.Series, pd.DataFrame]]]
+        The inputs, keyed by their name.
+
+    Returns
+    -------
+    List[str]
+        One line per narrow dtype of the inputs.
+    """
+    lines = []
+    for name, data in inputs.items():
+        if data is None:
+            continue
+        dtypes = (
+            data.dtypes.unique() if isinstance(data, pd.DataFrame) else [data.dtype]
+        )
+        for dtype in dtypes:
+            if dtype.kind == "f" and dtype.itemsize < 8:
+                finfo = np.finfo(dtype)
+                lines.append(
+                    f"`{name}` is {dtype.name}: every value is rounded to a relative {finfo.eps / 2:.1e} "
+                    f"(about {finfo.precision} significant digits). The rolling statistics are accumulated in "
+                    f"float64, the metrics summing them with numpy/sklearn accumulate in {dtype.name} "
+                    f"(pairwise), with a relative error of the order of {finfo.eps / 2 * np.log2(max(len(data), 2)):.1e}."
+                )
+            elif dtype.kind in "iu" and dtype.itemsize < 8:
+                lines.append(
+                    f"`{name}` is stored as {dtype.name}: the labels are exact, but arithmetic on them "
+                    f"(eg.: in custom metrics) overflows past {np.iinfo(dtype).max}."
+                )
+    return lines
 
 
 def ensure_df(data: Probabilities, name: str) -> pd.DataFrame:
@@ -152,6 +236,10 @@ def rename_probs_columns(df: pd.DataFrame) -> pd.DataFrame:
             for col in df.columns
         ]
     ):
-        return df.rename(columns={col: int(col.split("_")[-1]) for col in df.columns})
+        return df.rename(
+            columns={col: int(col.split("_")[-1]) for col in df.columns}, copy=False
+        )
     else:
-        return df.rename(columns={col: i for i, col in enumerate(df.columns)})
+        return df.rename(
+            columns={col: i for i, col in enumerate(df.columns)}, copy=False
+        )
@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING, Iterable, List, Union
 
+import numpy as np
 import pandas as pd
 from rich import box
 from rich.console import Group
@@ -29,7 +30,13 @@ def get_metric_string(obj: "Metric", repr: bool = False) -> str:
         hyperparams += "".join(
             [f"{key} - {value}" for key, value in obj.parameters.items()]
         )
-    if (
+    rolling_series = obj.get_rolling_series()
+    if obj.result is None and rolling_series is not None:
+        # Long results are summarized, without formatting every window
+        result_ = np.array2string(
+            rolling_series.to_numpy(), precision=5, separator=", ", threshold=20
+        )
+    elif (
         obj.result is None
         and obj.result_rolling is not None
         and isinstance(obj.result_rolling, Iterable)
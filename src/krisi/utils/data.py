@@ -1,5 +1,4 @@
 import itertools
-from random import sample
 from typing import List, Optional, Tuple, Union
 
 import numpy as np
@@ -171,6 +170,18 @@ def generate_synthetic_data(
     return X, y
 
 
+def synthetic_probability_moments(
+    target: pd.Series, sample_weights: Optional[pd.Series] = None
+) -> Tuple[float, float]:
+    """
+    The mean and the standard deviation of the (weighted) expanding mean of a binary
+    target, that the synthetic probabilities of the positive class are drawn with.
+    """
+    weighted_target = target if sample_weights is None else target * sample_weights
+    expanding_target_mean = weighted_target.expanding(min_periods=1).mean()
+    return expanding_target_mean.mean(), expanding_target_mean.std()
+
+
 def generate_synthetic_predictions_binary(
     target: pd.Series,
     sample_weights: Optional[pd.Series] = None,
@@ -179,14 +190,9 @@ def generate_synthetic_predictions_binary(
 ) -> pd.DataFrame:
     if index is None:
         index = target.index
-    if sample_weights is None:
-        sample_weights = pd.Series(np.ones(len(target)), index=index)
-    target = target.copy()
-
-    weighted_target = target * sample_weights
-    expanding_target_mean = weighted_target.expanding(min_periods=1).mean()
-    prob_mean_class_1 = expanding_target_mean.mean()
-    prob_std_class_1 = expanding_target_mean.std()
+    prob_mean_class_1, prob_std_class_1 = synthetic_probability_moments(
+        target, sample_weights
+    )
     prob_class_1 = pd.Series(
         np.random.normal(prob_mean_class_1, prob_std_class_1, len(index)).clip(0, 1)
     )
@@ -209,8 +215,102 @@ def generate_synthetic_predictions_binary(
     )
 
 
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    The mean of the last `window` values (fewer at the start) along the last axis,
+    as `pd.Series.rolling(window, min_periods=1).mean()` computes it.
+    """
+    cumsum = np.cumsum(values, axis=-1)
+    sums = cumsum.copy()
+    sums[..., window:] -= cumsum[..., :-window]
+    counts = np.minimum(np.arange(1, values.shape[-1] + 1), window)
+    return sums / counts
+
+
+def generate_synthetic_predictions_binary_batch(
+    target: pd.Series,
+    sample_weights: Optional[pd.Series] = None,
+    n_iter: int = 1,
+    smoothing_window: Optional[int] = None,
+    rng: Optional[np.random.Generator] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    `n_iter` realizations of `generate_synthetic_predictions_binary`, drawn at once.
+
+    Parameters
+    ----------
+    target : pd.Series
+        The binary target.
+    sample_weights : Optional[pd.Series]
+        The weights of the target, by default None
+    n_iter : int
+        The number of realizations, by default 1
+    smoothing_window : Optional[int]
+        The window the probabilities are smoothed over, by default None
+    rng : Optional[np.random.Generator]
+        The generator the probabilities are drawn with, by default the global
+        `np.random` state (drawing the same values as calling
+        `generate_synthetic_predictions_binary` `n_iter` times).
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The predictions, of shape `(n_iter, len(target))`, and the probabilities of
+        both classes, of shape `(n_iter, len(target), 2)`.
+    """
+    prob_mean_class_1, prob_std_class_1 = synthetic_probability_moments(
+        target, sample_weights
+    )
+    prob_class_1 = (
+        (np.random if rng is None else rng)
+        .normal(prob_mean_class_1, prob_std_class_1, (n_iter, len(target)))
+        .clip(0, 1)
+    )
+    if smoothing_window is not None:
+        prob_class_1 = rolling_mean(prob_class_1, smoothing_window)
+
+    predictions = (prob_class_1 > prob_class_1.mean(axis=1, keepdims=True)).astype(
+        "int"
+    )
+    return predictions, np.stack([1 - prob_class_1, prob_class_1], axis=-1)
+
+
+def shuffled_chunk_positions(
+    num_rows: int,
+    chunk_size: Union[int, float],
+    n_iter: int = 1,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    The positions of the rows after each of `n_iter` shuffles of their chunks, as
+    `shuffle_df_in_chunks` shuffles them (the remaining rows staying at the end).
+
+    Returns
+    -------
+    np.ndarray
+        The position of the row that ends up at each position, of shape
+        `(n_iter, num_rows)`.
+    """
+    chunk_size = (
+        int(chunk_size * num_rows) if isinstance(chunk_size, float) else chunk_size
+    )
+    num_chunks = num_rows // chunk_size
+    chunk_order = (
+        (np.random if rng is None else rng).random((n_iter, num_chunks)).argsort(axis=1)
+    )
+    positions = (
+        chunk_order[:, :, np.newaxis] * chunk_size + np.arange(chunk_size)
+    ).reshape(n_iter, num_chunks * chunk_size)
+    remaining = np.broadcast_to(
+        np.arange(num_chunks * chunk_size, num_rows), (n_iter, num_rows % chunk_size)
+    )
+    return np.concatenate([positions, remaining], axis=1)
+
+
 def shuffle_df_in_chunks(
-    df: pd.DataFrame, chunk_size: Union[int, float]
+    df: pd.DataFrame,
+    chunk_size: Union[int, float],
+    rng: Optional[np.random.Generator] = None,
 ) -> pd.DataFrame:
     """Shuffles a dataframe by rows in chunks.
 
@@ -220,6 +320,9 @@ def shuffle_df_in_chunks(
         Data, whose rows should be shuffled in chunks
     chunk_size : Union[int, float]
         Either a fixed chunk size or a fraction of the total number of rows
+    rng : Optional[np.random.Generator]
+        The generator the order of the chunks is drawn with, by default the global
+        `np.random` state
 
     Returns
     -------
@@ -234,7 +337,7 @@ def shuffle_df_in_chunks(
     num_rows = df.shape[0]
     num_chunks = num_rows // chunk_size
     shuffled_idx = []
-    for i in sample(list(range(num_chunks)), num_chunks):
+    for i in (np.random if rng is None else rng).permutation(num_chunks):
         start_idx = i * chunk_size
         end_idx = (i + 1) * chunk_size
         shuffled_idx.append(df.index[start_idx:end_idx])
@@ -1,9 +1,18 @@
 import numpy as np
 import pandas as pd
+import pytest
 
 from krisi import library
 from krisi.evaluate import score
-from krisi.evaluate.benchmark import calculate_benchmark, zscore
+from krisi.evaluate.benchmark import (
+    benchmark_model_keys,
+    benchmark_standard_errors,
+    calculate_benchmark,
+    evaluate_batch,
+    sequential_batch_size,
+    zscore,
+)
+from krisi.evaluate.type import Purpose
 from krisi.sharedtypes import Task
 from krisi.utils.data import (
     generate_synthetic_data,
@@ -176,3 +185,268 @@ def test_benchmarking_function():
     assert len(result_metric.comparison_result) == 2
     assert isinstance(result_metric.comparison_result.iloc[0], float)
     assert isinstance(result_metric.comparison_result.iloc[-1], float)
+
+
+def test_batched_benchmark_matches_evaluating_each_realization():
+    X, y = generate_synthetic_data(task=Task.classification, num_obs=500)
+    sample_weight = pd.Series(np.random.rand(len(y)))
+    X = generate_synthetic_predictions_binary(y, sample_weight)
+
+    predictions, probabilities = library.ModelRegistry.RandomClassifier().predict_batch(
+        X, y, sample_weight, n_iter=5
+    )
+    assert predictions.shape == (5, len(y))
+    assert probabilities.shape == (5, len(y), 2)
+
+    for (
+        metric
+    ) in library.ClassificationRegistry().binary_classification_balanced_metrics:
+        if metric.purpose in [Purpose.group, Purpose.diagram]:
+            continue
+        batched = evaluate_batch(metric, y, sample_weight, predictions, probabilities)
+        one_by_one = [
+            metric.evaluate(
+                y,
+                pd.Series(predictions[i], index=y.index),
+                pd.DataFrame(probabilities[i], index=y.index),
+                sample_weight,
+            ).result
+            for i in range(len(predictions))
+        ]
+        assert np.allclose(batched, one_by_one), metric.key
+
+
+def test_predict_batch_of_the_registry_models():
+    X, y = generate_synthetic_data(task=Task.classification, num_obs=300)
+    sample_weight = pd.Series(np.random.rand(len(y)))
+    X = generate_synthetic_predictions_binary(y, sample_weight)
+
+    models = [
+        library.ModelRegistry.RandomClassifier(),
+        library.ModelRegistry.RandomClassifierSmoothed(5),
+        library.ModelRegistry.RandomClassifierChunked(7),
+        library.ModelRegistry.PerfectModel(),
+        library.ModelRegistry.WorstModel(),
+    ]
+    for model in models:
+        predictions, probabilities = model.predict_batch(
+            X, y, sample_weight, n_iter=4, rng=np.random.default_rng(0)
+        )
+        assert predictions.shape == (4, len(y)), model.name
+        assert probabilities.shape == (4, len(y), 2), model.name
+        assert np.allclose(probabilities.sum(axis=2), 1.0), model.name
+
+        same_seed = model.predict_batch(
+            X, y, sample_weight, n_iter=4, rng=np.random.default_rng(0)
+        )
+        assert np.array_equal(predictions, same_seed[0]), model.name
+        assert np.array_equal(probabilities, same_seed[1]), model.name
+
+    # Drawn from the global state, the realizations are the same as `predict`'s
+    np.random.seed(0)
+    one_by_one = [
+        library.ModelRegistry.RandomClassifierSmoothed(5).predict(X, y, sample_weight)
+        for _ in range(3)
+    ]
+    np.random.seed(0)
+    predictions, probabilities = library.ModelRegistry.RandomClassifierSmoothed(
+        5
+    ).predict_batch(X, y, sample_weight, n_iter=3)
+    for i, (preds, probs) in enumerate(one_by_one):
+        assert np.array_equal(predictions[i], preds.to_numpy())
+        assert np.allclose(probabilities[i], probs.to_numpy())
+
+    # The rows are shuffled in chunks, that keep their order
+    predictions, _ = library.ModelRegistry.RandomClassifierChunked(7).predict_batch(
+        pd.DataFrame(dict(position=np.arange(len(y)), p0=0.5, p1=0.5)),
+        y,
+        n_iter=3,
+        rng=np.random.default_rng(0),
+    )
+    for positions in predictions:
+        assert sorted(positions) == list(range(len(y)))
+        chunks = positions[: len(y) // 7 * 7].reshape(-1, 7)
+        assert (np.diff(chunks, axis=1) == 1).all()
+
+
+def test_benchmark_stops_once_within_tolerance():
+    X, y = generate_synthetic_data(task=Task.classification, num_obs=500)
+    preds_probs = generate_synthetic_predictions_binary(y)
+    predictions = preds_probs.iloc[:, 0]
+    probabilities = preds_probs.iloc[:, 1:3]
+
+    tolerance, max_iter = 0.2, 1000
+    metric = calculate_benchmark(
+        metric=library.ClassificationRegistry().accuracy_binary,
+        models=[
+            library.ModelRegistry.RandomClassifier(),
+            library.ModelRegistry.PerfectModel(),
+        ],
+        y=y,
+        predictions=predictions,
+        probabilities=probabilities,
+        sample_weight=None,
+        num_benchmark_iter=max_iter,
+        tolerance=tolerance,
+    )
+    num_iter = metric.diagnostics["num_benchmark_iter"]
+
+    assert num_iter["NS"] < max_iter and num_iter["NS"] % sequential_batch_size == 0
+    # The benchmark results of a deterministic model don't vary
+    assert num_iter["PM"] == sequential_batch_size
+
+    assert benchmark_standard_errors(np.array([1.0, 1.0]), 0.0) == (0.0, 0.0)
+    results = np.random.normal(0.0, 1.0, 400)
+    standard_error_mean, standard_error_zscore = benchmark_standard_errors(results, 3.0)
+    assert np.isclose(standard_error_mean, results.std(ddof=1) / 20)
+    assert standard_error_zscore > benchmark_standard_errors(results, 0.0)[1]
+
+    fixed = calculate_benchmark(
+        metric=library.ClassificationRegistry().accuracy_binary,
+        models=[library.ModelRegistry.RandomClassifier()],
+        y=y,
+        predictions=predictions,
+        probabilities=probabilities,
+        sample_weight=None,
+        num_benchmark_iter=30,
+    )
+    assert fixed.diagnostics["num_benchmark_iter"] == {"NS": 30}
+
+
+@pytest.mark.parametrize("tolerance", [None, 0.2])
+def test_seeded_benchmark_is_the_same_for_any_number_of_processes(tolerance):
+    X, y = generate_synthetic_data(task=Task.classification, num_obs=300)
+    preds_probs = generate_synthetic_predictions_binary(y)
+
+    def benchmark(seed, n_jobs):
+        return calculate_benchmark(
+            metric=library.ClassificationRegistry().roc_auc_binary_macro,
+            models=[
+                library.ModelRegistry.RandomClassifier(),
+                library.ModelRegistry.RandomClassifierChunked(0.1),
+            ],
+            y=y,
+            predictions=preds_probs.iloc[:, 0],
+            probabilities=preds_probs.iloc[:, 1:3],
+            sample_weight=None,
+            num_benchmark_iter=200,
+            tolerance=tolerance,
+            seed=seed,
+            n_jobs=n_jobs,
+        )
+
+    serial, parallel = benchmark(7, 1), benchmark(7, 3)
+    assert np.array_equal(
+        serial.comparison_result.to_numpy(), parallel.comparison_result.to_numpy()
+    )
+    assert serial.diagnostics == parallel.diagnostics
+    assert serial.diagnostics["benchmark_seed"] == 7
+    assert not np.array_equal(
+        serial.comparison_result.to_numpy(),
+        benchmark(8, 1).comparison_result.to_numpy(),
+    )
+
+
+def test_benchmark_draws_are_shared_by_the_metrics_of_a_scorecard():
+    X, y = generate_synthetic_data(task=Task.classification, num_obs=300)
+    preds_probs = generate_synthetic_predictions_binary(y)
+    predictions = preds_probs.iloc[:, 0]
+    probabilities = preds_probs.iloc[:, 1:3]
+    calls = []
+
+    class CountedRandomClassifier(library.ModelRegistry.RandomClassifier):
+        def predict_batch(self, X, y, sample_weight=None, n_iter=1, rng=None):
+            calls.append(n_iter)
+            return super().predict_batch(X, y, sample_weight, n_iter, rng)
+
+    registry = library.ClassificationRegistry()
+    metrics = [
+        registry.accuracy_binary,
+        registry.f_one_score_macro,
+        registry.roc_auc_binary_macro,
+    ]
+    sc = score(
+        y,
+        predictions,
+        probabilities,
+        default_metrics=metrics[:2],
+        benchmark_models=CountedRandomClassifier(),
+        num_benchmark_iter=60,
+        benchmark_seed=3,
+        keep_benchmark_draws=True,
+    )
+    assert calls == [25, 25, 10]
+
+    # The same realizations as benchmarking each metric on its own
+    for metric in metrics[:2]:
+        alone = calculate_benchmark(
+            metric.copy(),
+            [library.ModelRegistry.RandomClassifier()],
+            y,
+            predictions,
+            probabilities,
+            None,
+            60,
+            seed=3,
+        )
+        assert np.array_equal(
+            sc[metric.key].comparison_result.to_numpy(),
+            alone.comparison_result.to_numpy(),
+        )
+
+    # Metrics added later are scored on the kept realizations
+    sc[metrics[2].key] = metrics[2].copy()
+    sc.rescore_benchmark()
+    assert calls == [25, 25, 10]
+    alone = calculate_benchmark(
+        metrics[2].copy(),
+        [library.ModelRegistry.RandomClassifier()],
+        y,
+        predictions,
+        probabilities,
+        None,
+        60,
+        seed=3,
+    )
+    assert np.array_equal(
+        sc[metrics[2].key].comparison_result.to_numpy(),
+        alone.comparison_result.to_numpy(),
+    )
+    assert sc[metrics[0].key].diagnostics["num_benchmark_iter"] == {"NS": 60}
+
+
+def test_models_with_the_same_name_are_kept_apart():
+    y = pd.Series(np.random.randint(0, 2, 300))
+    preds_probs = generate_synthetic_predictions_binary(y, None)
+    predictions, probabilities = preds_probs.iloc[:, 0], preds_probs.iloc[:, 1:3]
+    models = [
+        library.ModelRegistry.RandomClassifier(),
+        library.ModelRegistry.RandomClassifierChunked(7),
+        library.ModelRegistry.PerfectModel(),
+    ]
+    assert benchmark_model_keys(models) == ["NS_0", "NS_1", "PM"]
+
+    metric = calculate_benchmark(
+        library.ClassificationRegistry().f_one_score_macro,
+        models,
+        y,
+        predictions,
+        probabilities,
+        None,
+        20,
+        seed=0,
+    )
+
+    assert metric.diagnostics["num_benchmark_iter"] == {
+        "NS_0": 20,
+        "NS_1": 20,
+        "PM": 20,
+    }
+    assert list(metric.comparison_result.index) == [
+        "Δ NS_0",
+        "Δ NS_0_zscore",
+        "Δ NS_1",
+        "Δ NS_1_zscore",
+        "Δ PM",
+        "Δ PM_zscore",
+    ]
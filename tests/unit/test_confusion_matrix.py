@@ -0,0 +1,121 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from krisi import library, score
+from krisi.evaluate.library_.rolling_wrappers import _accuracy, confusion_statistics
+from krisi.evaluate.metric import Metric
+from krisi.evaluate.rolling import Decomposition, WindowPlan
+from krisi.evaluate.type import MetricCategories
+
+
+def get_count_based_metrics(binary: bool):
+    registry = library.ClassificationRegistry()
+    metrics = [
+        registry.accuracy_binary,
+        registry.accuracy_binary_balanced,
+        registry.recall_macro,
+        registry.precision_macro,
+        registry.kappa,
+        registry.f_one_score_macro,
+        registry.f_one_score_micro,
+        registry.f_one_score_weighted,
+        registry.matthew_corr,
+    ]
+    if binary:
+        metrics += [
+            registry.recall_binary,
+            registry.precision_binary,
+            registry.f_one_score_binary,
+            registry.s_score,
+        ]
+    return metrics
+
+
+def get_inputs(scenario: str):
+    num_samples = 1000
+    y = np.random.randint(0, 2, num_samples)
+    predictions = np.random.randint(0, 2, num_samples)
+    if scenario == "multiclass":
+        y, predictions = [np.random.randint(0, 4, num_samples) for _ in range(2)]
+    elif scenario == "strings":
+        y, predictions = (
+            np.array(["no", "yes"])[y],
+            np.array(["no", "yes"])[predictions],
+        )
+    elif scenario == "floats":
+        y, predictions = y.astype(float), predictions.astype(float)
+    elif scenario == "single_label":
+        y, predictions = np.zeros(num_samples, dtype=int), np.zeros_like(predictions)
+    elif scenario == "no_positive_predictions":
+        predictions = np.zeros_like(predictions)
+    return pd.Series(y, name="y"), pd.Series(predictions, name="predictions")
+
+
+@pytest.mark.parametrize(
+    "scenario",
+    [
+        "binary",
+        "multiclass",
+        "strings",
+        "floats",
+        "single_label",
+        "no_positive_predictions",
+    ],
+)
+@pytest.mark.parametrize("weighted", [True, False])
+def test_count_based_metrics_match_sklearn(scenario, weighted):
+    y, predictions = get_inputs(scenario)
+    sample_weight = (
+        pd.Series(np.random.rand(len(y)), name="sample_weight") if weighted else None
+    )
+    plan = WindowPlan(len(y), None, y.index)
+
+    for metric in get_count_based_metrics(binary=scenario != "multiclass"):
+        results = []
+        for evaluate in [
+            lambda: metric.evaluate(
+                y, predictions, sample_weight=sample_weight, plan=plan
+            ),
+            lambda: metric.evaluate(y, predictions, sample_weight=sample_weight),
+        ]:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                # Depending on the `RunType`, the exception is either raised or stored
+                try:
+                    results.append(evaluate().result)
+                except ValueError as e:
+                    results.append(e)
+
+        shared, sklearn = results
+        if isinstance(sklearn, Exception):
+            assert isinstance(shared, ValueError), metric.key
+        else:
+            assert np.isclose(shared, sklearn, equal_nan=True), metric.key
+
+
+def test_confusion_matrix_is_shared_by_the_metrics_of_a_scorecard():
+    calls = []
+
+    def statistics(*args, **kwargs):
+        calls.append(args)
+        return confusion_statistics(*args, **kwargs)
+
+    metrics = [
+        Metric(
+            name=f"Accuracy {i}",
+            category=MetricCategories.class_err,
+            func=lambda y, pred, **kwargs: float((y == pred).mean()),
+            func_rolling=Decomposition(statistics, _accuracy, exact=True),
+        )
+        for i in range(3)
+    ]
+    y, predictions = get_inputs("binary")
+
+    sc = score(y, predictions, default_metrics=[], custom_metrics=metrics)
+
+    assert len(calls) == 1
+    for metric in metrics:
+        assert np.isclose(sc[metric.key].result, (y == predictions).mean())
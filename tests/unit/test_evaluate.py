@@ -1,4 +1,12 @@
+import numpy as np
+import pandas as pd
+from sklearn.metrics import log_loss, mean_absolute_error
+
+from krisi import score
+from krisi.evaluate.metric import Metric
 from krisi.evaluate.scorecard import ScoreCard
+from krisi.evaluate.type import MetricCategories
+from krisi.evaluate.utils import precision_report
 from krisi.utils.data import generate_random_classification
 from krisi.utils.state import GlobalState, RunType, set_global_state
 
@@ -19,3 +27,81 @@ def test_sample_weights():
     sc.evaluate()
     sc.evaluate_over_time()
     sc.print()
+
+
+def test_single_precision_arrays_are_not_copied():
+    y = np.random.rand(10_000).astype(np.float32)
+    predictions = np.random.rand(10_000).astype(np.float32)
+    custom_metric = Metric(
+        name="Mean error",
+        category=MetricCategories.residual,
+        func=lambda y, pred, **kwargs: float((y - pred).mean()),
+    )
+
+    sc = score(
+        y,
+        predictions,
+        custom_metrics=[custom_metric],
+        calculation="both",
+        rolling_args=dict(window=1000, step=500),
+    )
+
+    assert sc.y.dtype == np.float32
+    assert np.shares_memory(sc.y.to_numpy(), y)
+    assert np.shares_memory(sc.predictions.to_numpy(), predictions)
+    assert np.isclose(
+        sc.mae.result,
+        mean_absolute_error(y.astype(np.float64), predictions.astype(np.float64)),
+        rtol=1e-6,
+    )
+    windows = sc[custom_metric.key].rolling_windows
+    expected = [
+        float((y[start:end] - predictions[start:end]).mean())
+        for start, end in zip(windows.start, windows.end)
+    ]
+    assert np.allclose(sc[custom_metric.key].result_rolling, expected)
+
+
+def test_lean_mode_keeps_narrow_dtypes():
+    num_samples, num_labels = 2000, 5
+    probabilities = np.random.rand(num_samples, num_labels).astype(np.float32)
+    probabilities /= probabilities.sum(axis=1, keepdims=True)
+    # The columns are stored apart
+    probabilities = pd.DataFrame(
+        {i: probabilities[:, i].copy() for i in range(num_labels)}, copy=False
+    )
+    y = np.random.randint(0, num_labels, num_samples)
+    predictions = probabilities.to_numpy().argmax(axis=1)
+
+    lean = score(y, predictions, probabilities, lean=True)
+    default = score(y, predictions, probabilities)
+
+    assert lean.y.dtype == np.int8 and lean.predictions.dtype == np.int8
+    assert (lean.probabilities.dtypes == np.float32).all()
+    # Columns stored apart are copied once, into the buffer every `Metric` reads
+    assert not np.shares_memory(
+        np.asarray(lean.probabilities), probabilities[0].to_numpy()
+    )
+    assert np.shares_memory(
+        np.asarray(lean.probabilities), lean.probabilities[0].to_numpy()
+    )
+    # Probabilities already stored in a single buffer are not copied
+    stored_together = probabilities.to_numpy()
+    lean_stored_together = score(
+        y, predictions, pd.DataFrame(stored_together, copy=False), lean=True
+    )
+    assert np.shares_memory(
+        np.asarray(lean_stored_together.probabilities), stored_together
+    )
+    assert np.isclose(
+        lean.cross_entropy.result,
+        log_loss(y, probabilities, labels=list(range(num_labels))),
+        rtol=1e-5,
+    )
+    for metric in default.get_all_metrics():
+        if isinstance(metric.result, float):
+            assert np.isclose(lean[metric.key].result, metric.result), metric.key
+
+    report = precision_report(dict(y=lean.y, probabilities=lean.probabilities))
+    assert len(report) == 2
+    assert "int8" in report[0] and "float32" in report[1]
@@ -3,10 +3,18 @@ from typing import List, Optional
 import numpy as np
 import pandas as pd
 
-from krisi import library
+from krisi import library, score
 from krisi.evaluate.group import Group
+from krisi.evaluate.library_.metric_wrappers import calculate_residuals
 from krisi.evaluate.metric import Metric
-from krisi.evaluate.type import PredictionsDS, ProbabilitiesDF, TargetsDS, WeightsDS
+from krisi.evaluate.rolling import WindowPlan
+from krisi.evaluate.type import (
+    ComputationalComplexity,
+    PredictionsDS,
+    ProbabilitiesDF,
+    TargetsDS,
+    WeightsDS,
+)
 
 
 def example_postporcess_func(
@@ -66,3 +74,46 @@ def test_group_postprocess():
         None,
         rolling_args={"window": 10, "min_periods": 10, "step": 10, "closed": "left"},
     )
+
+
+def test_residual_group_shares_residuals():
+    y = pd.Series(np.random.rand(1000), name="y")
+    predictions = pd.Series(np.random.rand(1000), name="predictions")
+    registry = library.RegressionRegistry()
+
+    sc = score(
+        y,
+        predictions,
+        default_metrics=[registry.residuals, registry.residual_group],
+    )
+
+    residuals = sc.residuals.result
+    pd.testing.assert_series_equal(residuals, y - predictions)
+    assert np.isclose(sc.residuals_mean.result, residuals.mean())
+    assert np.isclose(sc.residuals_std.result, residuals.std())
+
+    plan = WindowPlan(len(y), None, y.index)
+    assert plan.shared(calculate_residuals, (y, predictions)) is plan.shared(
+        calculate_residuals, (y, predictions, None)
+    )
+
+
+def test_group_aggregates_requires_and_comp_complexity_of_its_metrics():
+    registry = library.ClassificationRegistry()
+    group = Group[float](
+        name="ranking_group",
+        key="ranking_group",
+        metrics=[registry.s_score, registry.roc_auc_multi_micro],
+    )
+
+    assert group.requires == ["confusion_matrix", "sorted_scores", "one_hot_targets"]
+    assert group.comp_complexity == ComputationalComplexity.high
+    assert group.copy().requires == group.requires
+
+    y = pd.Series(np.random.randint(0, 2, 100))
+    evaluated = group.evaluate(y, y, None, None)
+    assert evaluated.requires == [
+        "confusion_matrix",
+        "sorted_scores",
+        "one_hot_targets",
+    ]
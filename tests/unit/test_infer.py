@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
+import pytest
 
-from krisi.evaluate.assertions import infer_dataset_type
+from krisi.evaluate.assertions import check_valid_pred_target, infer_dataset_type
 from krisi.evaluate.type import DatasetType
 
 
@@ -33,3 +35,46 @@ def test_recognize_binary_data():
         infer_dataset_type(pd.Series([0.0, 0.0, 1.0, 0.0, 0.0, 0.0]))
         is DatasetType.classification_binary_imbalanced
     )
+
+
+def test_targets_with_nans_are_regression_targets():
+    assert (
+        infer_dataset_type(pd.Series([0.0, 1.0, np.nan, 1.0, 0.0]))
+        is DatasetType.regression
+    )
+    assert (
+        infer_dataset_type(np.concatenate([np.zeros(2000), np.ones(2000), [np.nan]]))
+        is DatasetType.regression
+    )
+    assert infer_dataset_type(np.array([0.0, 1.0, np.inf])) is DatasetType.regression
+    # Only `None` targets of an object array are ignored
+    assert (
+        infer_dataset_type(np.array([0, 1, None, 1, 0], dtype=object))
+        is DatasetType.classification_binary_balanced
+    )
+
+
+def test_inference_checks_every_target_if_the_sample_is_whole_numbers():
+    # Regression targets, rounded in the first 1000 samples
+    y = np.random.normal(size=5000)
+    y[:1000] = np.round(y[:1000])
+    assert infer_dataset_type(y) is DatasetType.regression
+    assert infer_dataset_type(pd.Series(y)) is DatasetType.regression
+
+    y = np.random.randint(0, 3, 5000).astype(float)
+    assert infer_dataset_type(y) is DatasetType.classification_multiclass
+
+
+def test_validation():
+    y = np.random.randint(0, 2, 100)
+    check_valid_pred_target(y, y.astype(float), None)
+    check_valid_pred_target(y, y.astype(np.int16), None)
+
+    with pytest.raises(AssertionError):
+        check_valid_pred_target(y, y.astype(np.float16), None)
+    with pytest.raises(AssertionError):
+        check_valid_pred_target(y, np.full(100, np.inf), None)
+    with pytest.raises(AssertionError):
+        check_valid_pred_target(y, y[:-1], None)
+
+    check_valid_pred_target(y, np.full(100, np.inf), None, trusted_input=True)
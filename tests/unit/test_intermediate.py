@@ -0,0 +1,253 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import average_precision_score, confusion_matrix, roc_auc_score
+
+from krisi import Intermediate, library, score
+from krisi.evaluate.intermediate import (
+    IntermediateCache,
+    compute_intermediates,
+    resolve_intermediates,
+)
+from krisi.evaluate.library_ import metric_wrappers
+from krisi.evaluate.metric import Metric
+from krisi.evaluate.type import MetricCategories
+
+
+def test_intermediates_are_resolved_in_dependency_order():
+    squared = Intermediate(
+        "squared_residuals",
+        lambda *args, residuals, **kwargs: residuals**2,
+        requires=("residuals",),
+    )
+    total = Intermediate(
+        "total",
+        lambda *args, squared_residuals, residuals, **kwargs: squared_residuals.sum()
+        + residuals.sum(),
+        requires=(squared, "residuals"),
+    )
+
+    assert [intermediate.name for intermediate in resolve_intermediates([total])] == [
+        "residuals",
+        "squared_residuals",
+        "total",
+    ]
+
+    y, predictions = pd.Series([1.0, 2.0, 3.0]), pd.Series([0.0, 2.0, 5.0])
+    computed = compute_intermediates([total], y, predictions, None, None)
+    assert computed["total"] == 5.0 + (-1.0)
+
+
+def test_invalid_intermediates_raise():
+    with pytest.raises(ValueError):
+        resolve_intermediates(["unknown"])
+
+    first = Intermediate("first", lambda *args, **kwargs: None, requires=("second",))
+    second = Intermediate("second", lambda *args, **kwargs: None, requires=(first,))
+    with pytest.raises(ValueError):
+        resolve_intermediates([second])
+
+    with pytest.raises(ValueError):
+        resolve_intermediates(
+            [
+                Intermediate("same", lambda *args, **kwargs: 1),
+                Intermediate("same", lambda *args, **kwargs: 2),
+            ]
+        )
+
+
+def test_intermediates_are_computed_once_per_scorecard():
+    calls = []
+
+    def absolute_residuals(y, predictions, probabilities, sample_weight, residuals):
+        calls.append(len(y))
+        return residuals.abs()
+
+    intermediate = Intermediate(
+        "absolute_residuals", absolute_residuals, requires=("residuals",)
+    )
+    metrics = [
+        Metric(
+            name="Mean absolute residual",
+            category=MetricCategories.residual,
+            func=lambda y, pred, absolute_residuals, **kwargs: float(
+                absolute_residuals.mean()
+            ),
+            requires=[intermediate],
+        ),
+        Metric(
+            name="Max absolute residual",
+            category=MetricCategories.residual,
+            func=lambda y, pred, absolute_residuals, **kwargs: float(
+                absolute_residuals.max()
+            ),
+            requires=[intermediate],
+        ),
+    ]
+    y, predictions = pd.Series(np.random.rand(100)), pd.Series(np.random.rand(100))
+
+    sc = score(y, predictions, default_metrics=[], custom_metrics=metrics)
+
+    assert calls == [len(y)]
+    assert np.isclose(sc[metrics[0].key].result, (y - predictions).abs().mean())
+    assert np.isclose(sc[metrics[1].key].result, (y - predictions).abs().max())
+
+
+def test_intermediates_are_freed_after_their_last_consumer():
+    y, predictions = pd.Series([1, 0, 1, 1]), pd.Series([1, 1, 0, 1])
+    cache = IntermediateCache(
+        [["confusion_matrix"], ["confusion_matrix", "residuals"]],
+        y,
+        predictions,
+        None,
+        None,
+    )
+
+    cache.acquire(["confusion_matrix"])
+    cache.release(["confusion_matrix"])
+    assert "confusion_matrix" in cache.computed
+
+    intermediates = cache.acquire(["confusion_matrix", "residuals"])
+    assert set(intermediates.keys()) == {"confusion_matrix", "residuals"}
+    cache.release(["confusion_matrix", "residuals"])
+    assert len(cache.computed) == 0
+
+
+def test_confusion_matrix_intermediate_matches_sklearn():
+    y = pd.Series(np.random.randint(0, 3, 500))
+    predictions = pd.Series(np.random.randint(0, 3, 500))
+    sample_weight = pd.Series(np.random.rand(500))
+
+    computed = compute_intermediates(
+        ["confusion_matrix"], y, predictions, None, sample_weight
+    )
+
+    assert np.allclose(
+        computed["confusion_matrix"].to_numpy(),
+        confusion_matrix(y, predictions, sample_weight=sample_weight),
+    )
+
+
+@pytest.mark.parametrize("weighted", [True, False])
+@pytest.mark.parametrize("num_classes", [2, 3])
+def test_ranking_metrics_sort_each_class_once(monkeypatch, weighted, num_classes):
+    sorted_columns = []
+
+    def sort_descending(scores):
+        sorted_columns.append(len(scores))
+        return np.argsort(-scores, kind="stable")
+
+    monkeypatch.setattr(metric_wrappers, "_sort_descending", sort_descending)
+
+    num_samples = 1000
+    y = pd.Series(np.random.randint(0, num_classes, num_samples))
+    # Rounded, so that many of the scores are tied
+    probabilities = np.round(np.random.rand(num_samples, num_classes), 2) + 0.01
+    probabilities = pd.DataFrame(
+        probabilities / probabilities.sum(axis=1, keepdims=True)
+    )
+    sample_weight = pd.Series(np.random.rand(num_samples)) if weighted else None
+
+    registry = library.ClassificationRegistry()
+    if num_classes == 2:
+        metrics = [
+            registry.roc_auc_binary_macro,
+            registry.roc_auc_binary_weighted,
+            registry.avg_precision_macro,
+            registry.avg_precision_weighted,
+        ]
+        expected = [
+            roc_auc_score(y, probabilities[1], sample_weight=sample_weight),
+            roc_auc_score(y, probabilities[1], sample_weight=sample_weight),
+            average_precision_score(y, probabilities[1], sample_weight=sample_weight),
+            average_precision_score(y, probabilities[1], sample_weight=sample_weight),
+        ]
+    else:
+        metrics = [registry.roc_auc_multi_macro]
+        expected = [
+            roc_auc_score(
+                y, probabilities, sample_weight=sample_weight, multi_class="ovr"
+            )
+        ]
+
+    sc = score(
+        y,
+        y,
+        probabilities,
+        sample_weight=sample_weight,
+        default_metrics=[],
+        custom_metrics=metrics,
+    )
+
+    assert sorted_columns == [num_samples] * (num_classes if num_classes > 2 else 1)
+    for metric, result in zip(metrics, expected):
+        assert np.isclose(sc[metric.key].result, result), metric.key
+
+
+@pytest.mark.parametrize("weighted", [True, False])
+def test_micro_roc_auc_reads_the_one_hot_targets(weighted):
+    num_samples, num_classes = 1000, 3
+    y = pd.Series(np.random.randint(0, num_classes, num_samples))
+    probabilities = np.round(np.random.rand(num_samples, num_classes), 2) + 0.01
+    probabilities = pd.DataFrame(
+        probabilities / probabilities.sum(axis=1, keepdims=True)
+    )
+    sample_weight = pd.Series(np.random.rand(num_samples)) if weighted else None
+    metric = library.ClassificationRegistry().roc_auc_multi_micro
+
+    sc = score(
+        y,
+        y,
+        probabilities,
+        sample_weight=sample_weight,
+        default_metrics=[],
+        custom_metrics=[metric],
+    )
+
+    assert "one_hot_targets" in metric.requires
+    assert np.isclose(
+        sc[metric.key].result,
+        roc_auc_score(
+            y,
+            probabilities,
+            sample_weight=sample_weight,
+            multi_class="ovr",
+            average="micro",
+        ),
+    )
+
+
+def test_s_score_reads_the_confusion_matrix():
+    y = pd.Series(np.random.randint(0, 2, 500))
+    predictions = pd.Series(np.random.randint(0, 2, 500))
+    sample_weight = pd.Series(np.random.rand(500))
+    metric = library.ClassificationRegistry().s_score
+
+    sc = score(
+        y,
+        predictions,
+        sample_weight=sample_weight,
+        default_metrics=[],
+        custom_metrics=[metric],
+    )
+
+    tn, fp, fn, tp = confusion_matrix(
+        y, predictions, sample_weight=sample_weight
+    ).ravel()
+    expected = 2 * (tp + tn) / (tp + tn + fp + fn) - 1
+    assert metric.requires == ["confusion_matrix"]
+    assert np.isclose(sc[metric.key].result, expected)
+
+
+def test_s_score_computes_the_confusion_matrix_without_the_intermediate():
+    y = pd.Series(np.random.randint(0, 2, 500))
+    predictions = pd.Series(np.random.randint(0, 2, 500))
+    sample_weight = pd.Series(np.random.rand(500))
+
+    tn, fp, fn, tp = confusion_matrix(
+        y, predictions, sample_weight=sample_weight
+    ).ravel()
+    assert np.isclose(
+        metric_wrappers.bennet_s(y, predictions, sample_weight),
+        2 * (tp + tn) / (tp + tn + fp + fn) - 1,
+    )
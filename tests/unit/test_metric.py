@@ -1,12 +1,16 @@
+import tracemalloc
 from typing import Callable, Optional, Union
 
 import numpy as np
 import pandas as pd
+import pytest
 
 from krisi import library, score
 from krisi.evaluate.group import Group
+from krisi.evaluate.library_.registry import get_default_metrics_for_dataset_type
 from krisi.evaluate.type import (
     Calculation,
+    DatasetType,
     PredictionsDS,
     ProbabilitiesDF,
     Targets,
@@ -109,3 +113,78 @@ def test_args_rolling():
         calculation=Calculation.rolling,
         rolling_args={"window": window_size, "min_periods": min_periods},
     )
+
+
+def test_results_are_shared_not_copied():
+    y, predictions = pd.Series(np.random.rand(1000)), pd.Series(np.random.rand(1000))
+    sc = score(y, predictions)
+
+    residuals = sc["residuals"]
+    assert residuals is not sc.residuals
+    assert residuals.result is sc.residuals.result
+    assert sc[["residuals"]].residuals.result is sc.residuals.result
+
+    reset = residuals.reset()
+    assert reset.result is None and residuals.result is sc.residuals.result
+    reset.parameters["extra"] = 1
+    assert "extra" not in sc.residuals.parameters
+
+
+def test_peak_memory_is_a_small_multiple_of_the_inputs():
+    num_samples = 500_000
+    y = pd.Series(np.random.rand(num_samples))
+    predictions = pd.Series(np.random.rand(num_samples))
+    # Imports and caches warmed up
+    score(y.iloc[:100], predictions.iloc[:100])
+
+    tracemalloc.start()
+    try:
+        score(y, predictions)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < 5 * (y.nbytes + predictions.nbytes)
+
+
+def test_default_metric_prototypes_are_shared_but_not_modified():
+    prototypes = get_default_metrics_for_dataset_type(DatasetType.regression)
+    assert all(
+        a is b
+        for a, b in zip(
+            prototypes, get_default_metrics_for_dataset_type(DatasetType.regression)
+        )
+    )
+
+    sc = score(pd.Series(np.random.rand(100)), pd.Series(np.random.rand(100)))
+
+    for prototype in prototypes:
+        if isinstance(prototype, Group):
+            continue
+        assert sc[prototype.key].result is not None
+        assert prototype.result is None
+        assert sc.__dict__[prototype.key] is not prototype
+
+    with pytest.raises(ValueError):
+        prototypes[0].result = 1.0
+    with pytest.raises(ValueError):
+        prototypes[0]["parameters"] = dict(squared=True)
+    copied = prototypes[0].copy()
+    copied.result = 1.0
+    assert prototypes[0].result is None
+    registry_metric = library.RegressionRegistry().mae
+    registry_metric.func = lambda y, pred, **kwargs: 0.0
+    assert registry_metric is not prototypes[0]
+
+
+def test_replacing_func_drops_the_required_intermediates():
+    metric = library.ClassificationRegistry().roc_auc_binary_macro
+    assert len(metric.requires) > 0
+    metric.func = lambda y, probs, **kwargs: float(probs.iloc[:, 1].mean())
+
+    assert metric.requires == []
+    probabilities = pd.DataFrame({0: [0.8, 0.4, 0.3], 1: [0.2, 0.6, 0.7]})
+    evaluated = metric.evaluate(
+        pd.Series([0, 1, 1]), pd.Series([0, 1, 1]), probabilities
+    )
+    assert np.isclose(evaluated.result, 0.5)
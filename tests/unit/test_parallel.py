@@ -0,0 +1,181 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from krisi import score
+from krisi.evaluate.metric import Metric
+from krisi.evaluate.parallel import SharedFrame, run_concurrently
+from krisi.evaluate.type import (
+    ComputationalComplexity,
+    MetricCategories,
+    ParallelBackend,
+)
+
+
+def test_parallel_rolling_matches_serial():
+    index = pd.date_range("2023-01-01", periods=300, freq="H")
+    y = pd.Series(np.random.randint(0, 2, len(index)), index=index)
+    predictions = pd.Series(np.random.randint(0, 2, len(index)), index=index)
+    probs = np.random.rand(len(index))
+    probabilities = pd.DataFrame(dict(a=1 - probs, b=probs), index=index)
+    sample_weight = pd.Series(np.random.rand(len(index)), index=index)
+    custom_metrics = [
+        Metric(
+            name="Weighted hit rate",
+            category=MetricCategories.class_err,
+            func=lambda y, pred, sample_weight=None, **kwargs: float(
+                ((y == pred) * sample_weight).sum() / sample_weight.sum()
+            ),
+        ),
+        Metric(
+            name="Last timestamp",
+            category=MetricCategories.class_err,
+            func=lambda y, pred, **kwargs: y.index[-1],
+        ),
+        Metric(
+            name="Mean probability",
+            category=MetricCategories.class_err,
+            func=lambda y, probs, **kwargs: float(probs.iloc[:, 1].mean()),
+            accepts_probabilities=True,
+        ),
+    ]
+
+    scorecards = [
+        score(
+            y=y,
+            predictions=predictions,
+            probabilities=probabilities,
+            sample_weight=sample_weight,
+            default_metrics=[],
+            custom_metrics=custom_metrics,
+            calculation="rolling",
+            rolling_args=dict(window=50, step=7, min_periods=20),
+            n_jobs=n_jobs,
+        )
+        for n_jobs in [1, 2]
+    ]
+
+    for metric in custom_metrics:
+        serial, parallel = [sc[metric.key].result_rolling for sc in scorecards]
+        assert len(parallel) == len(serial) > 0
+        assert all(a == b for a, b in zip(parallel, serial))
+
+
+def test_shared_frame_roundtrip():
+    df = pd.DataFrame(
+        dict(
+            y=np.arange(10),
+            label=list("abcdefghij"),
+        ),
+        index=pd.date_range("2023-01-01", periods=10, name="date"),
+    )
+
+    shared_frame, blocks = SharedFrame.from_frame(df)
+    try:
+        attached, attached_blocks = shared_frame.attach()
+        pd.testing.assert_frame_equal(attached, df, check_freq=False)
+        assert np.shares_memory(
+            attached["y"].to_numpy(),
+            np.ndarray((10,), dtype=np.int64, buffer=attached_blocks[0].buf),
+        )
+        del attached
+        for shm in attached_blocks:
+            shm.close()
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def test_concurrent_evaluation_matches_serial():
+    y = pd.Series(np.random.randint(0, 2, 1000))
+    predictions = pd.Series(np.random.randint(0, 2, 1000))
+    probs = np.random.rand(1000)
+    probabilities = pd.DataFrame({0: 1 - probs, 1: probs})
+
+    serial, threads, processes = [
+        score(
+            y,
+            predictions,
+            probabilities,
+            n_jobs=n_jobs,
+            backend=backend,
+        )
+        for n_jobs, backend in [(1, "thread"), (4, "thread"), (2, "process")]
+    ]
+
+    for metric in serial.get_all_metrics():
+        for sc in [threads, processes]:
+            result = sc[metric.key].result
+            if isinstance(metric.result, Exception):
+                assert isinstance(result, type(metric.result))
+                assert str(result) == str(metric.result)
+            elif isinstance(metric.result, (float, int)):
+                assert result == metric.result or (
+                    np.isnan(result) and np.isnan(metric.result)
+                ), metric.key
+            elif isinstance(metric.result, pd.DataFrame):
+                pd.testing.assert_frame_equal(result, metric.result)
+
+
+def test_most_complex_calls_are_started_first():
+    started = []
+
+    def call(name: str):
+        return lambda: started.append(name) or name
+
+    complexities = [
+        None,
+        ComputationalComplexity.high,
+        ComputationalComplexity.low,
+        ComputationalComplexity.medium,
+        ComputationalComplexity.high,
+    ]
+    results = run_concurrently(
+        [call(str(i)) for i in range(len(complexities))],
+        complexities,
+        n_jobs=1,
+        backend=ParallelBackend.thread,
+    )
+
+    assert results == ["0", "1", "2", "3", "4"]
+    assert started == ["1", "4", "3", "2", "0"]
+
+
+def test_concurrent_calls_raise_as_serial_calls():
+    def fail(message: str):
+        def call():
+            raise ValueError(message)
+
+        return call
+
+    with pytest.raises(ValueError, match="first"):
+        run_concurrently(
+            [lambda: 1, fail("first"), fail("second")],
+            [None, None, ComputationalComplexity.high],
+            n_jobs=2,
+            backend=ParallelBackend.thread,
+        )
+
+
+def test_pending_calls_are_cancelled_after_a_failure():
+    started = []
+
+    def fail():
+        raise ValueError("failed")
+
+    def block():
+        started.append("block")
+        time.sleep(0.5)
+
+    with pytest.raises(ValueError, match="failed"):
+        run_concurrently(
+            [fail, block, lambda: started.append("pending")],
+            [ComputationalComplexity.high, ComputationalComplexity.medium, None],
+            n_jobs=1,
+            backend=ParallelBackend.thread,
+        )
+
+    assert "pending" not in started
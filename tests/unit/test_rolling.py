@@ -0,0 +1,534 @@
+import time
+import warnings
+from copy import deepcopy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from krisi import library, score
+from krisi.evaluate.library_.rolling_wrappers import (
+    confusion_statistics,
+    regression_statistics,
+)
+from krisi.evaluate.metric import Metric
+from krisi.evaluate.rolling import (
+    PrefixSums,
+    WindowPlan,
+    get_rolling_windows,
+    window_spec_key,
+)
+
+rolling_args_to_test = [
+    dict(window=50, step=50, min_periods=50, closed="left"),
+    dict(window=30, step=7),
+    dict(window=25, min_periods=10, closed="both"),
+    dict(window=40, step=3, closed="neither", center=True),
+    dict(window=None),
+    dict(window=None, step=9),
+]
+
+
+def rolling(df: pd.DataFrame, rolling_args: dict):
+    if rolling_args["window"] is None:
+        # Same as `df.expanding()`, but with checkpoints every `step`-th prefix
+        return df.rolling(window=len(df), min_periods=1, step=rolling_args.get("step"))
+    return df.rolling(**rolling_args)
+
+
+def evaluate_windowed(metric: Metric, *args, **kwargs) -> Metric:
+    metric = deepcopy(metric)
+    metric.func_rolling = None
+    return metric._rolling_evaluation(*args, **kwargs)
+
+
+@pytest.mark.parametrize("rolling_args", rolling_args_to_test)
+def test_rolling_windows_match_pandas(rolling_args):
+    df = pd.DataFrame(dict(a=np.arange(503)))
+    rolled = rolling(df, rolling_args)
+    expected = [
+        (window["a"].iloc[0], window["a"].iloc[-1] + 1)
+        for window in rolled
+        if len(window) > 0 and len(window) >= rolling_args.get("min_periods", 0)
+    ]
+
+    windows = get_rolling_windows(len(df), rolling_args)
+    assert list(zip(windows.start, windows.end)) == expected
+
+
+@pytest.mark.parametrize("rolling_args", rolling_args_to_test)
+def test_window_slices_match_pandas_rolling(rolling_args):
+    index = pd.date_range("2023-01-01", periods=211, freq="D")
+    y = pd.Series(np.random.rand(len(index)), index=index, name="y")
+    predictions = pd.Series(np.random.rand(len(index)), index=index, name="predictions")
+    sample_weight = pd.Series(np.random.rand(len(index)), index=index)
+    metric = Metric(
+        name="Window summary",
+        func=lambda y, pred, sample_weight=None, **kwargs: (
+            y.index[0],
+            len(y),
+            (pred * sample_weight).sum(),
+        ),
+    )
+
+    df = pd.concat([y, predictions, sample_weight.rename("sample_weight")], axis=1)
+    rolled = rolling(df, rolling_args)
+    expected = [
+        (
+            window.index[0],
+            len(window),
+            (window["predictions"] * window["sample_weight"]).sum(),
+        )
+        for window in rolled
+        if len(window) > 0 and len(window) >= rolling_args.get("min_periods", 0)
+    ]
+
+    assert (
+        metric._rolling_evaluation(
+            y=y,
+            predictions=predictions,
+            sample_weight=sample_weight,
+            rolling_args=rolling_args,
+        ).result_rolling
+        == expected
+    )
+
+
+@pytest.mark.parametrize("rolling_args", rolling_args_to_test)
+@pytest.mark.parametrize("weighted", [True, False])
+def test_decomposed_regression_metrics_match_windowed(rolling_args, weighted):
+    registry = library.RegressionRegistry()
+    y = pd.Series(np.random.normal(100.0, 5.0, 503), name="y")
+    predictions = pd.Series(y + np.random.normal(0.0, 2.0, len(y)), name="predictions")
+    y.iloc[10:20], predictions.iloc[15:20] = 0.0, 0.0
+    sample_weight = (
+        pd.Series(np.random.rand(len(y)), name="sample_weight") if weighted else None
+    )
+
+    for metric in [
+        registry.mae,
+        registry.mape,
+        registry.smape,
+        registry.mse,
+        registry.rmse,
+        registry.r_two,
+    ]:
+        assert metric.func_rolling is not None
+        kwargs = dict(
+            y=y,
+            predictions=predictions,
+            sample_weight=sample_weight,
+            rolling_args=rolling_args,
+        )
+        vectorized = metric._rolling_evaluation(**kwargs).result_rolling
+        windowed = evaluate_windowed(metric, **kwargs).result_rolling
+        assert np.allclose(vectorized, windowed, equal_nan=True), metric.key
+
+    residuals = y - predictions
+    for metric in [registry.residuals_mean, registry.residuals_std]:
+        kwargs = dict(sample_weight=sample_weight, rolling_args=rolling_args)
+        vectorized = metric._rolling_evaluation(residuals, **kwargs).result_rolling
+        windowed = evaluate_windowed(metric, residuals, **kwargs).result_rolling
+        assert np.allclose(vectorized, windowed, equal_nan=True), metric.key
+
+
+def test_replacing_func_resets_func_rolling():
+    metric = library.RegressionRegistry().mae
+    metric.func = lambda y, pred, **kwargs: 1.0
+
+    assert metric.func_rolling is None
+    assert np.array_equal(
+        metric._rolling_evaluation(
+            y=pd.Series(np.random.rand(100), name="y"),
+            predictions=pd.Series(np.random.rand(100), name="predictions"),
+            sample_weight=None,
+            rolling_args=dict(window=10, step=10),
+        ).result_rolling,
+        [1.0] * 10,
+    )
+
+
+def test_prefix_sums_match_direct_sums():
+    values = np.random.rand(1000)
+    values[500] = 1e17
+    windows = get_rolling_windows(len(values), dict(window=37, step=5))
+
+    sums = PrefixSums(
+        dict(values=values, counts=np.ones(len(values), dtype=np.int64)),
+        block_size=64,
+    ).window_sums(windows)
+
+    assert np.allclose(
+        sums["values"],
+        [values[start:end].sum() for start, end in zip(windows.start, windows.end)],
+        rtol=1e-12,
+    )
+    assert (sums["counts"] == windows.end - windows.start).all()
+
+
+@pytest.mark.parametrize("rolling_args", rolling_args_to_test)
+@pytest.mark.parametrize("weighted", [True, False])
+@pytest.mark.parametrize("num_labels", [2, 4])
+def test_decomposed_classification_metrics_match_windowed(
+    rolling_args, weighted, num_labels
+):
+    registry = library.ClassificationRegistry()
+    y = pd.Series(np.random.randint(0, num_labels, 211), name="y")
+    predictions = pd.Series(np.random.randint(0, num_labels, 211), name="predictions")
+    # Windows with a single class
+    y.iloc[100:180], predictions.iloc[130:180] = 0, 0
+    sample_weight = (
+        pd.Series(np.random.rand(len(y)), name="sample_weight") if weighted else None
+    )
+
+    metrics = [
+        registry.accuracy_binary,
+        registry.accuracy_binary_balanced,
+        registry.recall_macro,
+        registry.precision_macro,
+        registry.kappa,
+        registry.f_one_score_macro,
+        registry.f_one_score_micro,
+        registry.f_one_score_weighted,
+        registry.matthew_corr,
+    ]
+    if num_labels == 2:
+        metrics += [
+            registry.recall_binary,
+            registry.precision_binary,
+            registry.f_one_score_binary,
+        ]
+
+    for metric in metrics:
+        assert metric.func_rolling is not None
+        kwargs = dict(
+            y=y,
+            predictions=predictions,
+            sample_weight=sample_weight,
+            rolling_args=rolling_args,
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            vectorized = metric._rolling_evaluation(**kwargs).result_rolling
+            windowed = evaluate_windowed(metric, **kwargs).result_rolling
+        assert np.allclose(vectorized, windowed, equal_nan=True), metric.key
+
+
+def test_decomposed_classification_metrics_raise_as_windowed():
+    registry = library.ClassificationRegistry()
+    kwargs = dict(
+        y=pd.Series(np.tile([0, 1, 2, 0], 25), name="y"),
+        predictions=pd.Series(np.zeros(100, dtype=int), name="predictions"),
+        sample_weight=None,
+        rolling_args=dict(window=10),
+    )
+
+    for metric in [registry.f_one_score_binary, registry.precision_binary]:
+        for evaluate in [Metric._rolling_evaluation, evaluate_windowed]:
+            # Depending on the `RunType`, the exception is either raised or stored
+            try:
+                result = evaluate(metric, **kwargs).result_rolling
+            except ValueError as e:
+                result = e
+            assert isinstance(result, ValueError), metric.key
+
+
+@pytest.mark.parametrize(
+    "rolling_args",
+    [dict(window=40, step=3), dict(window=25, min_periods=10, closed="both")],
+)
+@pytest.mark.parametrize("weighted", [True, False])
+def test_sliding_ranking_metrics_match_windowed(rolling_args, weighted):
+    registry = library.ClassificationRegistry()
+    y = pd.Series(np.random.randint(0, 2, 211), name="y")
+    y.iloc[100:150] = 1
+    # Rounding leaves ties between the scores
+    probs = pd.Series(np.random.rand(len(y)).round(2))
+    probabilities = pd.DataFrame(dict(prob_0=1 - probs, prob_1=probs))
+    sample_weight = (
+        pd.Series(np.random.rand(len(y)), name="sample_weight") if weighted else None
+    )
+    windows = get_rolling_windows(len(y), rolling_args)
+
+    for metric in [registry.roc_auc_binary_macro, registry.avg_precision_macro]:
+        assert (
+            metric.func_rolling(
+                y,
+                probabilities,
+                sample_weight=sample_weight,
+                windows=windows,
+                **metric.parameters,
+            )
+            is not None
+        )
+        kwargs = dict(
+            y=y,
+            predictions=(probs > 0.5).astype(int).rename("predictions"),
+            probabilities=probabilities,
+            sample_weight=sample_weight,
+            rolling_args=rolling_args,
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            vectorized = metric._rolling_evaluation(**kwargs).result_rolling
+            windowed = evaluate_windowed(metric, **kwargs).result_rolling
+        for vectorized_result, windowed_result in zip(vectorized, windowed):
+            if isinstance(windowed_result, str):
+                assert vectorized_result == windowed_result
+            else:
+                assert np.isclose(vectorized_result, windowed_result), metric.key
+        assert len(vectorized) == len(windowed)
+
+
+def test_window_plan_is_shared_between_metrics():
+    registry = library.RegressionRegistry()
+    y = pd.Series(np.random.rand(200), name="y")
+    predictions = pd.Series(np.random.rand(200), name="predictions")
+    rolling_args = dict(window=20, step=5)
+    plan = WindowPlan(len(y), rolling_args)
+
+    for metric in [registry.mae, registry.mse, registry.rmsle]:
+        kwargs = dict(
+            y=y, predictions=predictions, sample_weight=None, rolling_args=rolling_args
+        )
+        assert np.array_equal(
+            metric._rolling_evaluation(**kwargs, plan=plan).result_rolling,
+            metric._rolling_evaluation(**kwargs).result_rolling,
+        )
+
+    assert plan.window_sums(regression_statistics, (y, predictions), None) is (
+        plan.window_sums(regression_statistics, (y, predictions), None)
+    )
+    assert plan.frame((y, predictions), None) is plan.frame((y, predictions), None)
+
+
+def test_rolling_results_are_columnar():
+    index = pd.date_range("2023-01-01", periods=100, freq="D")
+    sc = score(
+        y=pd.Series(np.random.rand(len(index)), index=index),
+        predictions=pd.Series(np.random.rand(len(index)), index=index),
+        default_metrics=[
+            library.RegressionRegistry().mae,
+            library.RegressionRegistry().rmsle,
+        ],
+        calculation="rolling",
+        rolling_args=dict(window=10, step=10),
+    )
+
+    assert isinstance(sc.mae.result_rolling, np.ndarray)
+    assert sc.mae.rolling_windows is sc.rmsle.rolling_windows
+    assert deepcopy(sc).mae.rolling_windows is sc.mae.rolling_windows
+
+    df = sc.get_rolling_df()
+    assert df.columns.tolist() == ["mae", "rmsle"]
+    windows = sc.mae.rolling_windows
+    assert (df.index.get_level_values("window_start") == index[windows.start]).all()
+    assert (df.index.get_level_values("window_end") == index[windows.end - 1]).all()
+    assert np.array_equal(df["rmsle"], sc.rmsle.result_rolling)
+
+    # The consumers of the rolling results read the same columnar store
+    rolling_series = sc.mae.get_rolling_series()
+    assert np.shares_memory(rolling_series.to_numpy(), sc.mae.result_rolling)
+    assert rolling_series.index.equals(df.index)
+    assert np.isclose(sc.mae.rolling_properties["mean"], np.mean(sc.mae.result_rolling))
+    assert str(sc.mae).count(",") == len(sc.mae.result_rolling) - 1
+    figure = sc.mae.get_diagram_over_time()[0].get_figure()
+    assert (figure.data[0].x == index[windows.end - 1]).all()
+
+
+def test_window_specs_are_evaluated_in_one_pass():
+    y = pd.Series(np.random.randint(0, 3, 300))
+    predictions = pd.Series(np.random.randint(0, 3, 300))
+    specs = [dict(window=7), dict(window=30, step=5), dict(window=None, step=10)]
+    metrics = [
+        library.ClassificationRegistry().accuracy_binary,
+        library.ClassificationRegistry().f_one_score_macro,
+    ]
+
+    sc = score(
+        y=y,
+        predictions=predictions,
+        default_metrics=metrics,
+        calculation="rolling",
+        rolling_args=specs,
+    )
+
+    for metric in metrics:
+        results = sc[metric.key].result_rolling_by_window
+        assert list(results.keys()) == [window_spec_key(spec) for spec in specs]
+        for spec in specs:
+            single = score(
+                y=y,
+                predictions=predictions,
+                default_metrics=[metric],
+                calculation="rolling",
+                rolling_args=spec,
+            )
+            assert np.allclose(
+                results[window_spec_key(spec)], single[metric.key].result_rolling
+            )
+        assert np.array_equal(sc[metric.key].result_rolling, results["window=7"])
+
+    weekly = sc.get_rolling_df("window=30, step=5")
+    accuracy = sc[metrics[0].key]
+    assert weekly.index.equals(
+        accuracy.rolling_windows_by_window["window=30, step=5"].to_index()
+    )
+    assert np.array_equal(
+        weekly[accuracy.key],
+        accuracy.result_rolling_by_window["window=30, step=5"],
+    )
+
+    calls = []
+
+    def statistics(*args, **kwargs):
+        calls.append(args)
+        return confusion_statistics(*args, **kwargs)
+
+    plan = WindowPlan(len(y), specs)
+    for spec_plan in plan.plans.values():
+        spec_plan.window_sums(statistics, (y, predictions), None)
+    assert len(calls) == 1
+
+
+def test_confusion_matrices_of_many_window_sets():
+    y = pd.Series(np.random.randint(0, 3, 500))
+    predictions = pd.Series(np.random.randint(0, 3, 500))
+    weights = pd.Series(np.random.rand(500))
+    windows_list = [
+        get_rolling_windows(len(y), dict(window=window, step=step))
+        for window, step in [(10, 1), (37, 5), (200, 50)]
+    ]
+
+    cumulative = confusion_statistics(y, predictions, sample_weight=weights)
+    for windows, many in zip(windows_list, cumulative.window_sums_many(windows_list)):
+        single = cumulative.window_sums(windows)
+        assert np.allclose(many.matrices, single.matrices)
+        assert (many.present == single.present).all()
+
+
+def irregular_index(num_values: int) -> pd.DatetimeIndex:
+    offsets = np.sort(np.random.randint(0, 30 * 24 * 3600, num_values))
+    # Samples sharing a timestamp
+    offsets[100:103] = offsets[100]
+    return pd.Timestamp("2023-01-01") + pd.to_timedelta(offsets, unit="s")
+
+
+@pytest.mark.parametrize("closed", [None, "right", "left", "both", "neither"])
+@pytest.mark.parametrize("min_periods", [None, 5])
+def test_time_windows_match_pandas(closed, min_periods):
+    index = irregular_index(503)
+    df = pd.DataFrame(dict(a=np.arange(len(index))), index=index)
+    rolling_args = {
+        key: value
+        for key, value in dict(
+            window="2D", closed=closed, min_periods=min_periods
+        ).items()
+        if value is not None
+    }
+    for step in [None, 7]:
+        # `pd.DataFrame.rolling` does not support a `step` with time offsets
+        expected = [
+            (window["a"].iloc[0], window["a"].iloc[-1] + 1)
+            for position, window in enumerate(df.rolling(**rolling_args))
+            if len(window) > 0
+            and len(window) >= rolling_args.get("min_periods", 0)
+            and position % (step or 1) == 0
+        ]
+
+        windows = get_rolling_windows(len(df), {**rolling_args, "step": step}, index)
+        assert list(zip(windows.start, windows.end)) == expected
+
+
+def test_time_steps_are_calendar_aligned():
+    rng = np.random.default_rng(0)
+    # No sample falls on midnight, where the steps are
+    offsets = np.sort(
+        rng.integers(0, 30, 1000) * 24 * 3600 + rng.integers(1, 24 * 3600, 1000)
+    )
+    index = pd.Timestamp("2023-01-01") + pd.to_timedelta(offsets, unit="s")
+    days = index.normalize()
+
+    windows = get_rolling_windows(
+        len(index), dict(window="1D", step="1D", closed="left"), index
+    )
+    assert (days[windows.start] == days[windows.end - 1]).all()
+    assert (windows.end - windows.start).tolist() == days.value_counts(
+        sort=False
+    ).sort_index().tolist()
+
+    expanding = get_rolling_windows(
+        len(index), dict(window=None, step="1D", closed="left"), index
+    )
+    assert (expanding.start == 0).all()
+    assert (expanding.end == windows.end).all()
+
+
+def test_time_windows_feed_the_vectorized_metrics():
+    index = irregular_index(500)
+    y = pd.Series(np.random.rand(len(index)), index=index, name="y")
+    predictions = pd.Series(np.random.rand(len(index)), index=index, name="predictions")
+    rolling_args = dict(window="3D", step="12H", min_periods=2)
+
+    for metric in [
+        library.RegressionRegistry().mae,
+        library.RegressionRegistry().r_two,
+    ]:
+        kwargs = dict(
+            y=y, predictions=predictions, sample_weight=None, rolling_args=rolling_args
+        )
+        vectorized = metric._rolling_evaluation(**kwargs)
+        windowed = evaluate_windowed(metric, **kwargs)
+        assert len(vectorized.rolling_windows) > 0
+        assert np.allclose(
+            vectorized.result_rolling, windowed.result_rolling, equal_nan=True
+        )
+
+
+@pytest.mark.parametrize("weighted", [True, False])
+def test_single_shot_regression_metrics_match_sklearn(weighted):
+    registry = library.RegressionRegistry()
+    y = pd.Series(np.random.normal(100.0, 5.0, 10_000), name="y")
+    predictions = pd.Series(y + np.random.normal(0.0, 2.0, len(y)), name="predictions")
+    sample_weight = (
+        pd.Series(np.random.rand(len(y)), name="sample_weight") if weighted else None
+    )
+    plan = WindowPlan(len(y), None, y.index)
+
+    for metric in [
+        registry.mae,
+        registry.mape,
+        registry.smape,
+        registry.mse,
+        registry.rmse,
+        registry.r_two,
+    ]:
+        shared = metric.evaluate(y, predictions, sample_weight=sample_weight, plan=plan)
+        sklearn = metric.evaluate(y, predictions, sample_weight=sample_weight)
+        assert np.isclose(shared.result, sklearn.result, rtol=1e-12), metric.key
+
+
+def test_sliding_ranking_metrics_are_faster_than_windowed():
+    registry = library.ClassificationRegistry()
+    y = pd.Series(np.random.randint(0, 2, 1_000_000), name="y")
+    probs = pd.Series(np.random.rand(len(y)))
+    kwargs = dict(
+        y=y,
+        predictions=(probs > 0.5).astype(int).rename("predictions"),
+        probabilities=pd.DataFrame(dict(prob_0=1 - probs, prob_1=probs)),
+        sample_weight=None,
+        rolling_args=dict(window=10_000, step=1_000),
+    )
+
+    for metric in [registry.roc_auc_binary_macro, registry.avg_precision_macro]:
+        start = time.perf_counter()
+        sliding = metric._rolling_evaluation(**kwargs).result_rolling
+        sliding_time = time.perf_counter() - start
+        start = time.perf_counter()
+        windowed = evaluate_windowed(metric, **kwargs).result_rolling
+        windowed_time = time.perf_counter() - start
+
+        # The first window holds a single sample (and a single class)
+        assert sliding[0] == windowed[0]
+        assert np.allclose(sliding[1:], windowed[1:]), metric.key
+        assert sliding_time < windowed_time, metric.key
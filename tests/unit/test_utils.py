@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 from krisi.utils.data import combinatorial_shuffling_in_chunks, shuffle_df_in_chunks
@@ -17,6 +18,10 @@ def test_shuffle_df_in_chunks():
     assert df_copy["a"][:chunk_size].nunique() == 1
     assert df_copy["b"][:chunk_size].nunique() == 1
     assert df_copy["c"][:chunk_size].nunique() == 1
+    df_seeded = shuffle_df_in_chunks(df.copy(), chunk_size, np.random.default_rng(0))
+    assert df_seeded.equals(
+        shuffle_df_in_chunks(df.copy(), chunk_size, np.random.default_rng(0))
+    )
 
 
 def test_combinatorical_shuffling_in_chunks():